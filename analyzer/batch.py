@@ -0,0 +1,258 @@
+"""Score a folder or zip of resumes against one job description in parallel.
+
+Usage:
+    python -m analyzer.batch RESUMES --jd JOB_DESCRIPTION_FILE
+        [--format jsonl|csv] [--output FILE] [--ranked FILE] [--workers N]
+
+RESUMES is a directory (searched recursively) or a .zip file of PDF/DOCX
+resumes. Results are written as each resume finishes; --ranked also writes
+the full list sorted by overall ATS score and skills match once all are done.
+"""
+import os
+import io
+import sys
+import csv
+import json
+import zipfile
+import argparse
+import multiprocessing
+
+from analyzer.resume_analyzer import ResumeAnalyzer, extract_resume_text
+from analyzer.features import prepare_job_description
+from analyzer.entities import entity_model, entity_segments, extract_entities_batch
+
+
+ALLOWED_EXTENSIONS = {'.pdf', '.docx'}
+# Zip members larger than this are skipped rather than extracted
+MAX_MEMBER_BYTES = 10 * 1024 * 1024
+# Resumes per pool task; their entity segments go through spaCy's nlp.pipe together
+BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', '4'))
+
+CSV_FIELDS = ['rank', 'file', 'overall', 'content', 'format', 'skills', 'sections', 'style',
+              'skills_match', 'matched_skills', 'jd_similarity', 'error']
+
+# Per-worker state, set once by _init_worker
+_job_description = None
+_zip_files = {}
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def iter_sources(path):
+    """Yield (name, source) for every resume in a directory or zip file.
+
+    A source is either a file path or a (zip_path, member) pair.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith('__MACOSX/'):
+                    continue
+                if os.path.splitext(name)[1].lower() in ALLOWED_EXTENSIONS:
+                    yield name, (path, name)
+        return
+
+    for root, _, files in os.walk(path):
+        for filename in sorted(files):
+            if os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS:
+                full_path = os.path.join(root, filename)
+                yield os.path.relpath(full_path, path), full_path
+
+
+def source_bytes(source):
+    """(bytes, extension) of a source from iter_sources.
+
+    Zip members larger than MAX_MEMBER_BYTES raise ValueError; they are
+    read from memory rather than extracted to a temporary file.
+    """
+    if not isinstance(source, tuple):
+        with open(source, 'rb') as f:
+            return f.read(), os.path.splitext(source)[1].lower()
+
+    zip_path, member = source
+    archive = _zip_files.get(zip_path)
+    if archive is None:
+        archive = _zip_files[zip_path] = zipfile.ZipFile(zip_path)
+    info = archive.getinfo(member)
+    if info.file_size > MAX_MEMBER_BYTES:
+        raise ValueError(f"File is larger than {MAX_MEMBER_BYTES // (1024 * 1024)}MB")
+    with archive.open(info) as src:
+        return src.read(), os.path.splitext(member)[1].lower()
+
+
+def read_text(source):
+    """Extracted text of a source from iter_sources, without parsing or scoring the resume"""
+    data, extension = source_bytes(source)
+    return extract_resume_text(io.BytesIO(data), extension)[0]
+
+
+def _init_worker(job_description):
+    global _job_description
+    _job_description = job_description
+
+
+def _open_analyzer(source):
+    """ResumeAnalyzer of a source, with NER left to the caller"""
+    if not isinstance(source, tuple):
+        return ResumeAnalyzer(source, _job_description, entities=False)
+    data, extension = source_bytes(source)
+    return ResumeAnalyzer(io.BytesIO(data), _job_description, extension=extension, entities=False)
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _analyze_chunk(items):
+    """Analyze a few resumes in a worker process and return their compact records.
+
+    Text extraction and section parsing run per resume, NER once for the
+    whole chunk through extract_entities_batch.
+    """
+    records, analyzers = [], []
+    for name, source in items:
+        record = {'file': name}
+        records.append(record)
+        try:
+            analyzers.append((record, _open_analyzer(source)))
+        except Exception as e:
+            record['error'] = str(e)
+
+    nlp = entity_model()
+    if nlp is not None and analyzers:
+        segments = [entity_segments(analyzer.segmentation) for _, analyzer in analyzers]
+        for (_, analyzer), entities in zip(analyzers, extract_entities_batch(segments, nlp)):
+            analyzer.parsed_resume['entities'] = entities
+
+    for record, analyzer in analyzers:
+        _score(record, analyzer)
+    return records
+
+
+def _score(record, analyzer):
+    """Fill in the record of one parsed resume"""
+    try:
+        analysis = analyzer.analyze()
+    except Exception as e:
+        record['error'] = str(e)
+        return record
+
+    categories = analysis['ats_score']['categories']
+    record['overall'] = analysis['ats_score']['overall']
+    record.update(categories)
+
+    # Share of the job description's skills that the resume lists
+    if _job_description.skills:
+        resume_skills = {hit.skill for hits in analyzer.features.skill_hits for hit in hits}
+        matched = sorted(_job_description.skills & resume_skills)
+        record['skills_match'] = round(len(matched) / len(_job_description.skills), 3)
+        record['matched_skills'] = matched
+    else:
+        record['skills_match'] = None
+        record['matched_skills'] = []
+    record['jd_similarity'] = analysis['jd_match']['similarity'] if 'jd_match' in analysis else None
+    return record
+
+
+def rank_key(record):
+    """Sort key: overall ATS score, then skills match; failed resumes last"""
+    if 'error' in record:
+        return (1, 0.0, 0.0)
+    return (0, -record['overall'], -(record['skills_match'] or 0.0))
+
+
+def ranked(records):
+    ordered = sorted(records, key=rank_key)
+    for rank, record in enumerate(ordered, 1):
+        record['rank'] = rank
+    return ordered
+
+
+def run_batch(sources, job_description, workers=None):
+    """Analyze sources across a process pool, yielding records as they finish.
+
+    The job description is prepared once here and shipped to each worker,
+    so its skills and keywords are not re-extracted per resume. Workers take
+    BATCH_CHUNK_SIZE resumes at a time and run NER over them in one batch;
+    the pool, not spaCy's n_process, spreads the work over processes.
+    """
+    job = prepare_job_description(job_description)
+    workers = workers or available_cpus()
+    # The app runs batches from a request thread; forking a threaded process can deadlock
+    # the child on a lock another thread holds, so workers come from the fork server
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    with context.Pool(processes=workers, initializer=_init_worker, initargs=(job,)) as pool:
+        for records in pool.imap_unordered(_analyze_chunk, _chunks(sources, BATCH_CHUNK_SIZE)):
+            yield from records
+
+
+def format_record(record, output_format):
+    """Serialize one record as a JSONL line or CSV row"""
+    if output_format == 'jsonl':
+        return json.dumps(record) + '\n'
+    row = dict(record)
+    row['matched_skills'] = ';'.join(row.get('matched_skills') or [])
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore').writerow(row)
+    return buffer.getvalue()
+
+
+def csv_header():
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=CSV_FIELDS).writeheader()
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score many resumes against one job description')
+    parser.add_argument('resumes', help='directory or .zip of PDF/DOCX resumes')
+    parser.add_argument('--jd', required=True, help='file containing the job description')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    parser.add_argument('--output', help='stream results here as they finish (default: stdout)')
+    parser.add_argument('--ranked', help='write all results sorted by score here when done')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: available cores)')
+    args = parser.parse_args()
+
+    with open(args.jd, 'r', encoding='utf-8') as f:
+        job_description = f.read()
+
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    records = []
+    try:
+        if args.format == 'csv':
+            output.write(csv_header())
+        for record in run_batch(iter_sources(args.resumes), job_description, args.workers):
+            records.append(record)
+            output.write(format_record(record, args.format))
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if args.ranked:
+        with open(args.ranked, 'w', newline='') as f:
+            if args.format == 'csv':
+                f.write(csv_header())
+            for record in ranked(records):
+                f.write(format_record(record, args.format))
+
+    failed = sum(1 for record in records if 'error' in record)
+    print(f"Analyzed {len(records) - failed} resumes ({failed} failed)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
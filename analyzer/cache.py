@@ -0,0 +1,272 @@
+import os
+import re
+import json
+import time
+import hashlib
+import atexit
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Reads are counted and their LRU touches recorded in memory, and written to the shared
+# database at most this often (or once CACHE_FLUSH_READS reads are pending, or on a put)
+CACHE_FLUSH_SECONDS = float(os.environ.get('CACHE_FLUSH_SECONDS', '5'))
+CACHE_FLUSH_READS = int(os.environ.get('CACHE_FLUSH_READS', '256'))
+# Keys per SELECT of get_many, below SQLite's limit on query parameters
+_KEYS_PER_QUERY = 500
+
+
+def hash_bytes(data):
+    """Content hash used to address uploaded files"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_job_description(job_description):
+    """Collapse case and whitespace so trivially different job descriptions share cache entries"""
+    return re.sub(r'\s+', ' ', job_description or '').strip().lower()
+
+
+def result_cache_key(file_hash, job_description, version):
+    jd_hash = hashlib.sha256(normalize_job_description(job_description).encode('utf-8')).hexdigest()
+    return f'{file_hash}:{jd_hash}:{version}'
+
+
+class BlobStore:
+    """Content-addressed file storage: each distinct upload is stored once, named by its hash"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, file_hash, extension):
+        return os.path.join(self.root, file_hash[:2], f'{file_hash}{extension}')
+
+    def save(self, data, extension, file_hash=None):
+        """Store data unless an identical file is already present; return its path"""
+        file_hash = file_hash or hash_bytes(data)
+        path = self.path(file_hash, extension)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return path
+
+
+class ContentCache:
+    """Size-bounded LRU cache of JSON values, namespaced by kind.
+
+    Backed by SQLite so every gunicorn worker and analysis process shares
+    the same entries and hit/miss counters. When the stored values exceed
+    max_bytes, the least recently used entries are evicted.
+
+    Reads take no write lock: a get is a plain SELECT, and its access time
+    and hit or miss are kept in memory until flush() writes a batch of them
+    in one transaction.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, flush_seconds=CACHE_FLUSH_SECONDS,
+                 flush_reads=CACHE_FLUSH_READS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_seconds = flush_seconds
+        self.flush_reads = flush_reads
+        self._reset_pending()
+        # A forked child starts with the parent's pending reads; they are the parent's to write
+        os.register_at_fork(after_in_child=self._reset_pending)
+        atexit.register(self._flush_at_exit)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+            conn.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _increment(conn, name, amount=1):
+        conn.execute(
+            'INSERT INTO counters (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            (name, amount)
+        )
+
+    def _reset_pending(self):
+        self._lock = threading.Lock()
+        self._touched = {}  # (kind, key) -> last access time
+        self._counts = {}  # counter name -> increment
+        self._last_flush = time.monotonic()
+
+    def _record(self, kind, hits, misses):
+        now = time.time()
+        with self._lock:
+            for key in hits:
+                self._touched[(kind, key)] = now
+            for name, amount in ((f'{kind}.hits', len(hits)), (f'{kind}.misses', misses)):
+                if amount:
+                    self._counts[name] = self._counts.get(name, 0) + amount
+            due = (len(self._touched) >= self.flush_reads
+                   or time.monotonic() - self._last_flush >= self.flush_seconds)
+        if due:
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # The reads stay pending for the next flush; a busy database must not fail a read
+                pass
+
+    def _write_pending(self, conn):
+        """Write the pending access times and counters inside the caller's transaction"""
+        with self._lock:
+            touched, counts = self._touched, self._counts
+            self._touched, self._counts = {}, {}
+            self._last_flush = time.monotonic()
+        try:
+            conn.executemany(
+                'UPDATE entries SET accessed = ? WHERE kind = ? AND key = ? AND accessed < ?',
+                [(accessed, kind, key, accessed) for (kind, key), accessed in touched.items()]
+            )
+            for name, amount in counts.items():
+                self._increment(conn, name, amount)
+        except sqlite3.Error:
+            self._restore_pending(touched, counts)
+            raise
+        return touched, counts
+
+    def _restore_pending(self, touched, counts):
+        with self._lock:
+            for entry, accessed in touched.items():
+                self._touched[entry] = max(accessed, self._touched.get(entry, 0))
+            for name, amount in counts.items():
+                self._counts[name] = self._counts.get(name, 0) + amount
+
+    def flush(self):
+        """Write the access times and hit/miss counts of the reads since the last flush"""
+        if not self._touched and not self._counts:
+            return
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            pending = self._write_pending(conn)
+            try:
+                conn.execute('COMMIT')
+            except sqlite3.Error:
+                self._restore_pending(*pending)
+                raise
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except sqlite3.Error:
+            pass
+
+    def get(self, kind, key):
+        """Return the cached value, or None on a miss"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM entries WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+        self._record(kind, [key] if row else [], 0 if row else 1)
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, kind, keys):
+        """{key: value} of the given keys that are cached"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._connect() as conn:
+            for start in range(0, len(keys), _KEYS_PER_QUERY):
+                chunk = keys[start:start + _KEYS_PER_QUERY]
+                found.update(conn.execute(
+                    f"SELECT key, value FROM entries WHERE kind = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [kind] + chunk
+                ).fetchall())
+        if keys:
+            self._record(kind, list(found), len(keys) - len(found))
+        return {key: json.loads(value) for key, value in found.items()}
+
+    def put(self, kind, key, value):
+        self.put_many(kind, {key: value})
+
+    def put_many(self, kind, values):
+        """Store {key: value} pairs in one transaction"""
+        rows = []
+        for key, value in values.items():
+            encoded = json.dumps(value)
+            size = len(encoded.encode('utf-8'))
+            if size <= self.max_bytes:
+                rows.append((key, encoded, size))
+        if not rows:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            pending = None
+            try:
+                # Pending reads first, so eviction sees their access times
+                pending = self._write_pending(conn)
+                added = 0
+                for key, encoded, size in rows:
+                    previous = conn.execute('SELECT size FROM entries WHERE kind = ? AND key = ?',
+                                            (kind, key)).fetchone()
+                    conn.execute(
+                        'INSERT OR REPLACE INTO entries (kind, key, value, size, accessed) VALUES (?, ?, ?, ?, ?)',
+                        (kind, key, encoded, size, now)
+                    )
+                    added += size - (previous[0] if previous else 0)
+                self._increment(conn, 'bytes', added)
+                self._evict(conn)
+                conn.execute('COMMIT')
+            except sqlite3.Error:
+                conn.execute('ROLLBACK')
+                if pending:
+                    self._restore_pending(*pending)
+                raise
+
+    def _evict(self, conn):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+        while total > self.max_bytes:
+            victims = conn.execute('SELECT kind, key, size FROM entries ORDER BY accessed LIMIT 32').fetchall()
+            if not victims:
+                break
+            for kind, key, size in victims:
+                conn.execute('DELETE FROM entries WHERE kind = ? AND key = ?', (kind, key))
+                total -= size
+                self._increment(conn, 'evictions')
+                if total <= self.max_bytes:
+                    break
+        conn.execute("UPDATE counters SET value = ? WHERE name = 'bytes'", (max(0, total),))
+
+    def stats(self):
+        """Hit/miss counters per kind plus current size"""
+        self.flush()
+        with self._connect() as conn:
+            counters = dict(conn.execute('SELECT name, value FROM counters').fetchall())
+            entries = dict(conn.execute('SELECT kind, COUNT(*) FROM entries GROUP BY kind').fetchall())
+
+        kinds = {}
+        for name, value in counters.items():
+            if '.' in name:
+                kind, counter = name.rsplit('.', 1)
+                kinds.setdefault(kind, {'hits': 0, 'misses': 0})[counter] = value
+        for kind, count in entries.items():
+            kinds.setdefault(kind, {'hits': 0, 'misses': 0})['entries'] = count
+
+        return {
+            'bytes': counters.get('bytes', 0),
+            'max_bytes': self.max_bytes,
+            'evictions': counters.get('evictions', 0),
+            'kinds': kinds
+        }
@@ -0,0 +1,124 @@
+"""Streaming DOCX text extraction.
+
+Reads the WordprocessingML parts straight from the zip with an incremental
+XML parser instead of building python-docx's object model. Paragraphs come out
+in reading order: header parts, then the document body (including table cells,
+text boxes and content controls), then footer parts.
+"""
+import io
+import os
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+PACKAGE_RELS = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+
+# Run content other than w:t, translated the way python-docx does
+_RUN_TEXT = {f'{W}tab': '\t', f'{W}ptab': '\t', f'{W}cr': '\n', f'{W}noBreakHyphen': '-'}
+# Subtrees with no text of the document as shown: paragraph properties (their w:tab elements are
+# tab stops), deleted or moved-away revisions, and the VML fallback copy of every text box
+_SKIPPED = {f'{W}pPr', f'{W}del', f'{W}moveFrom', f'{MC}Fallback'}
+
+
+def _open_zip(source):
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    elif not isinstance(source, (str, os.PathLike)):
+        source.seek(0)
+    return zipfile.ZipFile(source)
+
+
+def _relationships(archive, rels_name, base):
+    """(type, part name) for each relationship in a .rels part, resolved against base"""
+    try:
+        root = ET.fromstring(archive.read(rels_name))
+    except KeyError:
+        return []
+    relationships = []
+    for rel in root.iter(PACKAGE_RELS):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target', '')
+        # Absolute targets are relative to the package root
+        name = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join(base, target))
+        relationships.append((rel.get('Type', '').rsplit('/', 1)[-1], name))
+    return relationships
+
+
+def _iter_part(archive, name):
+    """Text of each w:p in a part, innermost first for paragraphs nested in text boxes"""
+    paragraphs = []  # Text pieces of each open paragraph; text boxes nest paragraphs
+    skipping = 0
+    with archive.open(name) as stream:
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                if tag in _SKIPPED:
+                    skipping += 1
+                elif tag == f'{W}p' and not skipping:
+                    paragraphs.append([])
+                continue
+
+            if tag in _SKIPPED:
+                skipping -= 1
+            elif skipping:
+                pass
+            elif tag == f'{W}p':
+                yield ''.join(paragraphs.pop())
+            elif paragraphs:
+                if tag == f'{W}t':
+                    paragraphs[-1].append(element.text or '')
+                elif tag == f'{W}br':
+                    # Only line breaks; page and column breaks add no text
+                    if element.get(f'{W}type', 'textWrapping') == 'textWrapping':
+                        paragraphs[-1].append('\n')
+                elif tag in _RUN_TEXT:
+                    paragraphs[-1].append(_RUN_TEXT[tag])
+            # Text is collected above, so parsed elements can be dropped right away
+            element.clear()
+
+
+class DocxExtractor:
+    """Paragraph text of a .docx file, given as a path, bytes or a binary file-like object"""
+
+    def __init__(self, source, headers=True):
+        self.source = source
+        self.headers = headers
+
+    def parts(self, archive):
+        """(kind, part name) of the parts to read, in reading order"""
+        document = 'word/document.xml'
+        for kind, target in _relationships(archive, '_rels/.rels', ''):
+            if kind == 'officeDocument':
+                document = target
+        directory, filename = posixpath.split(document)
+        related = _relationships(archive, posixpath.join(directory, '_rels', f'{filename}.rels'), directory)
+        names = set(archive.namelist())
+
+        parts = [('body', document)]
+        if self.headers:
+            parts = ([('header', target) for kind, target in related if kind == 'header' and target in names]
+                     + parts
+                     + [('footer', target) for kind, target in related if kind == 'footer' and target in names])
+        return parts
+
+    def paragraphs(self):
+        """Yield each paragraph's text in reading order"""
+        # First-page, even-page and default headers (and footers) often repeat each other
+        seen = {'header': set(), 'footer': set()}
+        with _open_zip(self.source) as archive:
+            for kind, name in self.parts(archive):
+                if kind == 'body':
+                    # Empty body paragraphs are kept; they separate blocks for the section segmenter
+                    yield from _iter_part(archive, name)
+                    continue
+                for text in _iter_part(archive, name):
+                    if text.strip() and text not in seen[kind]:
+                        seen[kind].add(text)
+                        yield text
+
+    def text(self):
+        return '\n'.join(self.paragraphs())
@@ -0,0 +1,88 @@
+"""Named entities of a resume: the candidate's name, employers, dates and locations.
+
+spaCy's NER (the pipeline loaded by analyzer/models.py, with everything but
+the tokenizer and NER left out) runs only over the segments that carry these
+entities: the lines above the first section header and the experience
+section. Segments of one or many resumes go through nlp.pipe together, so a
+bulk run is batched and can be spread over processes with n_process.
+"""
+import os
+import logging
+
+from analyzer.models import registry
+
+
+# auto: extract entities when spaCy and SPACY_MODEL are installed; off: never
+ENTITY_MODE = os.environ.get('ENTITY_MODE', 'auto')
+ENTITY_BATCH_SIZE = int(os.environ.get('ENTITY_BATCH_SIZE', '64'))
+# Non-blank lines above the first section header taken as the resume's header
+HEADER_MAX_LINES = 8
+# Characters of a segment sent to the model; long experience sections are cut here
+MAX_SEGMENT_CHARS = 20000
+# Values kept per entity list
+MAX_ENTITIES = 20
+
+# spaCy label -> entities field, per segment. Organizations and dates are only taken from the
+# experience section, where they are employers and employment dates.
+SEGMENT_LABELS = {
+    'header': {'PERSON': 'names', 'GPE': 'locations', 'LOC': 'locations'},
+    'experience': {'ORG': 'organizations', 'DATE': 'dates', 'GPE': 'locations', 'LOC': 'locations'}
+}
+
+logger = logging.getLogger(__name__)
+_available = None
+
+
+def entity_model():
+    """The spaCy pipeline, or None when ENTITY_MODE is off or spaCy or its model is not installed"""
+    global _available
+    if ENTITY_MODE == 'off' or _available is False:
+        return None
+    try:
+        nlp = registry.get('spacy')
+    except (ImportError, RuntimeError) as e:
+        # Checked once per process; analyses go on without entities
+        _available = False
+        logger.warning(f"Entity extraction disabled: {e}")
+        return None
+    _available = True
+    return nlp
+
+
+def entity_segments(segmentation):
+    """(segment name, text) pairs of a resume to run NER over, from its Segmentation"""
+    segments = [('header', '\n'.join(segmentation.preamble_lines(HEADER_MAX_LINES))),
+                ('experience', segmentation.section_text('experience'))]
+    return [(name, text[:MAX_SEGMENT_CHARS]) for name, text in segments if text.strip()]
+
+
+def _empty_entities():
+    return {'name': '', 'organizations': [], 'dates': [], 'locations': []}
+
+
+def extract_entities_batch(resumes, nlp, batch_size=ENTITY_BATCH_SIZE, n_process=1):
+    """Entities of many resumes, each given as its entity_segments(); results are in the same order"""
+    names = [[] for _ in resumes]
+    results = [_empty_entities() for _ in resumes]
+    seen = [set() for _ in resumes]
+    texts = ((text, (index, segment)) for index, segments in enumerate(resumes) for segment, text in segments)
+    for doc, (index, segment) in nlp.pipe(texts, as_tuples=True, batch_size=batch_size, n_process=n_process):
+        labels = SEGMENT_LABELS[segment]
+        for entity in doc.ents:
+            field = labels.get(entity.label_)
+            value = ' '.join(entity.text.split())
+            if field is None or not value:
+                continue
+            if field == 'names':
+                names[index].append(value)
+            elif (field, value.lower()) not in seen[index] and len(results[index][field]) < MAX_ENTITIES:
+                seen[index].add((field, value.lower()))
+                results[index][field].append(value)
+    for result, candidates in zip(results, names):
+        # The first person named in the header is taken to be the candidate
+        result['name'] = candidates[0] if candidates else ''
+    return results
+
+
+def extract_entities(segmentation, nlp):
+    return extract_entities_batch([entity_segments(segmentation)], nlp)[0]
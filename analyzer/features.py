@@ -0,0 +1,127 @@
+from collections import Counter
+from dataclasses import dataclass
+
+from analyzer.skills import DEFAULT_MATCHER
+from analyzer.patterns import (WORD_PATTERN, BULLET_PATTERN, ACTIVE_VOICE_PATTERN, KEYWORD_PATTERN,
+                               normalize_text, achievement_hits as find_achievements, buzzword_counts)
+
+
+@dataclass(frozen=True)
+class JobDescription:
+    """Job-description artifacts shared by every resume scored against it"""
+    text: str
+    normalized: str
+    skills: frozenset
+    keywords: frozenset
+
+    def __bool__(self):
+        return bool(self.text)
+
+
+def prepare_job_description(job_description):
+    """Extract skills and keywords from a job description once"""
+    if isinstance(job_description, JobDescription):
+        return job_description
+    job_description = job_description or ''
+    normalized = normalize_text(job_description)
+    return JobDescription(
+        text=job_description,
+        normalized=normalized,
+        skills=frozenset(DEFAULT_MATCHER.skills_in(job_description)) if job_description else frozenset(),
+        keywords=frozenset(KEYWORD_PATTERN.findall(normalized))
+    )
+
+
+@dataclass(frozen=True)
+class ResumeFeatures:
+    """Everything the scorers need, extracted from a resume in a single pass.
+
+    Instances are immutable so they can be shared between scorers and
+    suggestion generators; treat word_counts as read-only.
+    """
+    text: str
+    normalized: str
+    word_count: int
+    word_counts: Counter
+    repeated_words: tuple
+    bullets: tuple
+    long_bullets: tuple
+    achievement_hits: frozenset
+    verb_hits: tuple
+    buzzword_hits: tuple
+    skills: tuple
+    skill_hits: tuple
+    present_sections: frozenset
+    contact_info: tuple
+    job: JobDescription
+
+    @property
+    def job_description(self):
+        return self.job.text
+
+    @property
+    def job_description_normalized(self):
+        return self.job.normalized
+
+    @property
+    def job_skills(self):
+        return self.job.skills
+
+    @property
+    def active_voice_count(self):
+        return len(self.verb_hits)
+
+    @property
+    def buzzword_count(self):
+        return sum(count for _, count in self.buzzword_hits)
+
+    @property
+    def email(self):
+        return dict(self.contact_info).get('email', '')
+
+
+def extract_features(text, parsed_resume, job_description=''):
+    """Scan a resume once and build its ResumeFeatures record.
+
+    job_description may be a string or a JobDescription prepared up front.
+    """
+    # Lowercased, NFKC-normalized, whitespace-collapsed view shared by the text-wide patterns
+    normalized = normalize_text(text)
+
+    words = WORD_PATTERN.findall(normalized)
+    word_counts = Counter(words)
+    # Words longer than 3 characters appearing more than 5 times, in first-seen order
+    repeated_words = tuple(word for word, count in word_counts.items() if len(word) > 3 and count > 5)
+
+    bullets = tuple(BULLET_PATTERN.findall(text))
+    long_bullets = tuple(bp for bp in bullets if len(bp) > 100)
+
+    achievement_hits = find_achievements(normalized)
+    verb_hits = tuple(ACTIVE_VOICE_PATTERN.findall(normalized))
+    buzzword_hits = buzzword_counts(normalized)
+
+    skills_text = parsed_resume.get('skills', '')
+    skills = tuple(skill.strip().lower() for skill in skills_text.split('\n') if skill.strip())
+    # Taxonomy hits for each skills line
+    skill_hits = tuple(tuple(DEFAULT_MATCHER.find(skill)) for skill in skills)
+
+    present_sections = frozenset(section for section, content in parsed_resume.items() if content)
+    contact_info = tuple(parsed_resume.get('contact_info', {}).items())
+
+    return ResumeFeatures(
+        text=text,
+        normalized=normalized,
+        word_count=len(words),
+        word_counts=word_counts,
+        repeated_words=repeated_words,
+        bullets=bullets,
+        long_bullets=long_bullets,
+        achievement_hits=achievement_hits,
+        verb_hits=verb_hits,
+        buzzword_hits=buzzword_hits,
+        skills=skills,
+        skill_hits=skill_hits,
+        present_sections=present_sections,
+        contact_info=contact_info,
+        job=prepare_job_description(job_description)
+    )
@@ -0,0 +1,151 @@
+"""Age and size quotas for stored uploads and rendered reports.
+
+Usage: python -m analyzer.janitor [--dry-run]
+
+The web app runs the same sweep in a background thread every
+JANITOR_INTERVAL seconds. Uploads are only kept for UPLOAD_RETENTION_DAYS
+(0, the default, keeps none once analyzed) and at most UPLOADS_MAX_BYTES.
+Rendered reports are a cache and can be re-rendered, so they are trimmed
+to REPORTS_MAX_AGE_DAYS and REPORTS_MAX_BYTES. Expired results are
+removed from the result store on every sweep.
+"""
+import os
+import time
+import fcntl
+import logging
+import argparse
+import threading
+from collections import namedtuple
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+UPLOAD_RETENTION_DAYS = float(os.environ.get('UPLOAD_RETENTION_DAYS', '0'))
+UPLOADS_MAX_BYTES = int(os.environ.get('UPLOADS_MAX_BYTES', str(1024 * 1024 * 1024)))
+REPORTS_MAX_AGE_DAYS = float(os.environ.get('REPORTS_MAX_AGE_DAYS', '30'))
+REPORTS_MAX_BYTES = int(os.environ.get('REPORTS_MAX_BYTES', str(512 * 1024 * 1024)))
+# Seconds between sweeps in the web app; 0 disables the background janitor
+JANITOR_INTERVAL = float(os.environ.get('JANITOR_INTERVAL', '3600'))
+
+# Files under `root` older than max_age seconds are removed, then the oldest until at most max_bytes remain
+Quota = namedtuple('Quota', ['root', 'max_age', 'max_bytes'])
+
+logger = logging.getLogger(__name__)
+
+
+def enforce_quota(quota, now=None, dry_run=False):
+    """Apply one quota; returns (files removed, bytes removed)"""
+    now = now or time.time()
+    files = []
+    for directory, _, names in os.walk(quota.root):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    files.sort()
+
+    total = sum(size for _, size, _ in files)
+    removed_files = removed_bytes = 0
+    # Oldest first: once a file is neither expired nor needed to get under the size cap, neither is any newer one
+    for mtime, size, path in files:
+        expired = quota.max_age is not None and now - mtime > quota.max_age
+        if not expired and (quota.max_bytes is None or total <= quota.max_bytes):
+            break
+        if not dry_run:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        total -= size
+        removed_files += 1
+        removed_bytes += size
+    return removed_files, removed_bytes
+
+
+class Janitor:
+    """Periodically enforces quotas (and runs extra cleanup tasks) in a background thread.
+
+    Every gunicorn worker may start one; a lock file makes sure only one of
+    them sweeps at a time.
+    """
+
+    def __init__(self, quotas, lock_path, interval=JANITOR_INTERVAL, tasks=()):
+        self.quotas = list(quotas)
+        self.lock_path = lock_path
+        self.interval = interval
+        # Callables run after the quotas on every sweep, e.g. expiring old results
+        self.tasks = list(tasks)
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def sweep(self, dry_run=False):
+        """Run one sweep; returns {root: (files, bytes)} removed, or None if another process is sweeping"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        with open(self.lock_path, 'a') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+            try:
+                removed = {quota.root: enforce_quota(quota, dry_run=dry_run) for quota in self.quotas}
+                if not dry_run:
+                    for task in self.tasks:
+                        task()
+                return removed
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def start(self):
+        """Start the background thread once per process (safe to call after fork)"""
+        if not self.interval or self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._loop, name='janitor', daemon=True).start()
+
+    def _loop(self):
+        while True:
+            try:
+                removed = self.sweep()
+                for root, (files, size) in (removed or {}).items():
+                    if files:
+                        logger.info("Janitor removed %d files (%d bytes) from %s", files, size, root)
+            except Exception:
+                logger.exception("Janitor sweep failed")
+            time.sleep(self.interval)
+
+
+def default_quotas(upload_folder=None, reports_folder=None):
+    upload_folder = upload_folder or os.environ.get('UPLOAD_FOLDER', os.path.join(BASE_DIR, 'uploads'))
+    reports_folder = reports_folder or os.environ.get('REPORTS_FOLDER', os.path.join(BASE_DIR, 'results', 'reports'))
+    return [
+        # Only the blob store the app writes to; other files in the upload folder are left alone
+        Quota(os.path.join(upload_folder, 'blobs'), UPLOAD_RETENTION_DAYS * 86400, UPLOADS_MAX_BYTES),
+        Quota(reports_folder, REPORTS_MAX_AGE_DAYS * 86400, REPORTS_MAX_BYTES)
+    ]
+
+
+def main():
+    from analyzer.result_store import open_result_store
+
+    parser = argparse.ArgumentParser(description='Enforce the upload and report quotas once')
+    parser.add_argument('--dry-run', action='store_true', help='report what would be removed without deleting')
+    args = parser.parse_args()
+
+    store = open_result_store()
+    janitor = Janitor(default_quotas(), os.path.join(BASE_DIR, 'results', '.janitor.lock'), tasks=[store.expire])
+    removed = janitor.sweep(dry_run=args.dry_run)
+    if removed is None:
+        parser.exit(1, "Another janitor is running\n")
+    verb = 'Would remove' if args.dry_run else 'Removed'
+    for root, (files, size) in removed.items():
+        print(f"{verb} {files} files ({size / 1024 / 1024:.1f} MB) from {root}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import logging
+import sqlite3
+import threading
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+
+from analyzer.sandbox import Sandbox
+from analyzer.metrics import JOB_PEAK_RSS_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised when the job queue has no room for another job"""
+
+
+class JobQueue:
+    """SQLite-backed job queue served by a bounded pool of analysis processes.
+
+    Jobs are persisted in SQLite so any gunicorn worker can report their
+    status. Each worker runs up to `workers` dispatcher threads; every
+    dispatcher claims one queued job at a time and runs it in its own
+    supervised analysis process (see sandbox.py), which is killed if the job
+    exceeds `timeout` seconds and recycled after a number of jobs or once its
+    memory has grown too much. An optional `after` callback runs in that
+    process once the job is marked done. Failed jobs carry an error type,
+    and every job its peak RSS.
+    """
+
+    def __init__(self, db_path, handler, workers=2, max_queued=50, timeout=120, retention=86400, after=None,
+                 preload=()):
+        self.db_path = db_path
+        self.handler = handler
+        self.after = after
+        self.workers = workers
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.retention = retention
+        self.preload = list(preload)
+
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._sandboxes = []
+        self._metrics_lock = threading.Lock()
+        self._counters = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0, 'timed_out': 0, 'recycled': 0}
+        self._wait_seconds = deque(maxlen=500)
+        self._run_seconds = deque(maxlen=500)
+        self._peak_rss = deque(maxlen=500)
+
+        # Forking this process from a dispatcher thread can deadlock the child on a
+        # lock (e.g. SQLite's) held by another thread, so analysis processes are forked
+        # from a single-threaded fork server that has `preload` modules imported. Each
+        # gunicorn worker has a fork server of its own, so each imports them once.
+        methods = multiprocessing.get_all_start_methods()
+        if 'forkserver' in methods:
+            self._mp = multiprocessing.get_context('forkserver')
+            self._mp.set_forkserver_preload(self.preload)
+        else:
+            self._mp = multiprocessing.get_context(None)
+
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    started REAL,
+                    finished REAL,
+                    data BLOB,
+                    error_type TEXT,
+                    peak_rss INTEGER
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created)')
+            # Databases created before jobs carried their input bytes, error types and peak memory
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+            for column, kind in (('data', 'BLOB'), ('error_type', 'TEXT'), ('peak_rss', 'INTEGER')):
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {kind}')
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def start(self):
+        """Start the dispatcher threads once per process (safe to call after fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._recover()
+            # Analysis processes are not daemonic; without this, exiting would wait for idle ones forever
+            atexit.register(self._kill_workers)
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._dispatch_loop, name=f'analysis-dispatcher-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Stop the dispatcher threads once their current jobs finish; queued jobs stay queued"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _kill_workers(self):
+        for sandbox in list(self._sandboxes):
+            sandbox.kill()
+
+    def _recover(self):
+        """Fail jobs orphaned by a dead worker and prune old finished jobs"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Analysis was interrupted', error_type = 'interrupted', "
+                "finished = ?, data = NULL WHERE status = 'running' AND started < ?",
+                (now, now - self.timeout - 30)
+            )
+            conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished < ?", (now - self.retention,))
+
+    def submit(self, payload, data=None):
+        """Queue a job and return its id, or raise QueueFull.
+
+        `data` (bytes, e.g. the uploaded file) is stored outside the JSON
+        payload, handed to the handler as payload['data'] and dropped once
+        the job finishes.
+        """
+        self.start()
+        job_id = str(uuid.uuid4())
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                conn.execute('ROLLBACK')
+                self._count('rejected')
+                raise QueueFull(f"{queued} analyses are already waiting")
+            conn.execute(
+                "INSERT INTO jobs (id, status, payload, created, data) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(payload), time.time(), data)
+            )
+            conn.execute('COMMIT')
+        self._count('submitted')
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """Return the job's status, plus its result once done"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT status, result, error, error_type, peak_rss, created, started, finished FROM jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, result, error, error_type, peak_rss, created, started, finished = row
+            job = {'job_id': job_id, 'status': status, 'created': created, 'started': started, 'finished': finished}
+            if status == 'queued':
+                job['position'] = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created < ?", (created,)
+                ).fetchone()[0] + 1
+        if result is not None:
+            job['result'] = json.loads(result)
+        if error is not None:
+            job['error'] = error
+            job['error_type'] = error_type or 'error'
+        if peak_rss is not None:
+            job['peak_rss_bytes'] = peak_rss
+        return job
+
+    def _claim(self):
+        """Atomically move the oldest queued job to running"""
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT id, payload, created, data FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute('ROLLBACK')
+                return None
+            started = time.time()
+            conn.execute("UPDATE jobs SET status = 'running', started = ? WHERE id = ?", (started, row[0]))
+            conn.execute('COMMIT')
+        payload = json.loads(row[1])
+        if row[3] is not None:
+            payload['data'] = row[3]
+        return row[0], payload, started - row[2]
+
+    def _finish(self, job_id, outcome):
+        result = outcome.value if outcome.status == 'ok' else None
+        error = outcome.value if outcome.status != 'ok' else None
+        peak_rss = outcome.stats['peak_rss_bytes'] if outcome.stats else None
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, error_type = ?, peak_rss = ?, finished = ?, '
+                'data = NULL WHERE id = ?',
+                ('failed' if error else 'done', json.dumps(result) if result is not None else None,
+                 error['message'] if error else None, error['type'] if error else None, peak_rss, time.time(), job_id)
+            )
+
+    def _fail(self, job_id, message):
+        """Mark a job failed unless it already finished"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, error_type = 'error', finished = ?, data = NULL "
+                "WHERE id = ? AND status = 'running'",
+                (message, time.time(), job_id)
+            )
+        if cursor.rowcount:
+            self._count('failed')
+
+    def _dispatch_loop(self):
+        # One analysis process per dispatcher, reused across jobs until it is recycled
+        sandbox = Sandbox(self._mp, self.handler, self.after)
+        self._sandboxes.append(sandbox)
+        # Start the fork server and its preloading now rather than on the first job
+        sandbox.prestart()
+        try:
+            while not self._stopping.is_set():
+                claimed = self._claim()
+                if claimed is None:
+                    # Other workers can enqueue too, so also poll periodically
+                    self._wakeup.wait(timeout=1.0)
+                    self._wakeup.clear()
+                    continue
+
+                job_id, payload, waited = claimed
+                try:
+                    self._run_job(sandbox, job_id, payload, waited)
+                except Exception as e:
+                    # One bad job must not take the dispatcher down with it
+                    logger.exception(f"Analysis job {job_id} failed unexpectedly")
+                    sandbox.kill()
+                    try:
+                        self._fail(job_id, str(e))
+                    except Exception:
+                        logger.exception(f"Could not mark job {job_id} as failed")
+        finally:
+            sandbox.close()
+            self._sandboxes.remove(sandbox)
+
+    def _run_job(self, sandbox, job_id, payload, waited):
+        start = time.perf_counter()
+        outcome = sandbox.run(payload, self.timeout)
+        elapsed = time.perf_counter() - start
+        self._record(outcome, waited, elapsed)
+        self._finish(job_id, outcome)
+        # `after` may use what is left of the timeout
+        if sandbox.settle(self.timeout - elapsed):
+            self._count('recycled')
+
+    def _record(self, outcome, waited, elapsed):
+        counter = {'ok': 'completed', 'timeout': 'timed_out'}.get(outcome.status, 'failed')
+        with self._metrics_lock:
+            self._counters[counter] += 1
+            self._wait_seconds.append(waited)
+            self._run_seconds.append(elapsed)
+            if outcome.stats:
+                self._peak_rss.append(outcome.stats['peak_rss_bytes'])
+        if outcome.stats:
+            JOB_PEAK_RSS_BYTES.observe(outcome.stats['peak_rss_bytes'], outcome.status)
+
+    def _count(self, name):
+        with self._metrics_lock:
+            self._counters[name] += 1
+
+    def metrics(self):
+        """Queue depth from the shared database plus this worker's latency stats"""
+        with self._connect() as conn:
+            depth = dict(conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+        def summarize(samples):
+            if not samples:
+                return {'count': 0}
+            ordered = sorted(samples)
+            return {
+                'count': len(ordered),
+                'avg': round(sum(ordered) / len(ordered), 3),
+                'p50': round(ordered[len(ordered) // 2], 3),
+                'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                'max': round(ordered[-1], 3)
+            }
+
+        with self._metrics_lock:
+            counters = dict(self._counters)
+            wait, run, peak_rss = list(self._wait_seconds), list(self._run_seconds), list(self._peak_rss)
+
+        return {
+            'queue_depth': depth.get('queued', 0),
+            'running': depth.get('running', 0),
+            'max_queued': self.max_queued,
+            'workers': self.workers,
+            'counters': counters,
+            'wait_seconds': summarize(wait),
+            'run_seconds': summarize(run),
+            'peak_rss_bytes': summarize(peak_rss)
+        }
@@ -0,0 +1,244 @@
+"""Counters and latency histograms shared across processes, in Prometheus text format.
+
+Every process (gunicorn worker, analysis job process) counts into small
+in-memory arrays and periodically adds what it counted since the last flush
+to a shared SQLite file. Only counters and histograms are stored, so the
+deltas of any number of processes simply add up; /metrics renders the sums.
+"""
+import os
+import time
+import bisect
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+METRICS_DATABASE = os.environ.get(
+    'METRICS_DATABASE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results', 'metrics.db')
+)
+# Seconds between flushes of a process's counts; request hooks flush at most this often
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', '5'))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MODEL_LOAD_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+MEMORY_BUCKETS = tuple(megabytes * 1024 * 1024 for megabytes in (128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=''):
+    labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    if extra:
+        labels = f'{labels},{extra}' if labels else extra
+    return labels
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        # label values -> one-element list, so increments need no new objects
+        self._cells = {}
+
+    def inc(self, *label_values, amount=1):
+        cell = self._cells.get(label_values)
+        if cell is None:
+            cell = self._cells.setdefault(label_values, [0])
+        cell[0] += amount
+
+    def drain(self):
+        """(sample name, labels, delta) for everything counted since the last drain"""
+        for label_values, cell in list(self._cells.items()):
+            delta = cell[0]
+            if delta:
+                # Subtracting what was read keeps increments made meanwhile by another thread
+                cell[0] -= delta
+                yield self.name, _format_labels(self.labels, label_values), delta
+
+    def reset(self):
+        self._cells = {}
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket..., count above the last bucket, sum, count]
+        self._cells = {}
+
+    def observe(self, value, *label_values):
+        cell = self._cells.get(label_values)
+        if cell is None:
+            cell = self._cells.setdefault(label_values, [0] * (len(self.buckets) + 3))
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def drain(self):
+        for label_values, cell in list(self._cells.items()):
+            delta = cell[:]
+            if not delta[-1]:
+                continue
+            for i, value in enumerate(delta):
+                cell[i] -= value
+            cumulative = 0
+            for bound, count in zip(self.buckets, delta):
+                cumulative += count
+                yield f'{self.name}_bucket', _format_labels(self.labels, label_values, f'le="{bound}"'), cumulative
+            yield f'{self.name}_bucket', _format_labels(self.labels, label_values, 'le="+Inf"'), delta[-1]
+            yield f'{self.name}_sum', _format_labels(self.labels, label_values), delta[-2]
+            yield f'{self.name}_count', _format_labels(self.labels, label_values), delta[-1]
+
+    def reset(self):
+        self._cells = {}
+
+
+class MetricsRegistry:
+    """The metrics of this process, flushed into the shared SQLite file"""
+
+    def __init__(self, path=METRICS_DATABASE, flush_seconds=METRICS_FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self.metrics = []
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._initialized = False
+        # A forked child starts with the parent's unflushed counts; they are the parent's to report
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        for metric in self.metrics:
+            metric.reset()
+
+    @contextmanager
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        try:
+            if not self._initialized:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS samples (
+                        name TEXT NOT NULL,
+                        labels TEXT NOT NULL,
+                        value REAL NOT NULL,
+                        PRIMARY KEY (name, labels)
+                    )
+                ''')
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def flush(self):
+        """Add everything counted since the last flush to the shared totals"""
+        with self._lock:
+            rows = self._pending + [row for metric in self.metrics for row in metric.drain()]
+            self._pending = []
+            self._last_flush = time.monotonic()
+        if not rows:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    'INSERT INTO samples (name, labels, value) VALUES (?, ?, ?) '
+                    'ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value',
+                    rows
+                )
+        except sqlite3.Error:
+            # Keep the deltas for the next flush rather than losing them
+            with self._lock:
+                self._pending = rows + self._pending
+            raise
+
+    def maybe_flush(self):
+        """Flush if the last flush was more than flush_seconds ago"""
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def render(self, gauges=()):
+        """Every process's totals in Prometheus text format, plus (name, help, value) gauges read now"""
+        self.flush()
+        with self._connect() as conn:
+            rows = conn.execute('SELECT name, labels, value FROM samples').fetchall()
+
+        samples = {}
+        for name, labels, value in rows:
+            samples.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for metric in self.metrics:
+            suffixes = ('_bucket', '_sum', '_count') if metric.kind == 'histogram' else ('',)
+            family = [(f'{metric.name}{suffix}', labels, value)
+                      for suffix in suffixes for labels, value in samples.get(f'{metric.name}{suffix}', ())]
+            if not family:
+                continue
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in sorted(family, key=_sample_order):
+                lines.append(f'{name}{{{labels}}} {value:g}' if labels else f'{name} {value:g}')
+        for name, documentation, value in gauges:
+            lines.extend([f'# HELP {name} {documentation}', f'# TYPE {name} gauge', f'{name} {value:g}'])
+        return '\n'.join(lines) + '\n'
+
+
+def _sample_order(sample):
+    """Group a histogram's series by their labels: buckets in ascending order, then sum and count"""
+    name, labels, _ = sample
+    series, _, bound = labels.partition('le="')
+    series, bound = series.rstrip(','), bound.rstrip('"')
+    suffix = 2 if name.endswith('_count') else 1 if name.endswith('_sum') else 0
+    return series, suffix, float('inf') if bound == '+Inf' else float(bound or 0)
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    'resume_analyzer_stage_seconds', 'Time spent in each stage of a resume analysis', ['stage'])
+BYTES_PROCESSED = registry.counter(
+    'resume_analyzer_bytes_processed_total', 'Bytes of resume files read for text extraction', ['format'])
+MODEL_LOAD_SECONDS = registry.histogram(
+    'resume_analyzer_model_load_seconds', 'Time to load each NLP model, one observation per load', ['model'],
+    buckets=MODEL_LOAD_BUCKETS)
+JOB_PEAK_RSS_BYTES = registry.histogram(
+    'resume_analyzer_job_peak_rss_bytes', 'Peak resident memory of the analysis process during each job', ['status'],
+    buckets=MEMORY_BUCKETS)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'Latency of HTTP requests by route and status', ['method', 'route', 'status'])
+
+
+def timed(timings, stage, func, *args):
+    """Call func(*args), recording its duration in timings (milliseconds) and STAGE_SECONDS"""
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        timings[stage] = round(timings.get(stage, 0) + elapsed * 1000, 3)
+        STAGE_SECONDS.observe(elapsed, stage)
@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import threading
+import resource
+import subprocess
+
+from analyzer.metrics import MODEL_LOAD_SECONDS
+
+
+SPACY_MODEL = os.environ.get('SPACY_MODEL', 'en_core_web_md')
+# Only the tokenizer and NER are used (see analyzer/entities.py); these components are not even loaded
+SPACY_EXCLUDE = ['tagger', 'morphologizer', 'parser', 'senter', 'attribute_ruler', 'lemmatizer']
+
+
+def _current_rss_bytes():
+    """Return the resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _ner_only(nlp):
+    """Disable any tok2vec layer left without listeners; in the CNN pipelines NER has its own"""
+    idle = [name for name, pipe in nlp.pipeline
+            if hasattr(pipe, 'listening_components') and not pipe.listening_components]
+    if idle:
+        nlp.select_pipes(disable=idle)
+    return nlp
+
+
+def load_spacy(allow_download=False):
+    """Load the spaCy model for NER, downloading it only when explicitly allowed"""
+    import spacy
+    try:
+        return _ner_only(spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE))
+    except OSError:
+        if not allow_download:
+            raise RuntimeError(
+                f"spaCy model '{SPACY_MODEL}' is not installed. "
+                f"Run: python -m spacy download {SPACY_MODEL}"
+            )
+        subprocess.run([sys.executable, '-m', 'spacy', 'download', SPACY_MODEL], check=True)
+        return _ner_only(spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE))
+
+
+def load_sentiment(allow_download=False):
+    """Build the bullet sentiment classifier used for content quality (see analyzer/quality.py)"""
+    from analyzer.quality import load_classifier
+    return load_classifier()
+
+
+def load_relevance(allow_download=False):
+    """Load the fitted TF-IDF relevance model (or the untrained fallback)"""
+    from analyzer.relevance import load_relevance_model
+    return load_relevance_model(allow_download)
+
+
+class ModelRegistry:
+    """Process-wide, lazily initialized registry of heavy NLP models.
+
+    Each model is loaded at most once per process. Calling preload() in the
+    gunicorn master before workers fork lets every worker share the loaded
+    weights copy-on-write instead of loading its own copy.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._stats = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name, loader):
+        """Register a loader callable for a model name"""
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name, allow_download=False):
+        """Return the model, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        # Only one thread loads a given model; the others wait and reuse it
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is not None:
+                return model
+
+            rss_before = _current_rss_bytes()
+            start = time.perf_counter()
+            model = self._loaders[name](allow_download=allow_download)
+            elapsed = time.perf_counter() - start
+
+            self._models[name] = model
+            MODEL_LOAD_SECONDS.observe(elapsed, name)
+            self._stats[name] = {
+                'loaded': True,
+                'load_seconds': round(elapsed, 3),
+                'rss_delta_bytes': max(0, _current_rss_bytes() - rss_before),
+                'loaded_at': time.time(),
+                'pid': os.getpid()
+            }
+            return model
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def preload(self, names=None, allow_download=True):
+        """Eagerly load models, e.g. in the gunicorn master before fork"""
+        for name in names or list(self._loaders):
+            self.get(name, allow_download=allow_download)
+
+    def stats(self):
+        """Return load-time and memory stats for every registered model"""
+        stats = {}
+        for name in self._loaders:
+            stats[name] = self._stats.get(name, {'loaded': False})
+        return {
+            'pid': os.getpid(),
+            'rss_bytes': _current_rss_bytes(),
+            'models': stats
+        }
+
+
+def preload_from_env():
+    """Preload the models named in PRELOAD_MODELS (a comma-separated list, or "all")"""
+    names = os.environ.get('PRELOAD_MODELS', '').strip()
+    if not names:
+        return []
+    registry.preload(None if names == 'all' else [n.strip() for n in names.split(',')])
+    return [name for name in registry.stats()['models'] if registry.is_loaded(name)]
+
+
+registry = ModelRegistry()
+registry.register('spacy', load_spacy)
+registry.register('sentiment', load_sentiment)
+registry.register('relevance', load_relevance)
@@ -0,0 +1,190 @@
+"""OCR fallback for image-only PDF pages.
+
+Pages whose text layer is (nearly) empty, as in scanned resumes or resumes
+exported as pictures, are rendered to grayscale images and read by
+Tesseract through pytesseract. Only those pages are rendered and OCR'd.
+Results are cached by a hash of the page image, so the same scan is never
+OCR'd twice, and uncached pages are spread over worker processes under a
+per-document time budget.
+"""
+import os
+import time
+import hashlib
+import multiprocessing
+
+from analyzer.pdf_extract import _available_cpus, _open_pdfium, _pool_context
+
+
+# auto: OCR image-only pages when Tesseract is installed; off: never
+OCR_MODE = os.environ.get('OCR_MODE', 'auto')
+# 200 DPI reads 9-11pt resume text about as well as 300 DPI, with about half the pixels to render and recognize
+OCR_DPI = int(os.environ.get('OCR_DPI', '200'))
+# Pages with fewer non-whitespace characters in their text layer are treated as images
+OCR_MIN_CHARS = int(os.environ.get('OCR_MIN_CHARS', '20'))
+OCR_MAX_SECONDS = float(os.environ.get('OCR_MAX_SECONDS', '30'))
+OCR_LANGUAGE = os.environ.get('OCR_LANGUAGE', 'eng')
+OCR_WORKERS = int(os.environ.get('OCR_WORKERS', '0')) or min(_available_cpus(), 4)
+
+_available = None
+
+
+def ocr_available():
+    """Whether pytesseract and the tesseract binary are installed (checked once per process)"""
+    global _available
+    if _available is None:
+        try:
+            import pytesseract
+            pytesseract.get_tesseract_version()
+            _available = True
+        except Exception:
+            _available = False
+    return _available
+
+
+def is_image_page(text, min_chars=OCR_MIN_CHARS):
+    return len(''.join(text.split())) < min_chars
+
+
+def render_page(document, number, dpi):
+    """Page `number` of a pypdfium2 document as a grayscale PIL image"""
+    page = document[number]
+    try:
+        return page.render(scale=dpi / 72, grayscale=True).to_pil()
+    finally:
+        page.close()
+
+
+def image_key(image, language):
+    digest = hashlib.sha256(image.tobytes())
+    digest.update(f'{image.mode}:{image.size}:{language}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _init_worker():
+    # Each worker OCRs one page at a time; Tesseract's own threads would only contend with the other workers
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+
+def _ocr_image(args):
+    """Worker entry point: OCR one page image, or return None when Tesseract runs out of time"""
+    image, language, timeout = args
+    import pytesseract
+    try:
+        return pytesseract.image_to_string(image, lang=language, timeout=timeout)
+    except RuntimeError:
+        # pytesseract kills Tesseract and raises RuntimeError on timeout
+        return None
+
+
+class OcrReader:
+    """OCR of selected pages of a PDF under a time budget.
+
+    read() renders the requested pages, takes what it can from `cache` (a
+    ContentCache, kind 'ocr'), and OCRs the rest, in parallel when there
+    are several. Pages not finished within max_seconds are left out of the
+    result and `truncated` is set.
+
+    `source` is a path or the document's bytes, as PdfExtractor.source.
+    """
+
+    def __init__(self, source, cache=None, dpi=OCR_DPI, language=OCR_LANGUAGE, max_seconds=OCR_MAX_SECONDS,
+                 workers=OCR_WORKERS):
+        self.source = source
+        self.cache = cache
+        self.dpi = dpi
+        self.language = language
+        self.max_seconds = max_seconds
+        self.workers = workers
+        self.available = ocr_available()
+        self.requested = 0
+        self.cached = 0
+        self.recognized = 0
+        self.truncated = False
+        self.seconds = 0.0
+
+    def read(self, numbers):
+        """Return {page number: text} for the pages that were OCR'd or found in the cache"""
+        self.requested = len(numbers)
+        if not numbers or not self.available:
+            return {}
+        start = time.monotonic()
+        deadline = start + self.max_seconds if self.max_seconds else None
+        texts, pending = {}, []
+        document = _open_pdfium(self.source)
+        if document is None:
+            self.available = False
+            return {}
+        try:
+            for number in numbers:
+                if deadline and time.monotonic() > deadline:
+                    self.truncated = True
+                    break
+                image = render_page(document, number, self.dpi)
+                key = image_key(image, self.language)
+                text = self.cache.get('ocr', key) if self.cache else None
+                if text is None:
+                    pending.append((number, key, image))
+                else:
+                    texts[number] = text
+                    self.cached += 1
+        finally:
+            document.close()
+
+        for number, key, text in self._recognize(pending, deadline):
+            texts[number] = text
+            self.recognized += 1
+            if self.cache:
+                self.cache.put('ocr', key, text)
+        self.seconds = time.monotonic() - start
+        return texts
+
+    def _recognize(self, pending, deadline):
+        """Yield (number, key, text) for each pending page OCR'd before the deadline"""
+        if not pending:
+            return
+        # Pool workers are daemonic and may not start their own pools
+        parallel = len(pending) > 1 and self.workers > 1 and not multiprocessing.current_process().daemon
+        if not parallel:
+            for number, key, image in pending:
+                remaining = deadline - time.monotonic() if deadline else 0
+                if deadline and remaining <= 0:
+                    self.truncated = True
+                    return
+                text = _ocr_image((image, self.language, remaining))
+                if text is None:
+                    self.truncated = True
+                    return
+                yield number, key, text
+            return
+
+        # Not forked from this process (see pdf_extract._pool_context).
+        # Leaving the with-block terminates workers still busy on pages past the deadline
+        with _pool_context().Pool(processes=min(self.workers, len(pending)), initializer=_init_worker) as pool:
+            timeout = deadline - time.monotonic() if deadline else 0
+            results = [(number, key, pool.apply_async(_ocr_image, ((image, self.language, max(timeout, 1)),)))
+                       for number, key, image in pending]
+            for number, key, result in results:
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    self.truncated = True
+                    return
+                try:
+                    text = result.get(timeout=remaining)
+                except multiprocessing.TimeoutError:
+                    self.truncated = True
+                    return
+                if text is None:
+                    self.truncated = True
+                    continue
+                yield number, key, text
+
+    def stats(self):
+        return {
+            'available': self.available,
+            'dpi': self.dpi,
+            'pages': self.requested,
+            'pages_cached': self.cached,
+            'pages_recognized': self.recognized,
+            'truncated': self.truncated,
+            'seconds': round(self.seconds, 3)
+        }
@@ -0,0 +1,59 @@
+"""Compiled regular expressions shared by the analyzer, built once at import.
+
+Patterns that run over a whole resume are written against the normalized
+text view (see normalize_text), so they need no IGNORECASE flag and see
+every run of whitespace as a single space. Contact details and bullets are
+matched against the raw text.
+"""
+import re
+import unicodedata
+
+
+# Contact details
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_PATTERN = re.compile(r'(\+\d{1,3}[- ]?)?\(?\d{3}\)?[- ]?\d{3}[- ]?\d{4}')
+LINKEDIN_PATTERN = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+# Bullets are line-based
+BULLET_PATTERN = re.compile(r'[•\-\*]\s*[^•\-\*\n]+')
+BULLET_PREFIX_PATTERN = re.compile(r'^[•\-\*\+]\s*')
+
+# Letter runs (including spaces) used as job-description keywords
+KEYWORD_PATTERN = re.compile(r'\b[a-z][a-z\s]*[a-z]\b')
+
+ACTIVE_VERBS = ['managed', 'developed', 'created', 'implemented', 'led', 'achieved', 'increased', 'decreased',
+                'improved', 'reduced']
+# One alternation; every hit is counted
+ACTIVE_VOICE_PATTERN = re.compile(r'\b(' + '|'.join(ACTIVE_VERBS) + r')\b')
+
+# Quantified-achievement patterns, in scoring order. Only presence matters, so each is a
+# separate search that stops at its first hit; one merged alternation has to walk every
+# match in the text (see benchmarks/bench_patterns.py).
+ACHIEVEMENT_PATTERNS = [r'\d+%', r'increased', r'decreased', r'improved', r'reduced', r'achieved', r'won', r'awarded']
+ACHIEVEMENT_REGEXES = [(pattern, re.compile(pattern)) for pattern in ACHIEVEMENT_PATTERNS]
+
+# Plain phrases, counted with str.count on the normalized text
+BUZZWORDS = ['synergy', 'think outside the box', 'go-getter', 'team player', 'detail-oriented', 'proactive',
+             'go-to person', 'results-driven', 'hardworking', 'multitasker', 'self-motivated', 'dynamic']
+
+
+def normalize_text(text):
+    """Unicode-normalized (NFKC), lowercased text with whitespace runs collapsed to one space.
+
+    NFKC folds PDF ligatures (e.g. "ﬁ") and full-width characters into
+    their plain forms, so they match the patterns above.
+    """
+    return WHITESPACE_PATTERN.sub(' ', unicodedata.normalize('NFKC', text).lower()).strip()
+
+
+def achievement_hits(normalized):
+    """The achievement patterns found in the normalized text"""
+    return frozenset(pattern for pattern, regex in ACHIEVEMENT_REGEXES if regex.search(normalized))
+
+
+def buzzword_counts(normalized):
+    """(buzzword, count) for each buzzword in the normalized text, in BUZZWORDS order"""
+    return tuple((word, normalized.count(word)) for word in BUZZWORDS if word in normalized)
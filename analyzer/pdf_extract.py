@@ -0,0 +1,196 @@
+import io
+import os
+import time
+import multiprocessing
+from collections import namedtuple
+
+
+# Text of one page and how long it took to extract
+PageText = namedtuple('PageText', ['number', 'text', 'seconds'])
+
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', '20'))
+PDF_MAX_SECONDS = float(os.environ.get('PDF_MAX_SECONDS', '20'))
+# Documents with more pages than this use the fast text-only mode when mode='auto'
+LAYOUT_MAX_PAGES = int(os.environ.get('PDF_LAYOUT_MAX_PAGES', '4'))
+# Documents with at least this many pages are split across worker processes
+PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', '8'))
+PAGES_PER_CHUNK = 4
+
+
+def _available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def read_source(source):
+    """A path is used as is; a file-like object is read into bytes once.
+
+    Bytes can be reopened any number of times and sent to pool workers,
+    which a stream positioned by an earlier reader cannot.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        return source
+    source.seek(0)
+    return source.read()
+
+
+def _open_plumber(source, **kwargs):
+    # Imported on first use: pdfplumber (with its pdfminer and NumPy imports) is most of this module's import time
+    import pdfplumber
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source, **kwargs)
+
+
+def _open_pdfium(source):
+    """Open the document with pypdfium2 (installed alongside pdfplumber), or return None"""
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+    return pypdfium2.PdfDocument(source)
+
+
+def count_pages(source):
+    document = _open_pdfium(source)
+    if document is not None:
+        try:
+            return len(document)
+        finally:
+            document.close()
+    with _open_plumber(source) as pdf:
+        return len(pdf.pages)
+
+
+def _iter_layout(source, start, stop, deadline=None):
+    """Extract pages [start, stop) with pdfplumber's layout-aware text extraction"""
+    with _open_plumber(source, pages=list(range(start + 1, stop + 1))) as pdf:
+        for number, page in zip(range(start, stop), pdf.pages):
+            if deadline and time.monotonic() > deadline:
+                return
+            began = time.perf_counter()
+            text = page.extract_text() or ''
+            page.close()  # Release the page's parsed objects right away
+            yield PageText(number, text, time.perf_counter() - began)
+
+
+def _iter_text(source, start, stop, deadline=None):
+    """Extract pages [start, stop) from the text layer only, skipping layout analysis"""
+    document = _open_pdfium(source)
+    if document is None:
+        with _open_plumber(source, pages=list(range(start + 1, stop + 1))) as pdf:
+            for number, page in zip(range(start, stop), pdf.pages):
+                if deadline and time.monotonic() > deadline:
+                    return
+                began = time.perf_counter()
+                text = page.extract_text_simple() or ''
+                page.close()
+                yield PageText(number, text, time.perf_counter() - began)
+        return
+
+    try:
+        for number in range(start, stop):
+            if deadline and time.monotonic() > deadline:
+                return
+            began = time.perf_counter()
+            page = document[number]
+            textpage = page.get_textpage()
+            text = textpage.get_text_range().replace('\r\n', '\n').replace('\r', '\n')
+            textpage.close()
+            page.close()
+            yield PageText(number, text, time.perf_counter() - began)
+    finally:
+        document.close()
+
+
+def _iter_pages(source, start, stop, mode, deadline=None):
+    if mode == 'layout':
+        return _iter_layout(source, start, stop, deadline)
+    return _iter_text(source, start, stop, deadline)
+
+
+def _pool_context():
+    """Start method of page pools: the fork server where there is one, otherwise spawn.
+
+    Pools are started inside analysis workers, which may have spaCy or torch
+    thread pools running; forking such a process can deadlock the child on a
+    lock another thread held.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _extract_chunk(args):
+    """Worker entry point: extract one page range"""
+    source, start, stop, mode = args
+    return list(_iter_pages(source, start, stop, mode))
+
+
+class PdfExtractor:
+    """Page-by-page PDF text extraction under a page and time budget.
+
+    pages() is a generator, so callers can stop early. Small documents are
+    read in-process; large ones are split into page ranges extracted by a
+    pool of worker processes, still yielded in page order. When the budget
+    runs out the remaining pages are skipped and `truncated` is set.
+
+    `source` is a path, the document's bytes, or a binary file-like object.
+    """
+
+    def __init__(self, source, mode='auto', max_pages=PDF_MAX_PAGES, max_seconds=PDF_MAX_SECONDS, workers=None):
+        self.source = read_source(source)
+        self.max_pages = max_pages
+        self.max_seconds = max_seconds
+        self.workers = workers or min(_available_cpus(), 4)
+        self.page_count = count_pages(self.source)
+        self.pages_to_read = min(self.page_count, max_pages) if max_pages else self.page_count
+        if mode == 'auto':
+            mode = 'layout' if self.page_count <= LAYOUT_MAX_PAGES else 'text'
+        self.mode = mode
+        self.truncated = self.pages_to_read < self.page_count
+        self.page_seconds = []
+
+    def pages(self):
+        deadline = time.monotonic() + self.max_seconds if self.max_seconds else None
+        # Pool workers are daemonic and may not start their own pools
+        parallel = (self.pages_to_read >= PARALLEL_MIN_PAGES and self.workers > 1
+                    and not multiprocessing.current_process().daemon)
+        source = self._parallel_pages(deadline) if parallel else self._sequential_pages(deadline)
+        for page in source:
+            self.page_seconds.append(round(page.seconds, 4))
+            yield page
+
+    def _sequential_pages(self, deadline):
+        extracted = 0
+        for page in _iter_pages(self.source, 0, self.pages_to_read, self.mode, deadline):
+            extracted += 1
+            yield page
+        if extracted < self.pages_to_read:
+            self.truncated = True
+
+    def _parallel_pages(self, deadline):
+        chunks = [(self.source, start, min(start + PAGES_PER_CHUNK, self.pages_to_read), self.mode)
+                  for start in range(0, self.pages_to_read, PAGES_PER_CHUNK)]
+        # Leaving the with-block terminates workers still busy on skipped chunks
+        with _pool_context().Pool(processes=min(self.workers, len(chunks))) as pool:
+            pending = [pool.apply_async(_extract_chunk, (chunk,)) for chunk in chunks]
+            for result in pending:
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    self.truncated = True
+                    return
+                try:
+                    pages = result.get(timeout=remaining)
+                except multiprocessing.TimeoutError:
+                    self.truncated = True
+                    return
+                yield from pages
+
+    def stats(self):
+        return {
+            'mode': self.mode,
+            'page_count': self.page_count,
+            'pages_extracted': len(self.page_seconds),
+            'truncated': self.truncated,
+            'page_seconds': self.page_seconds
+        }
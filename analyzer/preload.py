@@ -0,0 +1,18 @@
+"""Imported by the analysis job queue's fork server, so every job process
+starts warm: lazily imported libraries imported, the models named in
+PRELOAD_MODELS loaded and the report renderer initialized (see warmup.py)."""
+from analyzer.models import registry
+from analyzer.warmup import warmup
+from analyzer.entities import entity_model
+from analyzer.metrics import registry as metrics
+
+warmup.run()
+
+# jd_match runs for every job with a job description; its model is small, but
+# importing scikit-learn takes over a second, too much to pay in each job process
+registry.get('relevance')
+# Likewise spaCy's NER, part of every analysis when it is installed (ENTITY_MODE=auto)
+entity_model()
+
+# Job processes forked from here start with empty counters, so report the loads now
+metrics.flush()
@@ -0,0 +1,161 @@
+import os
+import hashlib
+
+from analyzer.patterns import BULLET_PREFIX_PATTERN
+from analyzer.scoring import overall_score
+
+
+# off: not computed; sync: part of every analysis; background: merged into the stored result later
+QUALITY_MODE = os.environ.get('QUALITY_MODE', 'off')
+# torch, quantized (dynamic int8 quantization of the torch model) or onnx (onnxruntime via optimum)
+QUALITY_BACKEND = os.environ.get('QUALITY_BACKEND', 'torch')
+# A distilled sentiment model; SENTIMENT_MODEL overrides it
+QUALITY_MODEL = os.environ.get('SENTIMENT_MODEL') or 'distilbert-base-uncased-finetuned-sst-2-english'
+
+# Tokens of bullets sent to the model per resume; bullets beyond it are not scored
+QUALITY_TOKEN_BUDGET = int(os.environ.get('QUALITY_TOKEN_BUDGET', '2048'))
+MAX_BULLET_TOKENS = 64
+BATCH_SIZE = 16
+# Share of the content score that comes from bullet quality
+QUALITY_WEIGHT = 0.2
+# Bullets less likely than this to read as positive are reported as weakest
+WEAK_THRESHOLD = 0.5
+
+
+class BulletClassifier:
+    """Sentiment model scoring bullets in length-sorted, padded batches"""
+
+    def __init__(self, tokenizer, model, name, backend):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.name = name
+        self.backend = backend
+        labels = {index: label.upper() for index, label in model.config.id2label.items()}
+        self.positive_index = next((index for index, label in labels.items() if label.startswith('POS')), 1)
+
+    def token_counts(self, bullets):
+        encoded = self.tokenizer(bullets, truncation=True, max_length=MAX_BULLET_TOKENS)
+        return [len(ids) for ids in encoded['input_ids']]
+
+    def predict(self, bullets):
+        """Probability that each bullet reads as positive"""
+        import torch
+
+        probabilities = [0.0] * len(bullets)
+        # Sorting by length keeps padding within each batch small
+        order = sorted(range(len(bullets)), key=lambda i: len(bullets[i]))
+        with torch.inference_mode():
+            for start in range(0, len(order), BATCH_SIZE):
+                batch = order[start:start + BATCH_SIZE]
+                inputs = self.tokenizer([bullets[i] for i in batch], padding=True, truncation=True,
+                                        max_length=MAX_BULLET_TOKENS, return_tensors='pt')
+                logits = self.model(**inputs).logits
+                positive = torch.softmax(logits, dim=-1)[:, self.positive_index].tolist()
+                for i, probability in zip(batch, positive):
+                    probabilities[i] = probability
+        return probabilities
+
+
+def load_classifier(model_name=QUALITY_MODEL, backend=QUALITY_BACKEND):
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if backend == 'onnx':
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    elif backend in ('torch', 'quantized'):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        if backend == 'quantized':
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        raise ValueError(f"Unknown quality backend: {backend}")
+    return BulletClassifier(tokenizer, model, model_name, backend)
+
+
+def clean_bullets(bullets):
+    """Bullet texts without their markers, deduplicated, ignoring fragments under three words"""
+    cleaned = []
+    seen = set()
+    for bullet in bullets:
+        text = ' '.join(BULLET_PREFIX_PATTERN.sub('', bullet).split())
+        if len(text.split()) >= 3 and text not in seen:
+            seen.add(text)
+            cleaned.append(text)
+    return cleaned
+
+
+def bullet_key(model_name, bullet):
+    return hashlib.sha256(f'{model_name}\n{bullet}'.encode('utf-8')).hexdigest()
+
+
+def assess_quality(bullets, classifier, cache=None, token_budget=QUALITY_TOKEN_BUDGET):
+    """Score a resume's bullets, reusing cached scores of bullets seen before.
+
+    Uncached bullets are sent to the model in order until token_budget is
+    spent. Returns None when the resume has no bullets to score.
+    """
+    bullets = clean_bullets(bullets)
+    keys = {bullet: bullet_key(classifier.name, bullet) for bullet in bullets}
+    cached = cache.get_many('bullet_quality', keys.values()) if cache and keys else {}
+    probabilities = {}
+    pending = []
+    for bullet in bullets:
+        if keys[bullet] in cached:
+            probabilities[bullet] = cached[keys[bullet]]
+        else:
+            pending.append(bullet)
+    cached_count = len(probabilities)
+
+    selected = []
+    used = 0
+    for bullet, tokens in zip(pending, classifier.token_counts(pending) if pending else []):
+        if used + tokens > token_budget:
+            break
+        used += tokens
+        selected.append(bullet)
+
+    if selected:
+        for bullet, probability in zip(selected, classifier.predict(selected)):
+            probabilities[bullet] = round(probability, 4)
+        if cache:
+            cache.put_many('bullet_quality', {keys[bullet]: probabilities[bullet] for bullet in selected})
+
+    scored = [bullet for bullet in bullets if bullet in probabilities]
+    if not scored:
+        return None
+    weakest = sorted((bullet for bullet in scored if probabilities[bullet] < WEAK_THRESHOLD), key=probabilities.get)
+    return {
+        'score': round(100 * sum(probabilities[bullet] for bullet in scored) / len(scored), 1),
+        'bullets_scored': len(scored),
+        'bullets_total': len(bullets),
+        'bullets_cached': cached_count,
+        'truncated': len(scored) < len(bullets),
+        'weakest': weakest[:3],
+        'model': classifier.name,
+        'backend': classifier.backend
+    }
+
+
+def blend_content(content_score, quality):
+    """Content score with bullet quality folded in"""
+    if not quality:
+        return content_score
+    return round((1 - QUALITY_WEIGHT) * content_score + QUALITY_WEIGHT * quality['score'], 1)
+
+
+def apply_quality(analysis, quality):
+    """Merge a quality assessment into an analysis result: content and overall scores, suggestions"""
+    analysis['quality'] = quality
+    if not quality:
+        return analysis
+    categories = analysis['ats_score']['categories']
+    categories['content'] = blend_content(categories['content'], quality)
+    analysis['ats_score']['overall'] = overall_score(categories)
+    if quality['weakest']:
+        analysis['suggestions']['content'].append(
+            "Reword these bullet points to sound more confident and results-focused: "
+            + '; '.join(f'"{bullet}"' for bullet in quality['weakest']) + '.'
+        )
+    return analysis
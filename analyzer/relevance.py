@@ -0,0 +1,217 @@
+"""TF-IDF relevance of resumes to job descriptions.
+
+Usage:
+    python -m analyzer.relevance fit RESUMES [--index DIR] [--min-df 2]
+    python -m analyzer.relevance rank --jd JOB_DESCRIPTION_FILE [--index DIR] [--top 20]
+
+`fit` learns the vocabulary and IDF weights from a directory or .zip of
+resumes and stores them, together with the resumes' vectors, under the index
+directory. `rank` scores one job description against every indexed resume
+with a single sparse matrix product.
+"""
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+RELEVANCE_INDEX_PATH = os.environ.get(
+    'RELEVANCE_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results', 'relevance')
+)
+
+# Tokens keep inner and trailing symbols so c++, c#, node.js and ci/cd stay whole
+VECTORIZER_OPTIONS = {
+    'lowercase': True,
+    'stop_words': 'english',
+    'token_pattern': r'(?u)\b\w[\w+#./-]*[\w+#]|\b\w\b',
+    'ngram_range': (1, 2),
+    'sublinear_tf': True,
+    'dtype': np.float32
+}
+
+# Number of matched and missing terms reported in jd_match
+TOP_TERMS = 10
+
+
+class RelevanceModel:
+    """TF-IDF vectorizer with a persisted vocabulary and IDF weights.
+
+    An untrained model (no index has been fitted yet) falls back to plain
+    term-frequency vectors built from the two documents being compared.
+    """
+
+    def __init__(self, vectorizer=None, terms=None):
+        self.vectorizer = vectorizer
+        # Column index -> term, looked up when reporting matched and missing terms
+        if terms is None and vectorizer is not None:
+            terms = vectorizer.get_feature_names_out()
+        self.terms = np.asarray(terms, dtype=object) if terms is not None else None
+
+    @property
+    def fitted(self):
+        return self.vectorizer is not None
+
+    @classmethod
+    def fit(cls, texts, min_df=2, max_features=50000):
+        vectorizer = TfidfVectorizer(min_df=min_df, max_features=max_features, **VECTORIZER_OPTIONS)
+        vectorizer.fit(texts)
+        return cls(vectorizer)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, 'vocabulary.json'), 'w') as f:
+            json.dump(self.terms.tolist(), f)
+        np.save(os.path.join(path, 'idf.npy'), self.vectorizer.idf_)
+
+    @classmethod
+    def load(cls, path=RELEVANCE_INDEX_PATH):
+        """Load the persisted vocabulary and IDF weights, or return an untrained model"""
+        vocabulary_path = os.path.join(path, 'vocabulary.json')
+        if not os.path.exists(vocabulary_path):
+            return cls()
+        with open(vocabulary_path, 'r') as f:
+            terms = json.load(f)
+        vectorizer = TfidfVectorizer(vocabulary={term: i for i, term in enumerate(terms)}, **VECTORIZER_OPTIONS)
+        vectorizer.idf_ = np.load(os.path.join(path, 'idf.npy'))
+        return cls(vectorizer, terms)
+
+    def vectorize(self, texts):
+        """L2-normalized sparse TF-IDF rows, one per text"""
+        return self.vectorizer.transform(texts)
+
+    def _pair_vectors(self, resume_text, job_text):
+        if self.fitted:
+            return self.vectorize([resume_text, job_text]), self.terms
+        vectorizer = TfidfVectorizer(use_idf=False, **VECTORIZER_OPTIONS)
+        try:
+            return vectorizer.fit_transform([resume_text, job_text]), vectorizer.get_feature_names_out()
+        except ValueError:
+            # Neither document has a single non-stop-word token
+            return None, None
+
+    def jd_match(self, resume_text, job_text, top_terms=TOP_TERMS):
+        """Cosine similarity of a resume to a job description, plus the terms behind it"""
+        vectors, terms = self._pair_vectors(resume_text, job_text)
+        if vectors is None:
+            return {'similarity': 0.0, 'matched_terms': [], 'missing_terms': [], 'model': self.model_name}
+
+        resume, job = vectors[0], vectors[1]
+        # Each shared term's share of the dot product, i.e. of the cosine similarity
+        shared = resume.multiply(job).tocoo()
+        order = np.argsort(-shared.data)[:top_terms]
+        matched_terms = [str(terms[i]) for i in shared.col[order]]
+
+        job = job.tocoo()
+        missing = np.isin(job.col, resume.indices, invert=True)
+        missing_cols, missing_weights = job.col[missing], job.data[missing]
+        missing_terms = [str(terms[i]) for i in missing_cols[np.argsort(-missing_weights)[:top_terms]]]
+
+        return {
+            'similarity': round(float(shared.data.sum()) * 100, 1),
+            'matched_terms': matched_terms,
+            'missing_terms': missing_terms,
+            'model': self.model_name
+        }
+
+    @property
+    def model_name(self):
+        return 'tfidf' if self.fitted else 'tf'
+
+
+class CorpusIndex:
+    """Stored resume vectors, so one job description is scored against all of them at once"""
+
+    def __init__(self, ids, matrix):
+        self.ids = ids
+        self.matrix = matrix.tocsr()
+
+    @classmethod
+    def build(cls, model, named_texts):
+        ids, texts = zip(*named_texts) if named_texts else ((), ())
+        return cls(list(ids), model.vectorize(list(texts)))
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        sparse.save_npz(os.path.join(path, 'corpus.npz'), self.matrix)
+        with open(os.path.join(path, 'corpus_ids.json'), 'w') as f:
+            json.dump(self.ids, f)
+
+    @classmethod
+    def load(cls, path=RELEVANCE_INDEX_PATH):
+        with open(os.path.join(path, 'corpus_ids.json'), 'r') as f:
+            ids = json.load(f)
+        return cls(ids, sparse.load_npz(os.path.join(path, 'corpus.npz')))
+
+    def similarities(self, model, job_texts):
+        """Dense (resumes x job descriptions) cosine similarity matrix from one sparse product"""
+        return (self.matrix @ model.vectorize(job_texts).T).toarray()
+
+    def rank(self, model, job_text, top=20):
+        """The `top` most similar resumes as (id, similarity) pairs, best first"""
+        scores = self.similarities(model, [job_text])[:, 0]
+        top = min(top, len(scores))
+        if top <= 0:
+            return []
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        return [(self.ids[i], round(float(scores[i]) * 100, 1)) for i in best]
+
+
+def load_relevance_model(allow_download=False):
+    """Loader for the shared model registry"""
+    return RelevanceModel.load(RELEVANCE_INDEX_PATH)
+
+
+def _read_texts(path):
+    """(name, text) for every resume in a directory or zip, skipping unreadable files"""
+    from analyzer.batch import iter_sources, read_text
+
+    for name, source in iter_sources(path):
+        try:
+            text = read_text(source)
+        except Exception as e:
+            print(f"Skipping {name}: {e}", file=sys.stderr)
+            continue
+        yield name, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit the TF-IDF relevance index and rank resumes against a job description')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    fit_parser = subparsers.add_parser('fit', help='learn vocabulary and IDF weights from resumes and index them')
+    fit_parser.add_argument('resumes', help='directory or .zip of PDF/DOCX resumes')
+    fit_parser.add_argument('--min-df', type=int, default=2, help='ignore terms found in fewer resumes')
+    rank_parser = subparsers.add_parser('rank', help='rank indexed resumes against a job description')
+    rank_parser.add_argument('--jd', required=True, help='file containing the job description')
+    rank_parser.add_argument('--top', type=int, default=20)
+    for subparser in (fit_parser, rank_parser):
+        subparser.add_argument('--index', default=RELEVANCE_INDEX_PATH, help='directory holding the fitted index')
+    args = parser.parse_args()
+
+    if args.command == 'fit':
+        named_texts = list(_read_texts(args.resumes))
+        if not named_texts:
+            parser.error('no readable resumes found')
+        min_df = args.min_df if len(named_texts) >= args.min_df else 1
+        model = RelevanceModel.fit([text for _, text in named_texts], min_df=min_df)
+        model.save(args.index)
+        CorpusIndex.build(model, named_texts).save(args.index)
+        print(f"Indexed {len(named_texts)} resumes with {len(model.terms)} terms in {args.index}")
+        return
+
+    model = RelevanceModel.load(args.index)
+    if not model.fitted:
+        parser.error(f"no fitted index in {args.index}; run 'fit' first")
+    with open(args.jd, 'r', encoding='utf-8') as f:
+        job_description = f.read()
+    for rank, (name, similarity) in enumerate(CorpusIndex.load(args.index).rank(model, job_description, args.top), 1):
+        print(f"{rank:>4}  {similarity:5.1f}  {name}")
+
+
+if __name__ == '__main__':
+    main()
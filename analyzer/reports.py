@@ -0,0 +1,226 @@
+import os
+from io import BytesIO
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import jinja2
+
+from analyzer.result_store import valid_result_id
+
+
+# Bump whenever a renderer's output changes so cached reports are re-rendered
+REPORT_TEMPLATE_VERSION = '1'
+# 'reportlab' (default) or 'xhtml2pdf'
+REPORT_RENDERER = os.environ.get('REPORT_RENDERER', 'reportlab')
+
+TEMPLATES_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# (key, title, noun used in the "no improvements needed" message)
+CATEGORIES = [
+    ('content', 'Content', 'content'),
+    ('format', 'Format', 'format'),
+    ('skills', 'Skills', 'skills'),
+    ('sections', 'Sections', 'section'),
+    ('style', 'Style', 'style')
+]
+
+COLORS = {'good': '#28a745', 'average': '#ffc107', 'poor': '#dc3545'}
+
+
+def rating(score):
+    return 'good' if score >= 80 else 'average' if score >= 60 else 'poor'
+
+
+def verdict(score):
+    if score >= 80:
+        return 'Your resume is well-optimized for ATS systems.'
+    if score >= 60:
+        return 'Your resume needs some improvements for better ATS compatibility.'
+    return 'Your resume needs significant improvements for ATS compatibility.'
+
+
+def report_context(data):
+    """Values shared by every renderer, taken from an analysis result"""
+    scores = data['ats_score']['categories']
+    suggestions = data['suggestions']
+    return {
+        'overall': data['ats_score']['overall'],
+        'verdict': verdict(data['ats_score']['overall']),
+        'categories': [
+            {
+                'key': key,
+                'title': title,
+                'noun': noun,
+                'score': scores[key],
+                'color': COLORS[rating(scores[key])],
+                'suggestions': suggestions.get(key, [])
+            }
+            for key, title, noun in CATEGORIES
+        ],
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'rating': rating
+    }
+
+
+class Renderer:
+    """Turns an analysis result into PDF bytes"""
+
+    name = None
+
+    def render(self, data):
+        raise NotImplementedError
+
+
+class XhtmlRenderer(Renderer):
+    """templates/report.html converted with xhtml2pdf, as the report was originally produced"""
+
+    name = 'xhtml2pdf'
+
+    def __init__(self):
+        # The template is compiled once and reused for every report
+        environment = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATES_FOLDER), autoescape=True)
+        self.template = environment.get_template('report.html')
+
+    def render(self, data):
+        from xhtml2pdf import pisa
+
+        html = self.template.render(**report_context(data))
+        result = BytesIO()
+        pdf = pisa.pisaDocument(BytesIO(html.encode('UTF-8')), result)
+        if pdf.err:
+            raise RuntimeError('Could not render the PDF report')
+        return result.getvalue()
+
+
+class ReportlabRenderer(Renderer):
+    """The same report laid out directly with reportlab, without parsing HTML and CSS"""
+
+    name = 'reportlab'
+
+    def render(self, data):
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import cm
+        from reportlab.graphics.shapes import Drawing, Rect
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, ListFlowable, ListItem
+
+        context = report_context(data)
+        styles = getSampleStyleSheet()
+        centered = ParagraphStyle('centered', parent=styles['Normal'], alignment=1)
+        score_style = ParagraphStyle('score', parent=styles['Title'], textColor=colors.white, fontSize=32, leading=36)
+        timestamp_style = ParagraphStyle('timestamp', parent=styles['Normal'], alignment=2, fontSize=9,
+                                         textColor=colors.HexColor('#666666'))
+
+        def progress_bar(score, color):
+            bar = Drawing(300, 14)
+            bar.add(Rect(0, 0, 300, 14, rx=7, ry=7, fillColor=colors.HexColor('#f0f0f0'), strokeColor=None))
+            if score > 0:
+                bar.add(Rect(0, 0, max(14, 3 * min(score, 100)), 14, rx=7, ry=7,
+                             fillColor=colors.HexColor(color), strokeColor=None))
+            return bar
+
+        story = [
+            Paragraph('Resume Analysis Report', styles['Title']),
+            Paragraph("This report provides an analysis of your resume's ATS compatibility "
+                      "and suggestions for improvement.", centered),
+            Spacer(1, 0.8 * cm),
+            Paragraph('Overall ATS Score', styles['Heading2'])
+        ]
+
+        overall = context['overall']
+        score_box = Table([[Paragraph(str(overall), score_style)]], colWidths=[3 * cm], rowHeights=[3 * cm])
+        score_box.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor(COLORS[rating(overall)])),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
+        ]))
+        story += [score_box, Spacer(1, 0.3 * cm), Paragraph(context['verdict'], styles['Normal']), Spacer(1, 0.5 * cm)]
+
+        story.append(Paragraph('Category Scores', styles['Heading2']))
+        rows = [[f"{category['title']}:", str(category['score']), progress_bar(category['score'], category['color'])]
+                for category in context['categories']]
+        category_table = Table(rows, colWidths=[3 * cm, 1.5 * cm, None])
+        category_table.setStyle(TableStyle([
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
+            ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6)
+        ]))
+        story += [category_table, Spacer(1, 0.5 * cm)]
+
+        story.append(Paragraph('Improvement Suggestions', styles['Heading2']))
+        for category in context['categories']:
+            story.append(Paragraph(f"{category['title']} Suggestions", styles['Heading3']))
+            if category['suggestions']:
+                story.append(ListFlowable(
+                    [ListItem(Paragraph(escape(suggestion), styles['Normal'])) for suggestion in category['suggestions']],
+                    bulletType='bullet'
+                ))
+            else:
+                story.append(Paragraph(f"Great job! No {category['noun']} improvements needed.", styles['Normal']))
+        story += [Spacer(1, 0.5 * cm), Paragraph(f"Report generated on: {context['timestamp']}", timestamp_style)]
+
+        def footer(canvas, doc):
+            canvas.saveState()
+            canvas.setFont('Helvetica', 9)
+            canvas.setFillColor(colors.HexColor('#666666'))
+            canvas.drawCentredString(A4[0] / 2, 1 * cm, f"Page {doc.page}")
+            canvas.restoreState()
+
+        result = BytesIO()
+        document = SimpleDocTemplate(result, pagesize=A4, leftMargin=2 * cm, rightMargin=2 * cm,
+                                     topMargin=2 * cm, bottomMargin=2 * cm, title='Resume Analysis Report')
+        document.build(story, onFirstPage=footer, onLaterPages=footer)
+        return result.getvalue()
+
+
+RENDERERS = {renderer.name: renderer for renderer in (XhtmlRenderer, ReportlabRenderer)}
+_renderers = {}
+
+
+def get_renderer(name=None):
+    """Shared renderer instance by name (REPORT_RENDERER by default)"""
+    name = name or REPORT_RENDERER
+    if name not in RENDERERS:
+        raise ValueError(f"Unknown report renderer: {name}")
+    if name not in _renderers:
+        _renderers[name] = RENDERERS[name]()
+    return _renderers[name]
+
+
+class ReportCache:
+    """Rendered PDF reports on disk, one file per (result id, renderer, template version)"""
+
+    def __init__(self, root, renderer=None, version=REPORT_TEMPLATE_VERSION):
+        self.root = root
+        self.renderer = renderer or REPORT_RENDERER
+        self.version = version
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, result_id):
+        if not valid_result_id(result_id):
+            raise ValueError(f"Invalid result id: {result_id!r}")
+        return os.path.join(self.root, result_id[:2], f'{result_id}.{self.renderer}.v{self.version}.pdf')
+
+    def etag(self, result_id):
+        return f'{result_id}-{self.renderer}-v{self.version}'
+
+    def get(self, result_id):
+        """Path of the cached report, or None if it has not been rendered yet"""
+        path = self.path(result_id)
+        return path if os.path.exists(path) else None
+
+    def render(self, result_id, data):
+        """Render the report, store it and return its path"""
+        pdf_content = get_renderer(self.renderer).render(data)
+        path = self.path(result_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write atomically so a concurrent download never sees a partial file
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(pdf_content)
+        os.replace(tmp_path, path)
+        return path
+
+    def get_or_render(self, result_id, data):
+        return self.get(result_id) or self.render(result_id, data)
@@ -0,0 +1,393 @@
+"""Storage for analysis results, looked up by result id.
+
+Results are stored in the compact encoding of analyzer/serialization.py
+(RESULT_ENCODING=compact, the default) or as plain JSON (RESULT_ENCODING=json).
+Either backend reads both, so results written before the switch stay readable.
+
+Usage:
+    python -m analyzer.result_store migrate [--source results/]
+    python -m analyzer.result_store prune
+    python -m analyzer.result_store compact
+"""
+import os
+import re
+import json
+import glob
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+from contextlib import contextmanager
+
+from analyzer import serialization
+
+
+RESULT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+# Result files written before the store existed: <timestamp>_<result_id>_result.json
+LEGACY_FILENAME_PATTERN = re.compile(r'^(\d{8}_\d{6})_(.+)_result\.json$')
+# 'compact' (see analyzer/serialization.py) or 'json'
+RESULT_ENCODING = os.environ.get('RESULT_ENCODING', 'compact')
+
+
+def valid_result_id(result_id):
+    return bool(RESULT_ID_PATTERN.match(result_id or ''))
+
+
+def _select(data, fields):
+    return data if fields is None else {field: data[field] for field in fields if field in data}
+
+
+class ResultStore:
+    """Interface for result backends: O(1) get/put by id plus TTL expiry"""
+
+    def __init__(self, ttl=None, encoding=RESULT_ENCODING):
+        # Seconds a result is kept; None keeps results forever
+        self.ttl = ttl
+        if encoding not in ('compact', 'json'):
+            raise ValueError(f"Unknown result encoding: {encoding}")
+        self.encoding = encoding
+
+    def _expires(self, created, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        return created + ttl if ttl else None
+
+    def get(self, result_id, fields=None):
+        """The result, or only its top-level `fields`; None if there is none"""
+        raise NotImplementedError
+
+    def get_encoded(self, result_id):
+        """The result in the compact encoding, for serving it without decoding (see serialization.response_body)"""
+        raise NotImplementedError
+
+    def put(self, result_id, data, created=None, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, result_id):
+        raise NotImplementedError
+
+    def expire(self, now=None):
+        """Delete expired results and return how many were removed"""
+        raise NotImplementedError
+
+    def items(self):
+        """Yield (result_id, data) for every unexpired result"""
+        raise NotImplementedError
+
+    def compact(self):
+        """Rewrite results stored in another encoding than this store's; returns how many were rewritten"""
+        raise NotImplementedError
+
+    def __contains__(self, result_id):
+        return self.get(result_id, fields=[]) is not None
+
+
+class SQLiteResultStore(ResultStore):
+    """Results keyed by id in an embedded SQLite database (the default backend).
+
+    The data column holds a BLOB in the compact encoding or JSON TEXT.
+    """
+
+    def __init__(self, path, ttl=None, encoding=RESULT_ENCODING):
+        super().__init__(ttl, encoding)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS results (
+                    id TEXT PRIMARY KEY,
+                    created REAL NOT NULL,
+                    expires REAL,
+                    data TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS results_expires ON results (expires)')
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _fetch(self, result_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT data FROM results WHERE id = ? AND (expires IS NULL OR expires > ?)',
+                (result_id, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _encode(self, data):
+        return serialization.encode(data) if self.encoding == 'compact' else json.dumps(data)
+
+    @staticmethod
+    def _decode(value, fields=None):
+        if isinstance(value, bytes):
+            return serialization.decode(value, fields)
+        return _select(json.loads(value), fields)
+
+    def get(self, result_id, fields=None):
+        value = self._fetch(result_id)
+        return None if value is None else self._decode(value, fields)
+
+    def get_encoded(self, result_id):
+        value = self._fetch(result_id)
+        if value is None or isinstance(value, bytes):
+            return value
+        return serialization.encode(json.loads(value))
+
+    def put(self, result_id, data, created=None, ttl=None):
+        created = created or time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO results (id, created, expires, data) VALUES (?, ?, ?, ?)',
+                (result_id, created, self._expires(created, ttl), self._encode(data))
+            )
+
+    def __contains__(self, result_id):
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT 1 FROM results WHERE id = ? AND (expires IS NULL OR expires > ?)', (result_id, time.time())
+            ).fetchone() is not None
+
+    def delete(self, result_id):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM results WHERE id = ?', (result_id,))
+
+    def expire(self, now=None):
+        with self._connect() as conn:
+            cursor = conn.execute('DELETE FROM results WHERE expires IS NOT NULL AND expires <= ?', (now or time.time(),))
+            return cursor.rowcount
+
+    def items(self):
+        with self._connect() as conn:
+            cursor = conn.execute('SELECT id, data FROM results WHERE expires IS NULL OR expires > ?', (time.time(),))
+            for result_id, data in cursor:
+                yield result_id, self._decode(data)
+
+    def compact(self, batch_size=500):
+        stale = 'text' if self.encoding == 'compact' else 'blob'
+        with self._connect() as conn:
+            result_ids = [row[0] for row in conn.execute('SELECT id FROM results WHERE typeof(data) = ?', (stale,))]
+            for start in range(0, len(result_ids), batch_size):
+                conn.execute('BEGIN IMMEDIATE')
+                for result_id in result_ids[start:start + batch_size]:
+                    row = conn.execute('SELECT data FROM results WHERE id = ?', (result_id,)).fetchone()
+                    if row is not None:
+                        conn.execute('UPDATE results SET data = ? WHERE id = ?',
+                                     (self._encode(self._decode(row[0])), result_id))
+                conn.execute('COMMIT')
+        return len(result_ids)
+
+
+class ShardedDirectoryResultStore(ResultStore):
+    """One file per result under root/<id[:2]>/<id[2:4]>/: <id>.result in the
+    compact encoding (with created/expires in its header) or <id>.json.
+
+    Expiry is tracked in hourly bucket files under root/_expiry listing the
+    ids due in that hour, so pruning reads only the due buckets instead of
+    walking the shards.
+    """
+
+    SUFFIXES = {'compact': '.result', 'json': '.json'}
+
+    def __init__(self, root, ttl=None, encoding=RESULT_ENCODING):
+        super().__init__(ttl, encoding)
+        self.root = root
+        self.expiry_dir = os.path.join(root, '_expiry')
+        os.makedirs(self.expiry_dir, exist_ok=True)
+
+    def _path(self, result_id, encoding=None):
+        if not valid_result_id(result_id):
+            raise ValueError(f"Invalid result id: {result_id!r}")
+        suffix = self.SUFFIXES[encoding or self.encoding]
+        return os.path.join(self.root, result_id[:2], result_id[2:4], f'{result_id}{suffix}')
+
+    def _read(self, result_id):
+        """(encoding, record, content) of the stored result in either encoding, this store's first, or None.
+
+        record holds created and expires; content is the encoded result, or
+        for JSON files the parsed file whose 'data' is the result.
+        """
+        for encoding in sorted(self.SUFFIXES, key=lambda name: name != self.encoding):
+            try:
+                with open(self._path(result_id, encoding), 'rb') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                continue
+            if encoding == 'compact':
+                return encoding, serialization.read_header(content)[0]['meta'], content
+            record = json.loads(content)
+            return encoding, record, record
+        return None
+
+    def _load(self, result_id):
+        try:
+            stored = self._read(result_id)
+        except ValueError:
+            return None
+        if stored is None or (stored[1].get('expires') and stored[1]['expires'] <= time.time()):
+            return None
+        return stored
+
+    def get(self, result_id, fields=None):
+        stored = self._load(result_id)
+        if stored is None:
+            return None
+        encoding, _, content = stored
+        if encoding == 'compact':
+            return serialization.decode(content, fields)
+        return _select(content['data'], fields)
+
+    def get_encoded(self, result_id):
+        stored = self._load(result_id)
+        if stored is None:
+            return None
+        encoding, _, content = stored
+        return content if encoding == 'compact' else serialization.encode(content['data'])
+
+    def __contains__(self, result_id):
+        return self._load(result_id) is not None
+
+    def put(self, result_id, data, created=None, ttl=None):
+        created = created or time.time()
+        expires = self._expires(created, ttl)
+        path = self._path(result_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write atomically so readers never see a partial file
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            record = {'created': created, 'expires': expires}
+            if self.encoding == 'compact':
+                f.write(serialization.encode(data, meta=record))
+            else:
+                f.write(json.dumps(dict(record, data=data)).encode())
+        os.replace(tmp_path, path)
+        # Drop the copy in the other encoding, which would otherwise shadow or outlive this one
+        self._remove(result_id, [encoding for encoding in self.SUFFIXES if encoding != self.encoding])
+
+        if expires:
+            bucket = datetime.fromtimestamp(expires).strftime('%Y%m%d%H')
+            with open(os.path.join(self.expiry_dir, f'{bucket}.txt'), 'a') as f:
+                f.write(result_id + '\n')
+
+    def _remove(self, result_id, encodings):
+        for encoding in encodings:
+            try:
+                os.remove(self._path(result_id, encoding))
+            except FileNotFoundError:
+                pass
+
+    def delete(self, result_id):
+        try:
+            self._remove(result_id, self.SUFFIXES)
+        except ValueError:
+            pass
+
+    def expire(self, now=None):
+        now = now or time.time()
+        # Only buckets whose whole hour has passed are due
+        current_bucket = datetime.fromtimestamp(now).strftime('%Y%m%d%H')
+        removed = 0
+        for name in sorted(os.listdir(self.expiry_dir)):
+            bucket = name[:-len('.txt')]
+            if not name.endswith('.txt') or bucket >= current_bucket:
+                continue
+            bucket_path = os.path.join(self.expiry_dir, name)
+            with open(bucket_path, 'r') as f:
+                result_ids = [line.strip() for line in f if line.strip()]
+            for result_id in result_ids:
+                try:
+                    stored = self._read(result_id)
+                except ValueError:
+                    continue
+                expires = stored[1].get('expires') if stored else None
+                # The result may have been re-saved with a later expiry
+                if expires and expires <= now:
+                    self.delete(result_id)
+                    removed += 1
+            os.remove(bucket_path)
+        return removed
+
+    def _result_ids(self):
+        paths = glob.glob(os.path.join(self.root, '??', '??', '*'))
+        names = (os.path.basename(path) for path in paths)
+        return sorted({os.path.splitext(name)[0] for name in names if os.path.splitext(name)[1] in self.SUFFIXES.values()})
+
+    def items(self):
+        for result_id in self._result_ids():
+            data = self.get(result_id)
+            if data is not None:
+                yield result_id, data
+
+    def compact(self):
+        rewritten = 0
+        for result_id in self._result_ids():
+            stored = self._read(result_id)
+            if stored is None or stored[0] == self.encoding:
+                continue
+            encoding, record, content = stored
+            data = serialization.decode(content) if encoding == 'compact' else content['data']
+            # Same creation and expiry times; put() lists the id in its expiry bucket again, which is harmless
+            created, expires = record.get('created'), record.get('expires')
+            self.put(result_id, data, created=created, ttl=(expires - created) if expires and created else 0)
+            rewritten += 1
+        return rewritten
+
+
+def open_result_store(backend=None, path=None, ttl=None, encoding=None):
+    """Open the configured result store (RESULT_STORE_BACKEND / RESULT_STORE_PATH / RESULT_TTL_DAYS / RESULT_ENCODING)"""
+    encoding = encoding or RESULT_ENCODING
+    backend = backend or os.environ.get('RESULT_STORE_BACKEND', 'sqlite')
+    results_folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
+    if ttl is None and os.environ.get('RESULT_TTL_DAYS'):
+        ttl = float(os.environ['RESULT_TTL_DAYS']) * 86400
+
+    if backend == 'sqlite':
+        path = path or os.environ.get('RESULT_STORE_PATH') or os.path.join(results_folder, 'results.db')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return SQLiteResultStore(path, ttl=ttl, encoding=encoding)
+    if backend == 'sharded':
+        path = path or os.environ.get('RESULT_STORE_PATH') or os.path.join(results_folder, 'store')
+        return ShardedDirectoryResultStore(path, ttl=ttl, encoding=encoding)
+    raise ValueError(f"Unknown result store backend: {backend}")
+
+
+def migrate_legacy_results(store, source):
+    """Import <timestamp>_<id>_result.json files from the old results folder"""
+    imported = 0
+    for path in sorted(glob.glob(os.path.join(source, '*_result.json'))):
+        match = LEGACY_FILENAME_PATTERN.match(os.path.basename(path))
+        if not match:
+            continue
+        with open(path, 'r') as f:
+            data = json.load(f)
+        result_id = data.get('result_id') or match.group(2)
+        created = datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').timestamp()
+        store.put(result_id, data, created=created)
+        imported += 1
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the analysis result store')
+    parser.add_argument('command', choices=['migrate', 'prune', 'compact'])
+    parser.add_argument('--backend', default=None, help='sqlite (default) or sharded')
+    parser.add_argument('--path', default=None, help='database file or directory of the store')
+    parser.add_argument('--source', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results'),
+                        help='folder holding legacy *_result.json files')
+    args = parser.parse_args()
+
+    store = open_result_store(args.backend, args.path)
+    if args.command == 'migrate':
+        print(f"Imported {migrate_legacy_results(store, args.source)} results")
+    elif args.command == 'compact':
+        print(f"Rewrote {store.compact()} results as {store.encoding}")
+    else:
+        print(f"Removed {store.expire()} expired results")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,97 +1,162 @@
 import os
-import re
 import json
-import spacy
-import numpy as np
-from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer
-from transformers import pipeline
+
+# Shared, lazily loaded NLP models
+from analyzer.models import registry
+from analyzer.features import extract_features
+from analyzer.sections import SECTION_HEADERS, segment_resume
+from analyzer.entities import entity_model, extract_entities
+from analyzer.patterns import EMAIL_PATTERN, PHONE_PATTERN, LINKEDIN_PATTERN
+from analyzer.quality import QUALITY_MODE, assess_quality, apply_quality
+from analyzer.metrics import BYTES_PROCESSED, timed
+from analyzer.scoring import (
+    SCORERS, JD_DEPENDENT_CATEGORIES, score_all, overall_score, suggest_all,
+    score_content, score_format, score_skills, score_sections, score_style
+)
 
 # For PDF parsing
-import pdfplumber
+from analyzer.pdf_extract import PdfExtractor
+from analyzer.ocr import OCR_MODE, OcrReader, is_image_page
 
 # For DOCX parsing
-from docx import Document
+from analyzer.docx_extract import DocxExtractor
+
+# Bump whenever extraction, parsing or scoring changes so cached results are not reused
+ANALYZER_VERSION = '7'
+
+def _source_size(source):
+    """Size in bytes of a file path or a seekable stream"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+def extract_resume_text(source, extension, ocr_cache=None, timings=None):
+    """(text, extraction stats or None) of a PDF or DOCX resume, given as a path or a binary
+    file-like object, without parsing it. PDF pages without a text layer are OCR'd."""
+    if extension in ('.pdf', '.docx'):
+        BYTES_PROCESSED.inc(extension[1:], amount=_source_size(source))
+    if extension == '.docx':
+        return DocxExtractor(source).text(), None
+    if extension != '.pdf':
+        raise ValueError(f"Unsupported file format: {extension}")
+
+    extractor = PdfExtractor(source)
+    pages = {page.number: page.text for page in extractor.pages()}
+    stats = extractor.stats()
+    image_pages = [number for number, text in pages.items() if is_image_page(text)]
+    if image_pages and OCR_MODE != 'off':
+        reader = OcrReader(extractor.source, ocr_cache)
+        pages.update(timed({} if timings is None else timings, 'ocr', reader.read, image_pages))
+        stats['ocr'] = reader.stats()
+    return '\n'.join(pages.values()), stats
 
 class ResumeAnalyzer:
-    def __init__(self, resume_path, job_description=''):
-        self.resume_path = resume_path
+    def __init__(self, resume, job_description='', extension=None, ocr_cache=None, entities=True):
+        """`resume` is a file path or a binary file-like object (e.g. BytesIO or the
+        SpooledTemporaryFile of an upload); give `extension` when it has no file name.
+        `ocr_cache` is an optional ContentCache for the OCR text of scanned pages.
+        With entities=False, NER is left to the caller (batch.py runs it for many resumes at once)."""
+        self.resume_source = resume
+        self.resume_path = resume if isinstance(resume, (str, os.PathLike)) else None
         self.job_description = job_description
         self.resume_text = ''
-        self.file_extension = os.path.splitext(resume_path)[1].lower()
-        
-        # Load NLP model
-        try:
-            self.nlp = spacy.load('en_core_web_md')
-        except OSError:
-            # If model not found, download it
-            import subprocess
-            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_md"])
-            self.nlp = spacy.load('en_core_web_md')
-        
-        # Initialize sentiment analyzer for content quality assessment
-        self.sentiment_analyzer = pipeline('sentiment-analysis')
+        if extension is None:
+            extension = os.path.splitext(self.resume_path or getattr(resume, 'name', None) or '')[1]
+        self.file_extension = extension.lower()
+        self.extraction_stats = None
+        self.ocr_cache = ocr_cache
+        self.entities = entities
+        self._features = None
+        self._segmentation = None
+        self.profile = None
+        self.quality = None
+        self.quality_cache = None  # Optional ContentCache for per-bullet quality scores
+        self.timings = {}  # Milliseconds per stage, reported in the analysis result
         
         # Extract text from resume
-        self.extract_text()
+        timed(self.timings, 'extract', self.extract_text)
         
         # Parse resume sections
-        self.parsed_resume = self.parse_resume()
+        self.parsed_resume = timed(self.timings, 'parse', self.parse_resume)
+    
+    @classmethod
+    def from_text(cls, resume_text, job_description='', parsed_resume=None, profile=None, quality=None):
+        """Build an analyzer over already-extracted resume text.
+
+        Artifacts cached from an earlier analysis of the same resume can be
+        passed in: parsed sections, the job-independent profile (see
+        resume_profile) and a quality assessment. Only what is missing is
+        recomputed, so a new job description costs just the skills score and
+        jd_match.
+        """
+        analyzer = cls.__new__(cls)
+        analyzer.resume_source = None
+        analyzer.resume_path = None
+        analyzer.job_description = job_description
+        analyzer.resume_text = resume_text
+        analyzer.file_extension = None
+        analyzer.extraction_stats = None
+        analyzer.ocr_cache = None
+        analyzer.entities = True
+        analyzer._features = None
+        analyzer._segmentation = None
+        analyzer.profile = profile
+        analyzer.quality = quality
+        analyzer.quality_cache = None  # Optional ContentCache for per-bullet quality scores
+        analyzer.timings = {}  # Milliseconds per stage, reported in the analysis result
+        if parsed_resume is None:
+            parsed_resume = timed(analyzer.timings, 'parse', analyzer.parse_resume)
+        analyzer.parsed_resume = parsed_resume
+        return analyzer
+    
+    @property
+    def nlp(self):
+        """spaCy NER pipeline, loaded once per process on first use"""
+        return registry.get('spacy')
+    
+    @property
+    def sentiment_analyzer(self):
+        """Bullet sentiment classifier for content quality assessment, loaded on first use"""
+        return registry.get('sentiment')
+    
+    def assess_quality(self):
+        """Score the resume's bullet points with the sentiment model (see analyzer/quality.py)"""
+        self.quality = assess_quality(self.features.bullets, self.sentiment_analyzer, self.quality_cache)
+        return self.quality
         
     def extract_text(self):
         """Extract text from resume file based on file type"""
-        if self.file_extension == '.pdf':
-            self.extract_text_from_pdf()
-        elif self.file_extension == '.docx':
-            self.extract_text_from_docx()
-        else:
-            raise ValueError(f"Unsupported file format: {self.file_extension}")
-    
-    def extract_text_from_pdf(self):
-        """Extract text from PDF file"""
-        text = ""
-        with pdfplumber.open(self.resume_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-        self.resume_text = text
-    
-    def extract_text_from_docx(self):
-        """Extract text from DOCX file"""
-        doc = Document(self.resume_path)
-        text = [paragraph.text for paragraph in doc.paragraphs]
-        self.resume_text = '\n'.join(text)
+        self.resume_text, self.extraction_stats = extract_resume_text(
+            self.resume_source, self.file_extension, self.ocr_cache, self.timings
+        )
     
     def parse_resume(self):
         """Parse resume into sections"""
-        # Basic section detection using regex patterns
-        sections = {
-            'contact_info': self.extract_contact_info(),
-            'summary': self.extract_section('summary|profile|objective'),
-            'experience': self.extract_section('experience|work|employment|history'),
-            'education': self.extract_section('education|academic|qualification'),
-            'skills': self.extract_section('skills|expertise|competencies|technologies'),
-            'projects': self.extract_section('projects|portfolio'),
-            'certifications': self.extract_section('certifications|certificates'),
-            'languages': self.extract_section('languages'),
-            'interests': self.extract_section('interests|hobbies')
-        }
+        # All sections come from a single pass of the section segmenter
+        sections = {'contact_info': self.extract_contact_info()}
+        for section in SECTION_HEADERS:
+            sections[section] = self.segmentation.section_text(section)
+        # Name, employers, dates and locations found by spaCy NER, when it is installed
+        nlp = entity_model() if self.entities else None
+        if nlp is not None:
+            sections['entities'] = timed(self.timings, 'entities', extract_entities, self.segmentation, nlp)
         return sections
     
     def extract_contact_info(self):
         """Extract contact information from resume"""
         # Extract email
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        email_matches = re.findall(email_pattern, self.resume_text)
+        email_matches = EMAIL_PATTERN.findall(self.resume_text)
         email = email_matches[0] if email_matches else ''
         
         # Extract phone number
-        phone_pattern = r'(\+\d{1,3}[- ]?)?\(?\d{3}\)?[- ]?\d{3}[- ]?\d{4}'
-        phone_matches = re.findall(phone_pattern, self.resume_text)
+        phone_matches = PHONE_PATTERN.findall(self.resume_text)
         phone = phone_matches[0] if phone_matches else ''
         
         # Extract LinkedIn
-        linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-        linkedin_matches = re.findall(linkedin_pattern, self.resume_text, re.IGNORECASE)
+        linkedin_matches = LINKEDIN_PATTERN.findall(self.resume_text)
         linkedin = linkedin_matches[0] if linkedin_matches else ''
         
         return {
@@ -100,89 +165,49 @@ class ResumeAnalyzer:
             'linkedin': linkedin
         }
     
-    def extract_section(self, section_pattern):
-        """Extract a specific section from the resume text"""
-        # Split text into lines for more accurate section detection
-        lines = self.resume_text.split('\n')
-        
-        section_text = []
-        in_section = False
-        section_header_found = False
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:  # Skip empty lines
-                continue
-                
-            # Check if this line starts a new section
-            if re.search(f"^\s*({section_pattern})\s*[:\-]?", line, re.IGNORECASE):
-                in_section = True
-                section_header_found = True
-                continue
-            
-            # Check if we've moved to a different section
-            # Look for common section headers that would indicate the end of current section
-            next_section_pattern = r"^\s*(EDUCATION|EXPERIENCE|WORK|PROJECTS|CERTIFICATIONS|SUMMARY|OBJECTIVE|CONTACT)\s*[:\-]?"
-            if in_section and re.search(next_section_pattern, line, re.IGNORECASE):
-                in_section = False
-            
-            # Special handling for skills section
-            if section_pattern.lower().find('skills') >= 0:
-                # If we're in the skills section, look for bullet points, commas, or plain text
-                if in_section:
-                    # Remove bullet points and other common list markers
-                    cleaned_line = re.sub(r'^[•\-\*\+]\s*', '', line)
-                    # Split by commas if present
-                    if ',' in cleaned_line:
-                        skills = [skill.strip() for skill in cleaned_line.split(',')]
-                        section_text.extend(skills)
-                    else:
-                        section_text.append(cleaned_line)
-            else:
-                if in_section:
-                    section_text.append(line)
-        
-        # If no explicit skills section was found, try to extract skills from the entire text
-        if section_pattern.lower().find('skills') >= 0 and not section_header_found:
-            # Look for skill-like patterns throughout the text
-            skill_patterns = [
-                r'\b(?:proficient|experienced|skilled|expertise)\s+in\s+([^.]+)',
-                r'\b(?:knowledge|understanding)\s+of\s+([^.]+)',
-                r'\b(?:technologies|tools|frameworks|languages)\s*:\s*([^.]+)'
-            ]
-            
-            for pattern in skill_patterns:
-                matches = re.finditer(pattern, self.resume_text, re.IGNORECASE)
-                for match in matches:
-                    skills_text = match.group(1)
-                    # Split by commas if present
-                    if ',' in skills_text:
-                        skills = [skill.strip() for skill in skills_text.split(',')]
-                        section_text.extend(skills)
-                    else:
-                        section_text.append(skills_text.strip())
-        
-        # Clean and deduplicate skills
-        if section_pattern.lower().find('skills') >= 0:
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_skills = []
-            for skill in section_text:
-                skill = skill.strip()
-                if skill.lower() not in seen and len(skill) > 1:  # Ignore single characters
-                    seen.add(skill.lower())
-                    unique_skills.append(skill)
-            return '\n'.join(unique_skills)
-        
-        return '\n'.join(section_text)
+    @property
+    def segmentation(self):
+        """Section offsets found in one pass over the resume text, computed once per analyzer"""
+        if self._segmentation is None:
+            self._segmentation = segment_resume(self.resume_text)
+        return self._segmentation
+    
+    @property
+    def features(self):
+        """Features extracted from the resume, computed once per analyzer"""
+        if self._features is None:
+            self._features = timed(self.timings, 'features', extract_features,
+                                   self.resume_text, self.parsed_resume, self.job_description)
+        return self._features
+    
+    def resume_profile(self):
+        """Scores and suggestions of the categories that do not depend on the job description.
+
+        Computed once per resume; callers cache it (JSON-serializable) and
+        pass it back through from_text.
+        """
+        if self.profile is None:
+            features = self.features
+            scores = {category: timed(self.timings, f'evaluate_{category}', scorer, features)
+                      for category, scorer in SCORERS.items() if category not in JD_DEPENDENT_CATEGORIES}
+            suggestions = timed(self.timings, 'suggestions', suggest_all, features, scores)
+            self.profile = {'scores': scores, 'suggestions': suggestions}
+        return self.profile
     
     def analyze(self):
         """Analyze the resume and return results"""
         # Calculate ATS score
         ats_score = self.calculate_ats_score()
         
-        # Generate suggestions
-        suggestions = self.generate_suggestions()
+        # Job-independent suggestions come with the profile; only the rest depend on this job description
+        categories = ats_score['categories']
+        job_suggestions = timed(self.timings, 'suggestions', suggest_all, self.features,
+                                {category: categories[category] for category in JD_DEPENDENT_CATEGORIES})
+        profile_suggestions = self.resume_profile()['suggestions']
+        # Copies, so merging quality suggestions below leaves the (cached) profile untouched
+        suggestions = {category: list(profile_suggestions[category] if category in profile_suggestions
+                                      else job_suggestions[category])
+                       for category in SCORERS}
         
         # Prepare the analysis result
         analysis_result = {
@@ -191,323 +216,64 @@ class ResumeAnalyzer:
             'parsed_resume': self.parsed_resume
         }
         
+        # TF-IDF similarity to the job description, when one was given
+        if self.features.job:
+            analysis_result['jd_match'] = timed(
+                self.timings, 'jd_match',
+                lambda: registry.get('relevance').jd_match(self.resume_text, self.features.job.text)
+            )
+        
+        # Bullet quality from the sentiment model: carried over from an earlier analysis, or assessed now
+        if self.quality is not None:
+            apply_quality(analysis_result, self.quality)
+        elif QUALITY_MODE == 'sync':
+            apply_quality(analysis_result, timed(self.timings, 'quality', self.assess_quality))
+        
+        # Page counts and per-page timings, when text was extracted from a PDF
+        if self.extraction_stats:
+            analysis_result['extraction'] = self.extraction_stats
+        
+        # Where the time went, per stage (see analyzer/metrics.py)
+        analysis_result['timings'] = dict(self.timings)
+        
         return analysis_result
     
     def calculate_ats_score(self):
         """Calculate ATS score based on various factors"""
-        scores = {
-            'content': self.evaluate_content(),
-            'format': self.evaluate_format(),
-            'skills': self.evaluate_skills(),
-            'sections': self.evaluate_sections(),
-            'style': self.evaluate_style()
-        }
-        
-        # Calculate overall score (weighted average)
-        weights = {
-            'content': 0.35,
-            'format': 0.15,
-            'skills': 0.25,
-            'sections': 0.15,
-            'style': 0.10
-        }
-        
-        overall_score = sum(scores[category] * weights[category] for category in scores)
+        # Timed per category, so a slow scorer shows up on its own
+        features = self.features
+        profile_scores = self.resume_profile()['scores']
+        scores = {category: profile_scores[category] if category in profile_scores
+                  else timed(self.timings, f'evaluate_{category}', scorer, features)
+                  for category, scorer in SCORERS.items()}
         
         return {
-            'overall': round(overall_score, 1),
+            'overall': overall_score(scores),
             'categories': scores
         }
     
     def evaluate_content(self):
         """Evaluate resume content quality"""
-        # Check ATS parse rate
-        parse_rate = 1.0 if len(self.resume_text) > 0 else 0.0
-        
-        # Check for word repetition
-        words = re.findall(r'\b\w+\b', self.resume_text.lower())
-        word_counts = Counter(words)
-        repetition_score = 1.0
-        for word, count in word_counts.items():
-            if len(word) > 3 and count > 5:  # Only consider words with length > 3 and appearing more than 5 times
-                repetition_score -= 0.05  # Penalize for repetition
-        repetition_score = max(0.0, repetition_score)  # Ensure score doesn't go below 0
-        
-        # Check for quantified achievements
-        achievement_patterns = [r'\d+%', r'increased', r'decreased', r'improved', r'reduced', r'achieved', r'won', r'awarded']
-        achievement_score = 0.0
-        for pattern in achievement_patterns:
-            if re.search(pattern, self.resume_text, re.IGNORECASE):
-                achievement_score += 0.125  # Each pattern adds to the score
-        achievement_score = min(1.0, achievement_score)  # Cap at 1.0
-        
-        # Calculate content score (weighted average)
-        content_score = 0.5 * parse_rate + 0.25 * repetition_score + 0.25 * achievement_score
-        return round(content_score * 100, 1)
+        return score_content(self.features)
     
     def evaluate_format(self):
         """Evaluate resume format"""
-        # Check file format (already validated during upload)
-        format_score = 1.0
-        
-        # Check resume length
-        word_count = len(re.findall(r'\b\w+\b', self.resume_text))
-        if word_count < 200:
-            format_score -= 0.3  # Too short
-        elif word_count > 1000:
-            format_score -= 0.2  # Too long
-        
-        # Check for long bullet points
-        bullet_points = re.findall(r'[•\-\*]\s*[^•\-\*\n]+', self.resume_text)
-        long_bullets = sum(1 for bp in bullet_points if len(bp) > 100)
-        if long_bullets > 0:
-            format_score -= 0.1 * min(long_bullets, 5)  # Penalize for long bullets, up to 0.5
-        
-        format_score = max(0.0, format_score)  # Ensure score doesn't go below 0
-        return round(format_score * 100, 1)
+        return score_format(self.features)
     
     def evaluate_skills(self):
         """Evaluate skills section"""
-        skills_score = 0.0
-        
-        # Get skills from the parsed resume
-        skills_text = self.parsed_resume['skills']
-        
-        # Initialize skill lists
-        hard_skills = {
-            'Programming Languages': ['python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin', 'go'],
-            'Web Technologies': ['html', 'css', 'react', 'angular', 'vue', 'node', 'express', 'django', 'flask', 'spring'],
-            'Databases': ['sql', 'mysql', 'postgresql', 'mongodb', 'oracle', 'redis', 'elasticsearch'],
-            'Cloud & DevOps': ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'terraform'],
-            'Data & Analytics': ['analytics', 'statistics', 'machine learning', 'data science', 'big data', 'tableau', 'power bi'],
-            'Business Tools': ['excel', 'powerpoint', 'word', 'jira', 'confluence', 'salesforce', 'sap']
-        }
-        
-        soft_skills = {
-            'Communication': ['communication', 'presentation', 'public speaking', 'writing', 'negotiation'],
-            'Leadership': ['leadership', 'management', 'team lead', 'mentoring', 'coaching'],
-            'Problem Solving': ['problem solving', 'analytical', 'critical thinking', 'troubleshooting', 'decision making'],
-            'Teamwork': ['teamwork', 'collaboration', 'team player', 'interpersonal', 'relationship building'],
-            'Personal Traits': ['adaptability', 'flexibility', 'creativity', 'initiative', 'attention to detail']
-        }
-        
-        if skills_text:
-            # Convert skills text to list if it's not already
-            skills = [skill.strip().lower() for skill in skills_text.split('\n') if skill.strip()]
-            
-            # Calculate hard skills score
-            hard_skills_score = 0.0
-            hard_skills_found = set()
-            for category, category_skills in hard_skills.items():
-                category_matches = sum(1 for skill in skills if 
-                                     any(hs in skill for hs in category_skills) or 
-                                     any(skill in hs for hs in category_skills))
-                if category_matches > 0:
-                    hard_skills_found.update([skill for skill in skills if 
-                                            any(hs in skill for hs in category_skills) or 
-                                            any(skill in hs for hs in category_skills)])
-                    hard_skills_score += min(1.0, category_matches / 2)  # Aim for at least 2 skills per category
-            
-            # Normalize hard skills score
-            hard_skills_score = min(1.0, hard_skills_score / len(hard_skills))
-            
-            # Calculate soft skills score
-            soft_skills_score = 0.0
-            soft_skills_found = set()
-            for category, category_skills in soft_skills.items():
-                category_matches = sum(1 for skill in skills if 
-                                     any(ss in skill for ss in category_skills) or 
-                                     any(skill in ss for ss in category_skills))
-                if category_matches > 0:
-                    soft_skills_found.update([skill for skill in skills if 
-                                            any(ss in skill for ss in category_skills) or 
-                                            any(skill in ss for ss in category_skills)])
-                    soft_skills_score += min(1.0, category_matches / 2)  # Aim for at least 2 skills per category
-            
-            # Normalize soft skills score
-            soft_skills_score = min(1.0, soft_skills_score / len(soft_skills))
-            
-            # Calculate initial skills score with more weight on hard skills
-            skills_score = 0.7 * hard_skills_score + 0.3 * soft_skills_score
-            
-            # Bonus points for having a good balance of skills
-            if len(hard_skills_found) >= 5 and len(soft_skills_found) >= 3:
-                skills_score = min(1.0, skills_score + 0.1)  # Bonus for good balance
-        
-        # If job description is provided, check for keyword matching
-        if self.job_description:
-            # Extract potential skills from job description
-            job_skills = set()
-            for skill_lists in hard_skills.values():
-                job_skills.update(skill for skill in skill_lists 
-                                if any(skill.lower() in self.job_description.lower() for skill in skill_lists))
-            for skill_lists in soft_skills.values():
-                job_skills.update(skill for skill in skill_lists 
-                                if any(skill.lower() in self.job_description.lower() for skill in skill_lists))
-            
-            if job_skills:
-                # Calculate match ratio based on found skills
-                skills_lower = [skill.lower() for skill in skills]
-                match_count = sum(1 for job_skill in job_skills 
-                                if any(job_skill in skill for skill in skills_lower))
-                match_ratio = min(1.0, match_count / len(job_skills))
-                
-                # Adjust skills score based on keyword matching
-                skills_score = 0.6 * skills_score + 0.4 * match_ratio
-        
-        return round(skills_score * 100, 1)
+        return score_skills(self.features)
     
     def evaluate_sections(self):
         """Evaluate resume sections"""
-        sections_score = 0.0
-        
-        # Check for essential sections
-        essential_sections = ['contact_info', 'experience', 'education', 'skills']
-        essential_score = sum(1 for section in essential_sections if self.parsed_resume[section]) / len(essential_sections)
-        
-        # Check contact information completeness
-        contact_info = self.parsed_resume['contact_info']
-        contact_score = sum(1 for field in contact_info if contact_info[field]) / len(contact_info)
-        
-        # Check for personality showcase (additional sections)
-        additional_sections = ['summary', 'projects', 'certifications', 'languages', 'interests']
-        additional_score = min(1.0, sum(1 for section in additional_sections if self.parsed_resume[section]) / 3)  # Aim for at least 3 additional sections
-        
-        # Calculate sections score (weighted average)
-        sections_score = 0.5 * essential_score + 0.3 * contact_score + 0.2 * additional_score
-        return round(sections_score * 100, 1)
+        return score_sections(self.features)
     
     def evaluate_style(self):
         """Evaluate resume style"""
-        style_score = 0.5  # Start with a base score
-        
-        # Check email address format
-        email = self.parsed_resume['contact_info']['email']
-        if email and ('@gmail.com' in email or '@yahoo.com' in email or '@hotmail.com' in email):
-            style_score += 0.1  # Professional email
-        
-        # Check for active voice
-        active_voice_patterns = [r'\b(managed|developed|created|implemented|led|achieved|increased|decreased|improved|reduced)\b']
-        active_voice_count = sum(len(re.findall(pattern, self.resume_text, re.IGNORECASE)) for pattern in active_voice_patterns)
-        if active_voice_count > 5:
-            style_score += 0.2  # Good use of active voice
-        
-        # Check for buzzwords and cliches
-        buzzwords = ['synergy', 'think outside the box', 'go-getter', 'team player', 'detail-oriented', 'proactive', 
-                    'go-to person', 'results-driven', 'hardworking', 'multitasker', 'self-motivated', 'dynamic']
-        buzzword_count = sum(self.resume_text.lower().count(word) for word in buzzwords)
-        if buzzword_count > 3:
-            style_score -= 0.2  # Penalize for buzzword overuse
-        
-        style_score = max(0.0, min(1.0, style_score))  # Ensure score is between 0 and 1
-        return round(style_score * 100, 1)
+        return score_style(self.features)
     
-    def generate_suggestions(self):
+    def generate_suggestions(self, scores=None):
         """Generate suggestions for improving the resume"""
-        suggestions = {
-            'content': [],
-            'format': [],
-            'skills': [],
-            'sections': [],
-            'style': []
-        }
-        
-        # Content suggestions
-        if self.evaluate_content() < 70:
-            # Check for word repetition
-            words = re.findall(r'\b\w+\b', self.resume_text.lower())
-            word_counts = Counter(words)
-            repeated_words = [word for word, count in word_counts.items() if len(word) > 3 and count > 5]
-            if repeated_words:
-                suggestions['content'].append(f"Consider using synonyms for frequently repeated words: {', '.join(repeated_words[:5])}.")
-            
-            # Check for quantified achievements
-            if not any(re.search(pattern, self.resume_text, re.IGNORECASE) for pattern in [r'\d+%', r'increased', r'decreased']):
-                suggestions['content'].append("Add quantifiable achievements to your experience section (e.g., 'Increased sales by 20%').")
-        
-        # Format suggestions
-        if self.evaluate_format() < 70:
-            word_count = len(re.findall(r'\b\w+\b', self.resume_text))
-            if word_count < 200:
-                suggestions['format'].append("Your resume is too short. Consider adding more details about your experience and skills.")
-            elif word_count > 1000:
-                suggestions['format'].append("Your resume is too long. Try to keep it concise and focused on the most relevant information.")
-            
-            # Check for long bullet points
-            bullet_points = re.findall(r'[•\-\*]\s*[^•\-\*\n]+', self.resume_text)
-            long_bullets = [bp for bp in bullet_points if len(bp) > 100]
-            if long_bullets:
-                suggestions['format'].append("Some bullet points are too long. Keep them concise and focused on one achievement or responsibility.")
-        
-        # Skills suggestions
-        if self.evaluate_skills() < 70:
-            # Suggest hard skills based on job description or common skills
-            hard_skills = ['Python', 'Java', 'JavaScript', 'HTML', 'CSS', 'SQL', 'React', 'Angular', 'Node.js', 'AWS', 'Azure', 
-                          'Excel', 'PowerPoint', 'Word', 'Photoshop', 'Illustrator', 'Analytics', 'Statistics', 'Research', 
-                          'Marketing', 'Sales', 'Finance', 'Accounting', 'Management', 'Leadership', 'Project Management']
-            
-            # Filter skills not mentioned in resume
-            missing_hard_skills = [skill for skill in hard_skills if skill.lower() not in self.resume_text.lower()]
-            if missing_hard_skills and len(missing_hard_skills) > 20:
-                suggestions['skills'].append(f"Consider adding relevant hard skills such as: {', '.join(missing_hard_skills[:5])}.")
-            
-            # Suggest soft skills
-            soft_skills = ['Communication', 'Teamwork', 'Problem Solving', 'Creativity', 'Adaptability', 'Leadership', 
-                          'Time Management', 'Critical Thinking', 'Decision Making', 'Organization']
-            missing_soft_skills = [skill for skill in soft_skills if skill.lower() not in self.resume_text.lower()]
-            if missing_soft_skills and len(missing_soft_skills) > 5:
-                suggestions['skills'].append(f"Consider adding relevant soft skills such as: {', '.join(missing_soft_skills[:3])}.")
-            
-            # Keyword matching with job description
-            if self.job_description:
-                job_keywords = set(re.findall(r'\b[A-Za-z][A-Za-z\s]*[A-Za-z]\b', self.job_description.lower()))
-                resume_keywords = set(re.findall(r'\b[A-Za-z][A-Za-z\s]*[A-Za-z]\b', self.resume_text.lower()))
-                
-                # Find important keywords in job description not in resume
-                missing_keywords = job_keywords - resume_keywords
-                if missing_keywords:
-                    suggestions['skills'].append(f"Consider adding these keywords from the job description: {', '.join(list(missing_keywords)[:5])}.")
-        
-        # Sections suggestions
-        if self.evaluate_sections() < 70:
-            # Check for essential sections
-            essential_sections = {'contact_info': 'Contact Information', 'experience': 'Work Experience', 'education': 'Education', 'skills': 'Skills'}
-            missing_sections = [essential_sections[section] for section in essential_sections if not self.parsed_resume[section]]
-            if missing_sections:
-                suggestions['sections'].append(f"Add these essential sections to your resume: {', '.join(missing_sections)}.")
-            
-            # Check contact information completeness
-            contact_info = self.parsed_resume['contact_info']
-            missing_contact = [field for field in contact_info if not contact_info[field]]
-            if missing_contact:
-                contact_fields = {'email': 'Email', 'phone': 'Phone Number', 'linkedin': 'LinkedIn Profile'}
-                suggestions['sections'].append(f"Add these contact details: {', '.join([contact_fields[field] for field in missing_contact])}.")
-            
-            # Suggest additional sections
-            additional_sections = {'summary': 'Professional Summary', 'projects': 'Projects', 'certifications': 'Certifications', 
-                                 'languages': 'Languages', 'interests': 'Interests/Hobbies'}
-            missing_additional = [additional_sections[section] for section in additional_sections if not self.parsed_resume[section]]
-            if len(missing_additional) > 2:  # If missing more than 2 additional sections
-                suggestions['sections'].append(f"Consider adding these sections to showcase your personality: {', '.join(missing_additional[:2])}.")
-        
-        # Style suggestions
-        if self.evaluate_style() < 70:
-            # Check email address format
-            email = self.parsed_resume['contact_info']['email']
-            if email and not ('@gmail.com' in email or '@yahoo.com' in email or '@hotmail.com' in email or '@outlook.com' in email):
-                suggestions['style'].append("Consider using a professional email address.")
-            
-            # Check for active voice
-            active_voice_patterns = [r'\b(managed|developed|created|implemented|led|achieved|increased|decreased|improved|reduced)\b']
-            active_voice_count = sum(len(re.findall(pattern, self.resume_text, re.IGNORECASE)) for pattern in active_voice_patterns)
-            if active_voice_count < 5:
-                suggestions['style'].append("Use more active voice verbs to describe your achievements and responsibilities.")
-            
-            # Check for buzzwords and cliches
-            buzzwords = ['synergy', 'think outside the box', 'go-getter', 'team player', 'detail-oriented', 'proactive', 
-                        'go-to person', 'results-driven', 'hardworking', 'multitasker', 'self-motivated', 'dynamic']
-            buzzword_count = sum(self.resume_text.lower().count(word) for word in buzzwords)
-            if buzzword_count > 3:
-                suggestions['style'].append("Reduce the use of buzzwords and cliches. Be more specific about your skills and achievements.")
-        
-        return suggestions
\ No newline at end of file
+        if scores is None:
+            scores = score_all(self.features)
+        return timed(self.timings, 'suggestions', suggest_all, self.features, scores)
@@ -0,0 +1,303 @@
+"""Supervised analysis processes with resource limits.
+
+A Sandbox owns one worker process that runs jobs one at a time and is
+reused until it is recycled. The worker's address space may grow by at most
+SANDBOX_MEMORY_MB beyond what it started with (RLIMIT_AS), and each job may
+use SANDBOX_CPU_SECONDS of CPU time (RLIMIT_CPU); the caller also kills the
+worker when a job runs past its wall-clock timeout. Workers are replaced
+after SANDBOX_MAX_JOBS jobs, or once their resident memory has grown by
+SANDBOX_RSS_GROWTH_MB, so fragmentation and lazily loaded models cannot
+build up. A job that crashes, is killed or hits a limit comes back as a
+structured error, and every job reports its peak RSS.
+"""
+import os
+import signal
+import logging
+import resource
+import multiprocessing
+from collections import namedtuple
+
+
+# Address space a worker may add to what it starts with (the preloaded models); 0 disables the limit
+SANDBOX_MEMORY_MB = int(os.environ.get('SANDBOX_MEMORY_MB', '2048'))
+# CPU seconds per job, its `after` follow-up included; 0 disables the limit
+SANDBOX_CPU_SECONDS = int(os.environ.get('SANDBOX_CPU_SECONDS', '120'))
+# Jobs a worker runs before it is replaced
+SANDBOX_MAX_JOBS = int(os.environ.get('SANDBOX_MAX_JOBS', '100'))
+# Growth of a worker's RSS since it started after which it is replaced
+SANDBOX_RSS_GROWTH_MB = int(os.environ.get('SANDBOX_RSS_GROWTH_MB', '512'))
+# Modules the fork server of a worker's own pools (PDF pages, OCR) imports
+POOL_PRELOAD = ['analyzer.pdf_extract', 'analyzer.ocr']
+
+# Outcome of one job: status is 'ok', 'error' or 'timeout'; value is the result or an error dict
+# ({'type': ..., 'message': ...}); stats has the job's peak_rss_bytes and cpu_seconds when known
+Outcome = namedtuple('Outcome', ['status', 'value', 'stats'])
+
+logger = logging.getLogger(__name__)
+
+
+def _status_bytes(field):
+    """A size from /proc/self/status (e.g. VmSize, VmRSS, VmHWM) in bytes, or None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(f'{field}:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def rss_bytes():
+    rss = _status_bytes('VmRSS')
+    if rss is None:
+        rss = peak_rss_bytes()
+    return rss
+
+
+def reset_peak_rss():
+    """Start measuring a new peak RSS (Linux 4.0+; elsewhere the peak stays the process lifetime's)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_bytes():
+    peak = _status_bytes('VmHWM')
+    if peak is None:
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = maxrss if os.uname().sysname == 'Darwin' else maxrss * 1024
+    return peak
+
+
+def limit_memory(megabytes=SANDBOX_MEMORY_MB):
+    """Cap this process's address space at its current size plus `megabytes`"""
+    size = _status_bytes('VmSize')
+    if not megabytes or size is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = size + megabytes * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def limit_cpu(seconds=SANDBOX_CPU_SECONDS):
+    """Let this process use `seconds` more CPU time before SIGXCPU ends it.
+
+    RLIMIT_CPU counts the whole process lifetime, so only the soft limit is
+    moved, relative to the time used so far; the hard limit stays as it is
+    so the next job can move it again.
+    """
+    if not seconds:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(_cpu_seconds()) + 1 + seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def init_worker(memory_mb=SANDBOX_MEMORY_MB):
+    """Process pool initializer applying the sandbox memory limit (see asgi.py)"""
+    limit_memory(memory_mb)
+
+
+def limited_call(func, *args):
+    """Call func(*args) under the per-job CPU limit; for pool workers that run one job at a time"""
+    limit_cpu()
+    return func(*args)
+
+
+def describe_exit(exitcode):
+    """Error dict for a worker that exited without reporting a job's outcome"""
+    if exitcode is not None and exitcode < 0:
+        name = signal.Signals(-exitcode).name if -exitcode in signal.valid_signals() else str(-exitcode)
+        if -exitcode == getattr(signal, 'SIGXCPU', None):
+            return {'type': 'cpu_limit', 'message': 'Analysis used more CPU time than allowed'}
+        if -exitcode == signal.SIGKILL:
+            return {'type': 'killed', 'message': 'Analysis process was killed, possibly for using too much memory'}
+        return {'type': 'crashed', 'message': f'Analysis process crashed ({name})'}
+    return {'type': 'crashed', 'message': f'Analysis process exited unexpectedly (status {exitcode})'}
+
+
+def _worker_main(handler, after, conn, max_jobs, rss_growth, memory_mb, cpu_seconds):
+    """Worker process: run jobs received on conn until told to stop or due for recycling.
+
+    For each job it sends ('ok', result, stats) or ('error', error, stats)
+    as soon as the handler returns, then runs `after` and sends ('idle',
+    recycle) once it is ready for the next job.
+    """
+    limit_memory(memory_mb)
+    # Page and OCR pools started here come from a fork server of this worker's own, which
+    # would otherwise import everything the job queue's does (the app and its models)
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        multiprocessing.get_context('forkserver').set_forkserver_preload(POOL_PRELOAD)
+    baseline_rss = rss_bytes()
+    jobs = 0
+    while True:
+        try:
+            payload = conn.recv()
+        except EOFError:
+            return
+        if payload is None:
+            return
+
+        limit_cpu(cpu_seconds)
+        reset_peak_rss()
+        cpu_start = _cpu_seconds()
+        result, recycle = None, False
+        try:
+            result = handler(payload)
+            outcome = ('ok', result)
+        except MemoryError:
+            # Whatever was half-allocated stays behind; start over in a fresh worker
+            outcome = ('error', {'type': 'memory_limit', 'message': 'Analysis needed more memory than allowed'})
+            recycle = True
+        except Exception as e:
+            outcome = ('error', {'type': 'error', 'message': str(e)})
+        stats = {'peak_rss_bytes': peak_rss_bytes(), 'cpu_seconds': round(_cpu_seconds() - cpu_start, 3)}
+        conn.send(outcome + (stats,))
+
+        if outcome[0] == 'ok' and after is not None:
+            try:
+                after(payload, result)
+            except MemoryError:
+                recycle = True
+            except Exception as e:
+                logger.warning(f"Post-processing failed: {e}")
+        jobs += 1
+        recycle = recycle or jobs >= max_jobs or (rss_growth and rss_bytes() - baseline_rss > rss_growth)
+        conn.send(('idle', recycle))
+        if recycle:
+            return
+
+
+class Sandbox:
+    """One supervised worker process, started on first use and replaced when recycled or killed.
+
+    `context` is the multiprocessing context to start workers from, e.g. the
+    job queue's fork server. Workers are not daemonic, so PDF extraction and
+    OCR can still use their own pools; close() or kill() them before exit.
+    Not thread-safe: each dispatcher thread owns one.
+    """
+
+    def __init__(self, context, handler, after=None, max_jobs=SANDBOX_MAX_JOBS, rss_growth_mb=SANDBOX_RSS_GROWTH_MB,
+                 memory_mb=SANDBOX_MEMORY_MB, cpu_seconds=SANDBOX_CPU_SECONDS):
+        self.context = context
+        self.handler = handler
+        self.after = after
+        self.max_jobs = max_jobs
+        self.rss_growth = rss_growth_mb * 1024 * 1024
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.process = None
+        self.conn = None
+        self.started = 0  # Workers started, the first one included
+
+    def _start(self):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(self.handler, self.after, child_conn, self.max_jobs, self.rss_growth, self.memory_mb, self.cpu_seconds)
+        )
+        try:
+            process.start()
+        except BaseException:
+            parent_conn.close()
+            raise
+        finally:
+            child_conn.close()
+        self.process, self.conn = process, parent_conn
+        self.started += 1
+
+    def prestart(self):
+        """Start the worker ahead of the first job; returns False if it could not be started"""
+        if self.process is not None:
+            return True
+        try:
+            self._start()
+        except Exception as e:
+            logger.warning(f"Could not start an analysis process: {e}")
+            return False
+        return True
+
+    def run(self, payload, timeout):
+        """Run one job; returns an Outcome as soon as the handler has finished, before `after` runs"""
+        if self.process is not None and not self.process.is_alive():
+            # Died while idle, e.g. to the kernel's OOM killer
+            self.kill()
+        try:
+            if self.process is None:
+                self._start()
+        except Exception as e:
+            # e.g. the fork server is gone, or the handler cannot be pickled
+            logger.warning(f"Could not start an analysis process: {e}")
+            return Outcome('error', {'type': 'crashed', 'message': f'Could not start an analysis process: {e}'}, None)
+        try:
+            self.conn.send(payload)
+            if not self.conn.poll(timeout):
+                self.kill()
+                return Outcome('timeout', {'type': 'timeout', 'message': f"Analysis timed out after {timeout} seconds"},
+                               None)
+            status, value, stats = self.conn.recv()
+        except (EOFError, OSError):
+            return Outcome('error', self._crashed(), None)
+        return Outcome(status, value, stats)
+
+    def settle(self, timeout):
+        """Wait up to `timeout` seconds for the worker to finish the job's `after` step.
+
+        Returns True if the worker then recycled itself. A worker still busy
+        after `timeout`, or one that died meanwhile, is killed and replaced
+        by the next job.
+        """
+        if self.process is None:
+            return False
+        try:
+            if self.conn.poll(max(0, timeout)):
+                _, recycle = self.conn.recv()
+                if not recycle:
+                    return False
+                self.process.join(5)
+                self.kill()
+                return True
+            logger.warning('Analysis post-processing timed out; replacing the worker')
+        except (EOFError, OSError):
+            pass
+        self.kill()
+        return False
+
+    def _crashed(self):
+        self.process.join(5)
+        error = describe_exit(self.process.exitcode)
+        self.kill()
+        return error
+
+    def kill(self):
+        """Stop the worker right away; the next job starts a new one"""
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join()
+        if self.conn is not None:
+            self.conn.close()
+        self.process, self.conn = None, None
+
+    def close(self, timeout=5):
+        """Ask an idle worker to exit, killing it if it does not"""
+        if self.process is not None and self.conn is not None:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout)
+        self.kill()
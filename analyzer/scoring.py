@@ -0,0 +1,264 @@
+from analyzer.skills import DEFAULT_MATCHER
+from analyzer.patterns import KEYWORD_PATTERN
+
+# Weights used for the overall ATS score
+CATEGORY_WEIGHTS = {
+    'content': 0.35,
+    'format': 0.15,
+    'skills': 0.25,
+    'sections': 0.15,
+    'style': 0.10
+}
+
+# Categories whose score or suggestions change with the job description; the others are computed once per resume
+JD_DEPENDENT_CATEGORIES = frozenset({'skills'})
+
+# Skills suggested when the skills score is low
+SUGGESTED_HARD_SKILLS = ['Python', 'Java', 'JavaScript', 'HTML', 'CSS', 'SQL', 'React', 'Angular', 'Node.js', 'AWS', 'Azure',
+                         'Excel', 'PowerPoint', 'Word', 'Photoshop', 'Illustrator', 'Analytics', 'Statistics', 'Research',
+                         'Marketing', 'Sales', 'Finance', 'Accounting', 'Management', 'Leadership', 'Project Management']
+SUGGESTED_SOFT_SKILLS = ['Communication', 'Teamwork', 'Problem Solving', 'Creativity', 'Adaptability', 'Leadership',
+                         'Time Management', 'Critical Thinking', 'Decision Making', 'Organization']
+
+ESSENTIAL_SECTIONS = {'contact_info': 'Contact Information', 'experience': 'Work Experience', 'education': 'Education', 'skills': 'Skills'}
+ADDITIONAL_SECTIONS = {'summary': 'Professional Summary', 'projects': 'Projects', 'certifications': 'Certifications',
+                       'languages': 'Languages', 'interests': 'Interests/Hobbies'}
+# Lowercased once for the presence checks in suggest_skills
+_HARD_SKILLS_LOWER = [(skill, skill.lower()) for skill in SUGGESTED_HARD_SKILLS]
+_SOFT_SKILLS_LOWER = [(skill, skill.lower()) for skill in SUGGESTED_SOFT_SKILLS]
+
+CONTACT_FIELDS = {'email': 'Email', 'phone': 'Phone Number', 'linkedin': 'LinkedIn Profile'}
+
+
+def score_content(features):
+    """Evaluate resume content quality"""
+    # Check ATS parse rate
+    parse_rate = 1.0 if len(features.text) > 0 else 0.0
+
+    # Penalize words longer than 3 characters appearing more than 5 times
+    repetition_score = 1.0
+    for _ in features.repeated_words:
+        repetition_score -= 0.05
+    repetition_score = max(0.0, repetition_score)  # Ensure score doesn't go below 0
+
+    # Each quantified-achievement pattern found adds to the score
+    achievement_score = min(1.0, 0.125 * len(features.achievement_hits))
+
+    # Calculate content score (weighted average)
+    content_score = 0.5 * parse_rate + 0.25 * repetition_score + 0.25 * achievement_score
+    return round(content_score * 100, 1)
+
+
+def score_format(features):
+    """Evaluate resume format"""
+    # Check file format (already validated during upload)
+    format_score = 1.0
+
+    # Check resume length
+    if features.word_count < 200:
+        format_score -= 0.3  # Too short
+    elif features.word_count > 1000:
+        format_score -= 0.2  # Too long
+
+    # Check for long bullet points
+    long_bullets = len(features.long_bullets)
+    if long_bullets > 0:
+        format_score -= 0.1 * min(long_bullets, 5)  # Penalize for long bullets, up to 0.5
+
+    format_score = max(0.0, format_score)  # Ensure score doesn't go below 0
+    return round(format_score * 100, 1)
+
+
+def _group_score(features, group):
+    """Score one skill group (hard or soft) and return it with the matched skill lines"""
+    categories = DEFAULT_MATCHER.categories(group)
+    lines_per_category = {category: set() for category in categories}
+    for line, hits in zip(features.skills, features.skill_hits):
+        for hit in hits:
+            if hit.group == group:
+                lines_per_category[hit.category].add(line)
+
+    group_score = 0.0
+    found = set()
+    for lines in lines_per_category.values():
+        if lines:
+            found.update(lines)
+            group_score += min(1.0, len(lines) / 2)  # Aim for at least 2 skills per category
+    return min(1.0, group_score / len(categories)), found
+
+
+def score_skills(features):
+    """Evaluate skills section"""
+    skills_score = 0.0
+
+    if features.skills:
+        hard_skills_score, hard_skills_found = _group_score(features, 'hard')
+        soft_skills_score, soft_skills_found = _group_score(features, 'soft')
+
+        # Calculate initial skills score with more weight on hard skills
+        skills_score = 0.7 * hard_skills_score + 0.3 * soft_skills_score
+
+        # Bonus points for having a good balance of skills
+        if len(hard_skills_found) >= 5 and len(soft_skills_found) >= 3:
+            skills_score = min(1.0, skills_score + 0.1)
+
+    # If the job description names taxonomy skills, check how many the resume lists
+    if features.job_skills:
+        resume_skills = {hit.skill for hits in features.skill_hits for hit in hits}
+        match_ratio = min(1.0, len(features.job_skills & resume_skills) / len(features.job_skills))
+
+        # Adjust skills score based on keyword matching
+        skills_score = 0.6 * skills_score + 0.4 * match_ratio
+
+    return round(skills_score * 100, 1)
+
+
+def score_sections(features):
+    """Evaluate resume sections"""
+    # Check for essential sections
+    essential_score = sum(1 for section in ESSENTIAL_SECTIONS if section in features.present_sections) / len(ESSENTIAL_SECTIONS)
+
+    # Check contact information completeness
+    contact_score = sum(1 for _, value in features.contact_info if value) / len(features.contact_info)
+
+    # Check for personality showcase (additional sections), aiming for at least 3
+    additional_score = min(1.0, sum(1 for section in ADDITIONAL_SECTIONS if section in features.present_sections) / 3)
+
+    # Calculate sections score (weighted average)
+    sections_score = 0.5 * essential_score + 0.3 * contact_score + 0.2 * additional_score
+    return round(sections_score * 100, 1)
+
+
+def score_style(features):
+    """Evaluate resume style"""
+    style_score = 0.5  # Start with a base score
+
+    # Check email address format
+    email = features.email
+    if email and ('@gmail.com' in email or '@yahoo.com' in email or '@hotmail.com' in email):
+        style_score += 0.1  # Professional email
+
+    # Check for active voice
+    if features.active_voice_count > 5:
+        style_score += 0.2  # Good use of active voice
+
+    # Check for buzzwords and cliches
+    if features.buzzword_count > 3:
+        style_score -= 0.2  # Penalize for buzzword overuse
+
+    style_score = max(0.0, min(1.0, style_score))  # Ensure score is between 0 and 1
+    return round(style_score * 100, 1)
+
+
+SCORERS = {
+    'content': score_content,
+    'format': score_format,
+    'skills': score_skills,
+    'sections': score_sections,
+    'style': score_style
+}
+
+
+def score_all(features):
+    """Score every category from one features record"""
+    return {category: scorer(features) for category, scorer in SCORERS.items()}
+
+
+def overall_score(scores):
+    """Weighted average of the category scores"""
+    return round(sum(scores[category] * CATEGORY_WEIGHTS[category] for category in scores), 1)
+
+
+def suggest_content(features):
+    suggestions = []
+    if features.repeated_words:
+        suggestions.append(f"Consider using synonyms for frequently repeated words: {', '.join(features.repeated_words[:5])}.")
+    if not features.achievement_hits & {r'\d+%', 'increased', 'decreased'}:
+        suggestions.append("Add quantifiable achievements to your experience section (e.g., 'Increased sales by 20%').")
+    return suggestions
+
+
+def suggest_format(features):
+    suggestions = []
+    if features.word_count < 200:
+        suggestions.append("Your resume is too short. Consider adding more details about your experience and skills.")
+    elif features.word_count > 1000:
+        suggestions.append("Your resume is too long. Try to keep it concise and focused on the most relevant information.")
+    if features.long_bullets:
+        suggestions.append("Some bullet points are too long. Keep them concise and focused on one achievement or responsibility.")
+    return suggestions
+
+
+def suggest_skills(features):
+    suggestions = []
+
+    # Suggest hard skills not mentioned in the resume
+    missing_hard_skills = [skill for skill, lower in _HARD_SKILLS_LOWER if lower not in features.normalized]
+    if missing_hard_skills and len(missing_hard_skills) > 20:
+        suggestions.append(f"Consider adding relevant hard skills such as: {', '.join(missing_hard_skills[:5])}.")
+
+    # Suggest soft skills
+    missing_soft_skills = [skill for skill, lower in _SOFT_SKILLS_LOWER if lower not in features.normalized]
+    if missing_soft_skills and len(missing_soft_skills) > 5:
+        suggestions.append(f"Consider adding relevant soft skills such as: {', '.join(missing_soft_skills[:3])}.")
+
+    # Keyword matching with job description
+    if features.job_description:
+        job_keywords = features.job.keywords
+        resume_keywords = set(KEYWORD_PATTERN.findall(features.normalized))
+
+        # Find important keywords in job description not in resume
+        missing_keywords = job_keywords - resume_keywords
+        if missing_keywords:
+            suggestions.append(f"Consider adding these keywords from the job description: {', '.join(list(missing_keywords)[:5])}.")
+
+    return suggestions
+
+
+def suggest_sections(features):
+    suggestions = []
+
+    missing_sections = [name for section, name in ESSENTIAL_SECTIONS.items() if section not in features.present_sections]
+    if missing_sections:
+        suggestions.append(f"Add these essential sections to your resume: {', '.join(missing_sections)}.")
+
+    missing_contact = [field for field, value in features.contact_info if not value]
+    if missing_contact:
+        suggestions.append(f"Add these contact details: {', '.join([CONTACT_FIELDS[field] for field in missing_contact])}.")
+
+    missing_additional = [name for section, name in ADDITIONAL_SECTIONS.items() if section not in features.present_sections]
+    if len(missing_additional) > 2:  # If missing more than 2 additional sections
+        suggestions.append(f"Consider adding these sections to showcase your personality: {', '.join(missing_additional[:2])}.")
+
+    return suggestions
+
+
+def suggest_style(features):
+    suggestions = []
+
+    email = features.email
+    if email and not ('@gmail.com' in email or '@yahoo.com' in email or '@hotmail.com' in email or '@outlook.com' in email):
+        suggestions.append("Consider using a professional email address.")
+
+    if features.active_voice_count < 5:
+        suggestions.append("Use more active voice verbs to describe your achievements and responsibilities.")
+
+    if features.buzzword_count > 3:
+        suggestions.append("Reduce the use of buzzwords and cliches. Be more specific about your skills and achievements.")
+
+    return suggestions
+
+
+SUGGESTERS = {
+    'content': suggest_content,
+    'format': suggest_format,
+    'skills': suggest_skills,
+    'sections': suggest_sections,
+    'style': suggest_style
+}
+
+
+def suggest_all(features, scores):
+    """Suggestions for every scored category below 70 (scores may cover only some categories)"""
+    return {category: SUGGESTERS[category](features) if score < 70 else []
+            for category, score in scores.items()}
@@ -0,0 +1,320 @@
+"""On-disk inverted index of analyzed resumes, searched by job description with BM25.
+
+Usage:
+    python -m analyzer.search_index reindex   # rebuild from the result store
+    python -m analyzer.search_index search --jd JOB_DESCRIPTION_FILE [--top 10]
+"""
+import os
+import re
+import math
+import time
+import sqlite3
+import argparse
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from analyzer.skills import DEFAULT_MATCHER
+
+
+SEARCH_INDEX_PATH = os.environ.get(
+    'SEARCH_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results', 'search.db')
+)
+
+# Parsed sections that are indexed, and how much a word in each one counts
+FIELD_WEIGHTS = {
+    'summary': 1,
+    'experience': 1,
+    'projects': 1,
+    'education': 1,
+    'certifications': 1,
+    'skills': 2
+}
+# Taxonomy skills found anywhere in those sections are indexed as 'skill:<name>' terms
+SKILL_WEIGHT = 3
+# Postings per block; a new document rewrites only the last block of each of its terms
+BLOCK_SIZE = 512
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*')
+STOP_WORDS = frozenset('''a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had has have having he
+her here hers him his how i if in into is it its itself just me more most my no nor not now of off on once only or
+other our ours out over own same she should so some such than that the their them then there these they this those
+through to too under until up very was we were what when where which while who whom why will with you your'''.split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+
+def document_terms(parsed_resume):
+    """Weighted term frequencies of a parsed resume"""
+    terms = Counter()
+    indexed_text = []
+    for field, weight in FIELD_WEIGHTS.items():
+        text = parsed_resume.get(field) or ''
+        indexed_text.append(text)
+        for token in tokenize(text):
+            terms[token] += weight
+    for skill in DEFAULT_MATCHER.skills_in('\n'.join(indexed_text)):
+        terms[f'skill:{skill}'] += SKILL_WEIGHT
+    return terms
+
+
+def query_terms(job_description):
+    """Distinct query terms of a job description: its words plus the taxonomy skills it names"""
+    terms = set(tokenize(job_description))
+    terms.update(f'skill:{skill}' for skill in DEFAULT_MATCHER.skills_in(job_description))
+    return terms
+
+
+def encode_varints(values):
+    """LEB128-encode non-negative integers"""
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(data):
+    """Decode a LEB128 byte string into a uint64 array, vectorized with NumPy"""
+    # NumPy is imported where it is used, so importing the app does not pay for it before the first search
+    import numpy as np
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if raw.size == 0:
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # Position of each byte within its varint, for the 7-bit shift
+    position = np.arange(raw.size) - np.repeat(starts, ends - starts + 1)
+    chunks = (raw & 0x7f).astype(np.uint64) << (7 * position).astype(np.uint64)
+    return np.add.reduceat(chunks, starts)
+
+
+class SearchIndex:
+    """BM25 inverted index over parsed resume sections and skill hits, stored in SQLite.
+
+    Each indexed resume gets a sequential document id. A term's postings are
+    (doc id delta, term frequency) pairs, varint-encoded in blocks of
+    BLOCK_SIZE and kept as one continuous delta stream, so a term's blocks
+    concatenated in order decode in a single vectorized pass. Frequent
+    terms cost about two bytes per posting.
+    """
+
+    def __init__(self, path=SEARCH_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Document lengths, refreshed incrementally as other processes add documents and
+        # dropped when the index generation changes, i.e. when some process cleared the index
+        self._lengths = None
+        self._generation = None
+        self._lengths_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS docs (
+                    doc_id INTEGER PRIMARY KEY,
+                    doc_key TEXT NOT NULL UNIQUE,
+                    result_id TEXT NOT NULL,
+                    overall REAL,
+                    length INTEGER NOT NULL,
+                    indexed REAL NOT NULL
+                )
+            ''')
+            # 'generation' is bumped by clear(), which reuses document ids
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)")
+            conn.execute('CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    block INTEGER NOT NULL,
+                    last_doc INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (term, block)
+                ) WITHOUT ROWID
+            ''')
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def add(self, result_id, parsed_resume, overall=None, doc_key=None):
+        """Index one analyzed resume; returns False if doc_key was already indexed.
+
+        doc_key identifies the resume (e.g. its file hash) so re-analyzing
+        the same file only repoints the document at the newer result.
+        """
+        doc_key = doc_key or result_id
+        terms = document_terms(parsed_resume)
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                existing = conn.execute('SELECT doc_id FROM docs WHERE doc_key = ?', (doc_key,)).fetchone()
+                if existing:
+                    conn.execute('UPDATE docs SET result_id = ?, overall = ? WHERE doc_id = ?',
+                                 (result_id, overall, existing[0]))
+                    conn.execute('COMMIT')
+                    return False
+
+                doc_id = conn.execute(
+                    'INSERT INTO docs (doc_key, result_id, overall, length, indexed) VALUES (?, ?, ?, ?, ?)',
+                    (doc_key, result_id, overall, sum(terms.values()), time.time())
+                ).lastrowid
+                for term, tf in terms.items():
+                    self._append_posting(conn, term, doc_id, tf)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return True
+
+    @staticmethod
+    def _append_posting(conn, term, doc_id, tf):
+        conn.execute(
+            'INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1', (term,)
+        )
+        last = conn.execute(
+            'SELECT block, last_doc, count, data FROM postings WHERE term = ? ORDER BY block DESC LIMIT 1', (term,)
+        ).fetchone()
+        if last is None:
+            conn.execute('INSERT INTO postings (term, block, last_doc, count, data) VALUES (?, 0, ?, 1, ?)',
+                         (term, doc_id, encode_varints((doc_id, tf))))
+            return
+        block, last_doc, count, data = last
+        posting = encode_varints((doc_id - last_doc, tf))
+        if count < BLOCK_SIZE:
+            conn.execute('UPDATE postings SET last_doc = ?, count = ?, data = ? WHERE term = ? AND block = ?',
+                         (doc_id, count + 1, data + posting, term, block))
+        else:
+            conn.execute('INSERT INTO postings (term, block, last_doc, count, data) VALUES (?, ?, ?, 1, ?)',
+                         (term, block + 1, doc_id, posting))
+
+    def _doc_lengths(self, conn):
+        import numpy as np
+        generation = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+        with self._lengths_lock:
+            if self._lengths is None or generation != self._generation:
+                self._lengths = np.zeros(1, dtype=np.float32)
+                self._generation = generation
+            known = len(self._lengths) - 1
+            rows = conn.execute('SELECT doc_id, length FROM docs WHERE doc_id > ? ORDER BY doc_id', (known,)).fetchall()
+            if rows:
+                lengths = np.zeros(rows[-1][0] + 1, dtype=np.float32)
+                lengths[:len(self._lengths)] = self._lengths
+                ids, values = zip(*rows)
+                lengths[list(ids)] = values
+                self._lengths = lengths
+            return self._lengths
+
+    def postings(self, conn, term):
+        """(doc ids, term frequencies) of a term"""
+        import numpy as np
+        blocks = conn.execute('SELECT data FROM postings WHERE term = ? ORDER BY block', (term,)).fetchall()
+        values = decode_varints(b''.join(block[0] for block in blocks))
+        return np.cumsum(values[0::2]).astype(np.int64), values[1::2].astype(np.float32)
+
+    def search(self, job_description, top=10):
+        """Top resumes for a job description as dicts with result_id, score and overall"""
+        import numpy as np
+        terms = query_terms(job_description)
+        with self._connect() as conn:
+            # One read transaction, so the generation, lengths and postings are consistent
+            conn.execute('BEGIN')
+            lengths = self._doc_lengths(conn)
+            indexed = np.count_nonzero(lengths)
+            if not terms or not indexed:
+                return []
+            average_length = float(lengths.sum()) / indexed
+            # Per-document length normalization of BM25, zero-length slots never score
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)
+
+            scores = np.zeros(len(lengths), dtype=np.float32)
+            placeholders = ','.join('?' * len(terms))
+            for term, df in conn.execute(f'SELECT term, df FROM terms WHERE term IN ({placeholders})', list(terms)):
+                doc_ids, tfs = self.postings(conn, term)
+                # Postings may reference documents added since the lengths were read
+                known = doc_ids < len(lengths)
+                doc_ids, tfs = doc_ids[known], tfs[known]
+                idf = math.log(1 + (indexed - df + 0.5) / (df + 0.5))
+                scores[doc_ids] += idf * tfs * (BM25_K1 + 1) / (tfs + norm[doc_ids])
+
+            top = min(top, np.count_nonzero(scores))
+            if top <= 0:
+                return []
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])].tolist()
+            rows = conn.execute(
+                f"SELECT doc_id, result_id, overall FROM docs WHERE doc_id IN ({','.join('?' * len(best))})", best
+            ).fetchall()
+
+        docs = {doc_id: (result_id, overall) for doc_id, result_id, overall in rows}
+        return [
+            {'result_id': docs[doc_id][0], 'score': round(float(scores[doc_id]), 3), 'overall': docs[doc_id][1]}
+            for doc_id in best
+        ]
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for table in ('docs', 'terms', 'postings'):
+                conn.execute(f'DELETE FROM {table}')
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            conn.execute('COMMIT')
+        with self._lengths_lock:
+            self._lengths = None
+
+    def stats(self):
+        with self._connect() as conn:
+            documents = conn.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+            terms = conn.execute('SELECT COUNT(*) FROM terms').fetchone()[0]
+            postings_bytes = conn.execute('SELECT COALESCE(SUM(LENGTH(data)), 0) FROM postings').fetchone()[0]
+        return {'documents': documents, 'terms': terms, 'postings_bytes': postings_bytes}
+
+
+def main():
+    from analyzer.result_store import open_result_store
+
+    parser = argparse.ArgumentParser(description='Manage and query the resume search index')
+    parser.add_argument('command', choices=['reindex', 'search'])
+    parser.add_argument('--index', default=SEARCH_INDEX_PATH, help='search index database file')
+    parser.add_argument('--jd', help='file containing the job description (search)')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == 'reindex':
+        index = SearchIndex(args.index)
+        index.clear()
+        added = 0
+        for result_id, data in open_result_store().items():
+            if 'parsed_resume' in data:
+                index.add(result_id, data['parsed_resume'], data.get('ats_score', {}).get('overall'),
+                          doc_key=data.get('file_hash'))
+                added += 1
+        print(f"Indexed {added} results: {index.stats()}")
+        return
+
+    if not args.jd:
+        parser.error('search requires --jd')
+    with open(args.jd, 'r', encoding='utf-8') as f:
+        job_description = f.read()
+    for rank, hit in enumerate(SearchIndex(args.index).search(job_description, args.top), 1):
+        print(f"{rank:>4}  {hit['score']:8.3f}  {hit['result_id']}  (ATS {hit['overall']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import re
+
+from analyzer.patterns import BULLET_PREFIX_PATTERN
+
+
+# Header words that open each section, matched at the start of a line
+SECTION_HEADERS = {
+    'summary': 'summary|profile|objective',
+    'experience': 'experience|work|employment|history',
+    'education': 'education|academic|qualification',
+    'skills': 'skills|expertise|competencies|technologies',
+    'projects': 'projects|portfolio',
+    'certifications': 'certifications|certificates',
+    'languages': 'languages',
+    'interests': 'interests|hobbies'
+}
+
+# Header words that close whichever section is currently open
+TERMINATOR_HEADERS = {'education', 'experience', 'work', 'projects', 'certifications', 'summary', 'objective', 'contact'}
+
+# One precompiled alternation of every header; the named group says which section a line opens.
+# Matched with match(text, start, end), which anchors it at the start of each line.
+HEADER_PATTERN = re.compile(
+    r'\s*(?:' + '|'.join(f'(?P<{name}>{words})' for name, words in SECTION_HEADERS.items()) + r'|(?P<contact>contact))',
+    re.IGNORECASE
+)
+
+# Used to find skills in the body text when there is no skills header
+SKILL_PHRASE_PATTERNS = [
+    re.compile(r'\b(?:proficient|experienced|skilled|expertise)\s+in\s+([^.]+)', re.IGNORECASE),
+    re.compile(r'\b(?:knowledge|understanding)\s+of\s+([^.]+)', re.IGNORECASE),
+    re.compile(r'\b(?:technologies|tools|frameworks|languages)\s*:\s*([^.]+)', re.IGNORECASE)
+]
+
+
+def iter_line_spans(text):
+    """Yield (start, end) offsets of every non-blank line, with surrounding whitespace excluded"""
+    position = 0
+    length = len(text)
+    while position <= length:
+        newline = text.find('\n', position)
+        if newline == -1:
+            newline = length
+        line = text[position:newline]
+        stripped = line.lstrip()
+        if stripped:
+            start = position + len(line) - len(stripped)
+            yield start, start + len(stripped.rstrip())
+        position = newline + 1
+
+
+class Segmentation:
+    """Offsets of every section's header and content lines within the resume text"""
+
+    def __init__(self, text, spans, headers):
+        self.text = text
+        # section -> [(start, end), ...] of its content lines, in order
+        self.spans = spans
+        # section -> [(start, end), ...] of the header lines that opened it
+        self.headers = headers
+
+    @property
+    def bounds(self):
+        """section -> (start, end) covering all of its content, for slicing the text directly"""
+        return {section: (spans[0][0], spans[-1][1]) for section, spans in self.spans.items() if spans}
+
+    def preamble_lines(self, max_lines=None):
+        """Lines before the first section header, where resumes put the name and contact details"""
+        first_header = min((start for spans in self.headers.values() for start, _ in spans), default=len(self.text))
+        lines = [self.text[start:end] for start, end in iter_line_spans(self.text[:first_header])]
+        return lines[:max_lines] if max_lines else lines
+
+    def lines(self, section):
+        return [self.text[start:end] for start, end in self.spans.get(section, [])]
+
+    def section_text(self, section):
+        if section == 'skills':
+            return self.skills_text()
+        return '\n'.join(self.lines(section))
+
+    def skills_text(self):
+        """Deduplicated skills, one per line, split on commas and stripped of bullet markers"""
+        skills = []
+        for line in self.lines('skills'):
+            cleaned_line = BULLET_PREFIX_PATTERN.sub('', line)
+            if ',' in cleaned_line:
+                skills.extend(skill.strip() for skill in cleaned_line.split(','))
+            else:
+                skills.append(cleaned_line)
+
+        # If no explicit skills section was found, look for skill-like phrases anywhere
+        if not self.headers.get('skills'):
+            for pattern in SKILL_PHRASE_PATTERNS:
+                for match in pattern.finditer(self.text):
+                    skills_text = match.group(1)
+                    if ',' in skills_text:
+                        skills.extend(skill.strip() for skill in skills_text.split(','))
+                    else:
+                        skills.append(skills_text.strip())
+
+        # Remove duplicates while preserving order, ignoring single characters
+        seen = set()
+        unique_skills = []
+        for skill in skills:
+            skill = skill.strip()
+            if skill.lower() not in seen and len(skill) > 1:
+                seen.add(skill.lower())
+                unique_skills.append(skill)
+        return '\n'.join(unique_skills)
+
+
+def segment_resume(text):
+    """Assign every line to sections in one pass over the text.
+
+    A header line opens its section. A line starting with a terminator word
+    closes every other open section. Any other line belongs to every section
+    that is currently open.
+    """
+    spans = {section: [] for section in SECTION_HEADERS}
+    headers = {section: [] for section in SECTION_HEADERS}
+    open_sections = []
+
+    for start, end in iter_line_spans(text):
+        match = HEADER_PATTERN.match(text, start, end)
+        section = match.lastgroup if match else None
+        closes_others = bool(match) and match.group(section).lower() in TERMINATOR_HEADERS
+
+        if closes_others:
+            open_sections = []
+        else:
+            for open_section in open_sections:
+                if open_section != section:
+                    spans[open_section].append((start, end))
+
+        if section in SECTION_HEADERS:
+            headers[section].append((start, end))
+            if section not in open_sections:
+                open_sections.append(section)
+
+    return Segmentation(text, spans, headers)
@@ -0,0 +1,208 @@
+"""Compact encoding of stored analysis results and compressed JSON responses.
+
+An encoded result is a short header followed by a gzip stream of the
+result's compact JSON. The stream is a single gzip member, but the
+compressor is fully flushed (Z_FULL_FLUSH) between segments: each large
+top-level field (parsed_resume, usually) is a segment of its own, and runs
+of small fields share one. A full flush byte-aligns the output and resets
+the compression state, so each segment can be inflated on its own, starting
+at its offset. The header records the segments and which segment holds each
+field. So:
+
+- the stream is an ordinary one-member gzip file of the full JSON document
+  and is sent as-is to clients that accept gzip, without decoding anything;
+- decode(blob, fields) inflates and parses only the segments holding the
+  requested fields (/results/<id>?fields=ats_score,suggestions);
+- a full decode is one inflate and one JSON parse.
+
+JSON is written and parsed with orjson when it is installed, otherwise with
+the standard library. Responses are compressed with gzip, or brotli when the
+Brotli package is installed and the client prefers it.
+"""
+import os
+import json
+import zlib
+import struct
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# zlib level of stored results (1-9)
+RESULT_COMPRESSION_LEVEL = int(os.environ.get('RESULT_COMPRESSION_LEVEL', '6'))
+# Content encodings offered for responses, preferred first among those the client accepts equally.
+# gzip comes first because stored results are already gzip and are sent without recompressing.
+RESPONSE_ENCODINGS = [name.strip() for name in os.environ.get('RESPONSE_ENCODINGS', 'gzip,br').split(',') if name.strip()]
+# Compression levels of responses compressed on the fly
+RESPONSE_GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '5'))
+RESPONSE_BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '5'))
+# Smaller responses are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+# Fields whose JSON is at least this long get a segment of their own
+FIELD_SEGMENT_BYTES = 1024
+
+MAGIC = b'RAZ2'
+_HEADER_LENGTH = struct.Struct('>I')
+_GZIP_WBITS = 31
+_RAW_WBITS = -15
+# zlib's gzip header: no file name, comment or extra field
+_GZIP_HEADER_BYTES = 10
+
+
+def dumps(data):
+    """Compact JSON as bytes"""
+    if orjson is not None:
+        # Non-string keys are turned into strings, as the json module does
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _gzip(raw, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    return compressor.compress(raw) + compressor.flush()
+
+
+def encode(data, meta=None, level=RESULT_COMPRESSION_LEVEL):
+    """Encode a result dict; `meta` (e.g. the expiry time) is kept in the header, readable without inflating"""
+    groups, small = [], []
+    for key, value in data.items():
+        piece = dumps(key) + b':' + dumps(value)
+        if len(piece) >= FIELD_SEGMENT_BYTES:
+            if small:
+                groups.append(small)
+                small = []
+            groups.append([(key, piece)])
+        else:
+            small.append((key, piece))
+    if small or not groups:
+        groups.append(small)
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    chunks, spans, fields = [], [], {}
+    offset = start = _GZIP_HEADER_BYTES
+    for index, group in enumerate(groups):
+        raw = b','.join(piece for _, piece in group)
+        # Segments are consecutive slices of the document, so together they inflate to the whole of it
+        raw = (b'{' if index == 0 else b',') + raw + (b'}' if index == len(groups) - 1 else b'')
+        chunk = compressor.compress(raw) + compressor.flush(zlib.Z_FULL_FLUSH)
+        chunks.append(chunk)
+        offset += len(chunk) - (_GZIP_HEADER_BYTES if index == 0 else 0)
+        spans.append([start, offset])
+        start = offset
+        for key, _ in group:
+            fields[key] = index
+    chunks.append(compressor.flush())
+
+    header = dumps({'segments': spans, 'fields': fields, 'meta': meta or {}})
+    return b''.join([MAGIC, _HEADER_LENGTH.pack(len(header)), header] + chunks)
+
+
+def is_encoded(blob):
+    return isinstance(blob, (bytes, bytearray, memoryview)) and bytes(blob[:len(MAGIC)]) == MAGIC
+
+
+def read_header(blob):
+    """(header dict, offset of the gzip stream) of an encoded result"""
+    if not is_encoded(blob):
+        raise ValueError('Not an encoded result')
+    start = len(MAGIC) + _HEADER_LENGTH.size
+    length, = _HEADER_LENGTH.unpack_from(blob, len(MAGIC))
+    return loads(bytes(blob[start:start + length])), start + length
+
+
+def gzip_body(blob):
+    """The gzip stream of the full JSON document, without copying"""
+    _, offset = read_header(blob)
+    return memoryview(blob)[offset:]
+
+
+def inflate(blob):
+    """The full JSON document as bytes, not parsed"""
+    return zlib.decompress(gzip_body(blob), _GZIP_WBITS)
+
+
+def decode(blob, fields=None):
+    """The result dict, or only its `fields` that exist, inflating just the segments that hold them"""
+    if fields is None:
+        return loads(inflate(blob))
+    header, offset = read_header(blob)
+    view = memoryview(blob)
+    last = len(header['segments']) - 1
+    wanted = {}
+    for field in fields:
+        index = header['fields'].get(field)
+        if index is not None:
+            wanted.setdefault(index, []).append(field)
+
+    data = {}
+    for index, names in sorted(wanted.items()):
+        start, end = header['segments'][index]
+        # Raw deflate: a segment starts right after a full flush, with no state carried over
+        raw = zlib.decompressobj(_RAW_WBITS).decompress(view[offset + start:offset + end])
+        # Drop the segment's leading '{' or ',' and the document's closing '}'
+        group = loads(b'{' + raw[1:len(raw) - (index == last)] + b'}')
+        for name in names:
+            data[name] = group[name]
+    return data
+
+
+def parse_fields(value):
+    """The field names of a ?fields=a,b query parameter, or None to select everything"""
+    if not value:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def negotiate(accept_encoding, offered=RESPONSE_ENCODINGS):
+    """The content encoding to use for a request's Accept-Encoding header, or None for identity"""
+    accepted = {}
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0
+    for name in offered:
+        if name == 'br' and brotli is None:
+            continue
+        quality = accepted.get(name, accepted.get('*', 0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(body, encoding):
+    """(body, content encoding) with `body` compressed for the response, if it is worth it"""
+    if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if encoding == 'br':
+        return brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY), 'br'
+    return _gzip(body, RESPONSE_GZIP_LEVEL), 'gzip'
+
+
+def response_body(blob, fields=None, encoding=None):
+    """(body, content encoding) of an encoded result served as JSON, optionally only some fields"""
+    if fields is None and encoding == 'gzip':
+        return bytes(gzip_body(blob)), 'gzip'
+    if fields is None:
+        return compress(inflate(blob), encoding)
+    return compress(dumps(decode(blob, fields)), encoding)
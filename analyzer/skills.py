@@ -0,0 +1,123 @@
+import os
+import json
+from collections import deque, namedtuple
+
+
+DEFAULT_TAXONOMY_PATH = os.environ.get(
+    'SKILL_TAXONOMY_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.json')
+)
+
+# One occurrence of a taxonomy skill in a text; start/end are offsets into that text
+SkillHit = namedtuple('SkillHit', ['skill', 'group', 'category', 'start', 'end'])
+
+
+def load_taxonomy(path=DEFAULT_TAXONOMY_PATH):
+    """Load a taxonomy file of the form {group: {category: [skill, ...]}}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over every skill in a taxonomy.
+
+    The automaton is built once; find() then reports every skill occurrence
+    in a single left-to-right scan of the text, independent of how many
+    skills the taxonomy holds. Matches must sit on word boundaries, so
+    'go' does not match inside 'google' while 'c++' still matches 'c++,'.
+    """
+
+    def __init__(self, taxonomy):
+        self.taxonomy = taxonomy
+        # Per-state transitions, failure links and (pattern, payload) outputs
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        payloads = {}
+        for group, categories in taxonomy.items():
+            for category, skills in categories.items():
+                for skill in skills:
+                    skill = skill.strip().lower()
+                    if skill:
+                        payloads.setdefault(skill, []).append((group, category))
+
+        for skill, skill_payloads in payloads.items():
+            self._add(skill, skill_payloads)
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TAXONOMY_PATH):
+        return cls(load_taxonomy(path))
+
+    def _add(self, pattern, payloads):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((pattern, payloads))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                # Inherit the outputs of the longest proper suffix
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """Return every word-bounded skill occurrence in text, in order of end offset"""
+        lowered = text.lower()
+        # Offsets are only valid when lowercasing kept the length unchanged
+        if len(lowered) != len(text):
+            lowered = ''.join(char.lower()[0] for char in text)
+
+        hits = []
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        length = len(lowered)
+        for index, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = index + 1
+            for pattern, payloads in output[state]:
+                start = end - len(pattern)
+                # Only enforce a boundary where the pattern itself starts/ends with a word character
+                if _is_word_char(pattern[0]) and start > 0 and _is_word_char(lowered[start - 1]):
+                    continue
+                if _is_word_char(pattern[-1]) and end < length and _is_word_char(lowered[end]):
+                    continue
+                for group, category in payloads:
+                    hits.append(SkillHit(pattern, group, category, start, end))
+        return hits
+
+    def skills_in(self, text):
+        """Set of distinct skills found in text"""
+        return {hit.skill for hit in self.find(text)}
+
+    def categories(self, group):
+        return list(self.taxonomy.get(group, {}))
+
+
+# Built once at import and shared by every analysis in the process
+DEFAULT_MATCHER = SkillMatcher.from_file()
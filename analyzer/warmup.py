@@ -0,0 +1,119 @@
+"""Process warm-up and readiness.
+
+The heavy libraries are imported lazily by the stages that need them, so
+importing the app stays cheap. warmup.run() then does, once per process, the
+work the first requests would otherwise pay for: importing those libraries,
+loading the models named in PRELOAD_MODELS, and running a small analysis,
+report render and PDF extraction through the pipeline. Under gunicorn it runs
+in the master before workers fork (see gunicorn.conf.py), so every worker
+starts warm and shares that memory copy-on-write. Otherwise start() runs it
+in a background thread. /ready answers 503 until it has finished.
+"""
+import os
+import time
+import logging
+import threading
+import importlib
+
+from analyzer.models import preload_from_env
+
+
+# on: warm up at startup; off: only load PRELOAD_MODELS and let the first requests pay for the rest
+WARMUP = os.environ.get('WARMUP', 'on')
+
+# Imported lazily elsewhere: PDF extraction (pdfplumber, pypdfium2), /search (numpy) and the report renderers
+WARMUP_MODULES = ['pdfplumber', 'pypdfium2', 'numpy', 'reportlab.platypus', 'reportlab.graphics.shapes']
+
+SAMPLE_RESUME = '''Jane Doe
+jane.doe@example.com | (555) 123-4567 | linkedin.com/in/janedoe
+SUMMARY
+Backend engineer building data platforms.
+EXPERIENCE
+• Led a team of 4 engineers and reduced pipeline latency by 40%
+• Developed Python and SQL services on AWS with Docker
+EDUCATION
+B.Sc. Computer Science
+SKILLS
+Python, SQL, Docker, AWS, communication'''
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Runs the warm-up steps once per process and reports their progress"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.state = 'cold'
+        self.steps = {}  # Seconds per finished step
+        self.models = []
+        self.error = None
+        self.pid = None  # Process that ran the warm-up; forked workers inherit its result
+        self._lock = threading.Lock()
+
+    def _step(self, name, func):
+        start = time.perf_counter()
+        result = func()
+        self.steps[name] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _pending(self):
+        # A process forked while its parent was warming up has the state but not the thread doing the work
+        return self.state == 'cold' or (self.state == 'warming' and self.pid != os.getpid())
+
+    def run(self):
+        """Warm up this process unless it (or the process it was forked from) already did"""
+        with self._lock:
+            if not self._pending():
+                return self.state
+            self.state = 'warming'
+            self.pid = os.getpid()
+        try:
+            self.models = self._step('models', preload_from_env)
+            if self.enabled:
+                self._step('imports', lambda: [importlib.import_module(name) for name in WARMUP_MODULES])
+                analysis = self._step('analysis', self._analyze_sample)
+                report = self._step('report', lambda: self._render_sample(analysis))
+                self._step('pdf', lambda: self._extract_sample(report))
+            self.state = 'ready'
+        except Exception as e:
+            self.error = str(e)
+            self.state = 'failed'
+            logger.warning(f"Warm-up failed: {e}")
+        return self.state
+
+    @staticmethod
+    def _analyze_sample():
+        # No job description: jd_match would load the relevance model, which PRELOAD_MODELS decides on
+        from analyzer.resume_analyzer import ResumeAnalyzer
+        return ResumeAnalyzer.from_text(SAMPLE_RESUME).analyze()
+
+    @staticmethod
+    def _render_sample(analysis):
+        from analyzer.reports import get_renderer
+        return get_renderer().render(analysis)
+
+    @staticmethod
+    def _extract_sample(pdf):
+        # The rendered report doubles as a sample PDF for the layout extraction path
+        from analyzer.pdf_extract import PdfExtractor
+        return [page.text for page in PdfExtractor(pdf).pages()]
+
+    def start(self):
+        """Run the warm-up in a background thread (a no-op once started or finished)"""
+        if self._pending():
+            threading.Thread(target=self.run, name='warmup', daemon=True).start()
+
+    def status(self):
+        return {
+            'state': self.state,
+            'ready': self.state == 'ready',
+            'steps': dict(self.steps),
+            'models': list(self.models),
+            'error': self.error,
+            'warmed_pid': self.pid,
+            'pid': os.getpid()
+        }
+
+
+warmup = Warmup(enabled=WARMUP != 'off')
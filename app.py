@@ -1,25 +1,54 @@
 import os
-from flask import Flask, render_template, request, jsonify, send_from_directory, make_response
+import io
+from flask import Flask, Request, current_app, g, render_template, request, jsonify, send_from_directory, send_file, Response, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
-import json
 import time
-from datetime import datetime
 import uuid
-from xhtml2pdf import pisa
-from io import BytesIO
 import tempfile
+import zipfile
 
 # Import the resume analyzer module
-from analyzer.resume_analyzer import ResumeAnalyzer
+from analyzer.resume_analyzer import ResumeAnalyzer, ANALYZER_VERSION
+from analyzer.models import registry as model_registry
+from analyzer.jobs import JobQueue, QueueFull
+from analyzer.result_store import open_result_store
+from analyzer.serialization import compress, negotiate, parse_fields, response_body
+from analyzer.cache import BlobStore, ContentCache, hash_bytes, result_cache_key
+from analyzer.quality import QUALITY_MODE, apply_quality
+from analyzer.batch import run_batch, iter_sources, ranked, format_record, csv_header
+from analyzer.reports import ReportCache
+from analyzer.search_index import SearchIndex
+from analyzer.metrics import registry as metrics, STAGE_SECONDS, HTTP_REQUEST_SECONDS
+from analyzer.janitor import Janitor, default_quotas, UPLOAD_RETENTION_DAYS
+from analyzer.warmup import warmup
+
+class RouteLimitedRequest(Request):
+    """Request whose body limit depends on its route.
+
+    The limit applies to the bytes actually read, so a chunked upload without
+    a Content-Length is cut off too (with a 413) rather than read in full.
+    """
+    # Endpoint -> config key of its limit; other routes use MAX_CONTENT_LENGTH
+    ROUTE_LIMITS = {'upload_file': 'UPLOAD_MAX_CONTENT_LENGTH'}
+
+    @property
+    def max_content_length(self):
+        if current_app and self.endpoint in self.ROUTE_LIMITS:
+            return current_app.config[self.ROUTE_LIMITS[self.endpoint]]
+        return super().max_content_length
 
 app = Flask(__name__)
+app.request_class = RouteLimitedRequest
 CORS(app)
 
 # Configuration
-app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads'))
 app.config['ALLOWED_EXTENSIONS'] = {'pdf', 'docx'}
-app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # 2MB max file size
+app.config['UPLOAD_MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # 2MB max file size
+# Request-wide limit, sized for /batch zip uploads; /upload enforces its own limit above
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('BATCH_MAX_CONTENT_LENGTH', str(200 * 1024 * 1024)))
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', '0')) or None  # None uses every available core
 
 # Create upload folder if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -28,15 +57,99 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 RESULTS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
 os.makedirs(RESULTS_FOLDER, exist_ok=True)
 
+# Analysis results, looked up by result id (see analyzer/result_store.py)
+result_store = open_result_store()
+
+# Uploads are analyzed from memory; they are only kept (once per distinct content) when UPLOAD_RETENTION_DAYS > 0
+blob_store = BlobStore(os.path.join(app.config['UPLOAD_FOLDER'], 'blobs'))
+
+# Cache of extracted text, parsed sections and final results keyed by content hash
+app.config['CACHE_DATABASE'] = os.environ.get('CACHE_DATABASE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache.db'))
+app.config['CACHE_MAX_BYTES'] = int(os.environ.get('CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+content_cache = ContentCache(app.config['CACHE_DATABASE'], max_bytes=app.config['CACHE_MAX_BYTES'])
+
+# Inverted index of analyzed resumes for /search
+search_index = SearchIndex()
+
+# Rendered PDF reports, cached per result id, renderer and template version
+app.config['REPORTS_FOLDER'] = os.environ.get('REPORTS_FOLDER', os.path.join(RESULTS_FOLDER, 'reports'))
+report_cache = ReportCache(app.config['REPORTS_FOLDER'])
+
+# Age and size quotas for stored uploads and reports, plus expiry of old results (see analyzer/janitor.py)
+janitor = Janitor(
+    default_quotas(app.config['UPLOAD_FOLDER'], app.config['REPORTS_FOLDER']),
+    os.path.join(RESULTS_FOLDER, '.janitor.lock'),
+    tasks=[result_store.expire]
+)
+
+# Background analysis queue
+app.config['JOBS_DATABASE'] = os.environ.get('JOBS_DATABASE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db'))
+app.config['ANALYSIS_WORKERS'] = int(os.environ.get('ANALYSIS_WORKERS', '2'))
+app.config['ANALYSIS_QUEUE_SIZE'] = int(os.environ.get('ANALYSIS_QUEUE_SIZE', '50'))
+app.config['ANALYSIS_TIMEOUT'] = int(os.environ.get('ANALYSIS_TIMEOUT', '120'))
+
+# Cached results are only reused under the same analyzer version and quality mode
+RESULT_VERSION = ANALYZER_VERSION if QUALITY_MODE == 'off' else f'{ANALYZER_VERSION}+quality'
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    # Started lazily so each gunicorn worker starts its own thread after forking
+    janitor.start()
+    # A no-op when the gunicorn master warmed up before forking this worker
+    warmup.start()
+
+@app.after_request
+def record_request_metrics(response):
+    # Route templates, not raw paths, so ids do not create a series per request
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    HTTP_REQUEST_SECONDS.observe(elapsed, request.method, route, str(response.status_code))
+    try:
+        metrics.maybe_flush()
+    except Exception as e:
+        app.logger.warning(f"Could not flush metrics: {e}")
+    return response
+
+@app.after_request
+def compress_response(response):
+    # Compress JSON bodies for clients that accept it; streamed (/batch) and already encoded (/results) ones are left as is
+    if (response.mimetype != 'application/json' or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    body, encoding = compress(response.get_data(), negotiate(request.headers.get('Accept-Encoding')))
+    if encoding:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+def get_cached_result(file_hash, job_description):
+    """An earlier analysis of the same file with the same job description, if still cached"""
+    cached_result = content_cache.get('result', result_cache_key(file_hash, job_description, RESULT_VERSION))
+    if cached_result and cached_result['result_id'] not in result_store:
+        result_store.put(cached_result['result_id'], cached_result)
+    return cached_result
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+@app.errorhandler(413)
+def request_too_large(e):
+    if request.endpoint == 'upload_file':
+        return jsonify({'error': 'File size exceeds 2MB. Please upload a smaller file.'}), 413
+    return jsonify({'error': 'Request too large'}), 413
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
+    # Declared sizes are rejected up front; RouteLimitedRequest enforces the limit on what is read
+    if request.content_length and request.content_length > app.config['UPLOAD_MAX_CONTENT_LENGTH']:
+        return jsonify({'error': 'File size exceeds 2MB. Please upload a smaller file.'}), 413
+    
     if 'resume' not in request.files:
         return jsonify({'error': 'No file part'}), 400
     
@@ -51,244 +164,348 @@ def upload_file():
     # Get job description if provided
     job_description = request.form.get('job_description', '')
     
-    # Generate a unique filename
-    filename = secure_filename(file.filename)
-    unique_id = str(uuid.uuid4())
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_filename = f"{timestamp}_{unique_id}_{filename}"
+    # Identify the upload by its content so repeat uploads are recognized
+    file_data = file.read()
+    file_hash = hash_bytes(file_data)
+    extension = os.path.splitext(secure_filename(file.filename))[1].lower()
     
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-    file.save(file_path)
-    
-    try:
-        # Initialize the resume analyzer
-        analyzer = ResumeAnalyzer(file_path, job_description)
-        
-        # Analyze the resume
-        analysis_result = analyzer.analyze()
-        
-        # Add result_id to the analysis result
-        analysis_result['result_id'] = unique_id
-        
-        # Save the analysis result
-        result_filename = f"{timestamp}_{unique_id}_result.json"
-        result_path = os.path.join(RESULTS_FOLDER, result_filename)
-        
-        with open(result_path, 'w') as f:
-            json.dump(analysis_result, f)
-        
+    # A repeat upload with the same job description skips extraction and scoring entirely
+    cached_result = get_cached_result(file_hash, job_description)
+    if cached_result:
         return jsonify({
             'success': True,
-            'result_id': unique_id,
-            'analysis': analysis_result
+            'result_id': cached_result['result_id'],
+            'analysis': cached_result,
+            'cached': True
         })
     
+    # Queue the analysis with the file itself; nothing is written to the upload folder on the request path
+    try:
+        job_id = job_queue.submit({
+            'extension': extension,
+            'file_hash': file_hash,
+            'job_description': job_description,
+            'result_id': str(uuid.uuid4())
+        }, data=file_data)
+    except QueueFull:
+        response = jsonify({'error': 'The server is busy analyzing other resumes. Please try again shortly.'})
+        response.headers['Retry-After'] = '10'
+        return response, 429
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': f'/jobs/{job_id}'
+    }), 202
+
+def analyze_resume_job(payload):
+    """Run one queued analysis and save its result (executed in a worker process)"""
+    try:
+        return run_analysis(payload)
+    except Exception:
+        # post_process_job, which flushes on success, does not run for failed jobs
+        metrics.flush()
+        content_cache.flush()
+        raise
+
+def _job_source(payload):
+    """The uploaded file of a job: its bytes, or a stored path for jobs queued by older versions"""
+    if payload.get('data') is not None:
+        return io.BytesIO(payload['data']), payload['extension']
+    return payload['file_path'], None
+
+def run_analysis(payload):
+    file_hash = payload['file_hash']
+    job_description = payload['job_description']
+    artifact_key = f"{file_hash}:{ANALYZER_VERSION}"
+
+    # Keep the original upload only if asked to; the janitor removes it after the retention period
+    if UPLOAD_RETENTION_DAYS > 0 and payload.get('data') is not None:
+        blob_store.save(payload['data'], payload['extension'], file_hash)
+
+    # Reuse text, sections and job-independent scores from an earlier upload of the same file
+    resume_text = content_cache.get('text', artifact_key)
+    if resume_text is None:
+        source, extension = _job_source(payload)
+        analyzer = ResumeAnalyzer(source, job_description, extension=extension, ocr_cache=content_cache)
+        content_cache.put('text', artifact_key, analyzer.resume_text)
+        content_cache.put('sections', artifact_key, analyzer.parsed_resume)
+    else:
+        parsed_resume = content_cache.get('sections', artifact_key)
+        analyzer = ResumeAnalyzer.from_text(resume_text, job_description, parsed_resume,
+                                            profile=content_cache.get('profile', artifact_key))
+        if parsed_resume is None:
+            content_cache.put('sections', artifact_key, analyzer.parsed_resume)
+    cached_profile = analyzer.profile is not None
+    
+    # Analyze the resume
+    analyzer.quality_cache = content_cache
+    analysis_result = analyzer.analyze()
+    if not cached_profile:
+        content_cache.put('profile', artifact_key, analyzer.profile)
+    if QUALITY_MODE == 'background':
+        # Filled in by assess_quality_job once the client already has the scores
+        analysis_result['quality'] = {'pending': True}
+    
+    # Add result_id to the analysis result; the file hash lets /results/<id>/rescore find the cached artifacts
+    analysis_result['result_id'] = payload['result_id']
+    analysis_result['file_hash'] = file_hash
+    
+    # Save the analysis result and remember it for repeat uploads
+    start = time.perf_counter()
+    result_store.put(payload['result_id'], analysis_result)
+    content_cache.put('result', result_cache_key(file_hash, job_description, RESULT_VERSION), analysis_result)
+    STAGE_SECONDS.observe(time.perf_counter() - start, 'store')
+    
+    # Make the resume findable by /search; one document per distinct file
+    try:
+        search_index.add(payload['result_id'], analysis_result['parsed_resume'],
+                         analysis_result['ats_score']['overall'], doc_key=file_hash)
+    except Exception as e:
+        app.logger.warning(f"Could not index result {payload['result_id']}: {e}")
+    
+    return {'result_id': payload['result_id'], 'analysis': analysis_result}
+
+def assess_quality_job(payload, result):
+    """Score bullet quality and merge it into the stored result (QUALITY_MODE=background)"""
+    analysis_result = result['analysis']
+    artifact_key = f"{payload['file_hash']}:{ANALYZER_VERSION}"
+    resume_text = content_cache.get('text', artifact_key)
+    if resume_text is None:
+        source, extension = _job_source(payload)
+        analyzer = ResumeAnalyzer(source, payload['job_description'], extension=extension,
+                                  ocr_cache=content_cache)
+    else:
+        analyzer = ResumeAnalyzer.from_text(resume_text, payload['job_description'], analysis_result['parsed_resume'])
+    analyzer.quality_cache = content_cache
+    apply_quality(analysis_result, analyzer.assess_quality())
+    
+    result_store.put(payload['result_id'], analysis_result)
+    content_cache.put('result', result_cache_key(payload['file_hash'], payload['job_description'], RESULT_VERSION),
+                      analysis_result)
+
+def post_process_job(payload, result):
+    """Follow-up work run after the job is marked done: background quality, then the PDF report"""
+    if QUALITY_MODE == 'background':
+        try:
+            assess_quality_job(payload, result)
+        except Exception as e:
+            app.logger.warning(f"Could not assess quality for {result['result_id']}: {e}")
+            # Drop the pending marker so clients stop waiting for it
+            result['analysis']['quality'] = None
+            result_store.put(result['result_id'], result['analysis'])
+    
+    # Render the PDF report ahead of the first download
+    start = time.perf_counter()
+    try:
+        report_cache.get_or_render(result['result_id'], result['analysis'])
+        STAGE_SECONDS.observe(time.perf_counter() - start, 'report')
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        # /download-pdf renders on demand if this fails
+        app.logger.warning(f"Could not pre-render report {result['result_id']}: {e}")
+    
+    # Job processes serve no requests, so nothing else flushes what they counted
+    metrics.flush()
+    content_cache.flush()
+
+job_queue = JobQueue(
+    app.config['JOBS_DATABASE'],
+    analyze_resume_job,
+    workers=app.config['ANALYSIS_WORKERS'],
+    max_queued=app.config['ANALYSIS_QUEUE_SIZE'],
+    timeout=app.config['ANALYSIS_TIMEOUT'],
+    after=post_process_job,
+    preload=['app', 'analyzer.preload']
+)
+
+@app.route('/batch', methods=['POST'])
+def batch_analyze():
+    # Score a zip of resumes against one job description, streaming results as they finish
+    if 'resumes' not in request.files:
+        return jsonify({'error': 'No file part'}), 400
+    
+    archive = request.files['resumes']
+    if not archive.filename.lower().endswith('.zip'):
+        return jsonify({'error': 'Please upload a .zip file of PDF or DOCX resumes.'}), 400
+    
+    job_description = request.form.get('job_description', '')
+    output_format = request.form.get('format', 'jsonl')
+    order = request.form.get('order', 'finished')
+    if output_format not in ('jsonl', 'csv') or order not in ('finished', 'ranked'):
+        return jsonify({'error': "format must be 'jsonl' or 'csv' and order 'finished' or 'ranked'"}), 400
+    
+    # Workers read resumes straight from the saved archive
+    fd, zip_path = tempfile.mkstemp(suffix='.zip')
+    os.close(fd)
+    archive.save(zip_path)
+    if not zipfile.is_zipfile(zip_path):
+        os.remove(zip_path)
+        return jsonify({'error': 'The uploaded file is not a valid zip archive.'}), 400
+    
+    def generate():
+        try:
+            if output_format == 'csv':
+                yield csv_header()
+            records = run_batch(iter_sources(zip_path), job_description, app.config['BATCH_WORKERS'])
+            if order == 'ranked':
+                records = ranked(list(records))
+            for record in records:
+                yield format_record(record, output_format)
+        finally:
+            os.remove(zip_path)
+    
+    mimetype = 'text/csv' if output_format == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    # Flatten the finished result so clients get the same shape /upload used to return
+    result = job.pop('result', None)
+    if result:
+        job['result_id'] = result['result_id']
+        job['analysis'] = result['analysis']
+    return jsonify(job)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    # Totals from every worker and job process, plus the queue as it is right now
+    queue = job_queue.metrics()
+    body = metrics.render(gauges=[
+        ('analysis_queue_depth', 'Analysis jobs waiting to run', queue['queue_depth']),
+        ('analysis_jobs_running', 'Analysis jobs currently running', queue['running'])
+    ])
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/jobs/metrics')
+def job_metrics():
+    # Queue depth plus wait/run latency of jobs handled by this worker
+    return jsonify(job_queue.metrics())
 
 @app.route('/results/<result_id>')
 def get_result(result_id):
-    # Find the result file with the given ID
-    for filename in os.listdir(RESULTS_FOLDER):
-        if result_id in filename and filename.endswith('_result.json'):
-            with open(os.path.join(RESULTS_FOLDER, filename), 'r') as f:
-                return jsonify(json.load(f))
+    # Served from the stored encoding: gzip clients get the stored bytes as they are, and
+    # ?fields=ats_score,suggestions decodes only the requested top-level fields
+    encoded = result_store.get_encoded(result_id)
+    if encoded is None:
+        return jsonify({'error': 'Result not found'}), 404
     
-    return jsonify({'error': 'Result not found'}), 404
+    encoding = negotiate(request.headers.get('Accept-Encoding'))
+    body, encoding = response_body(encoded, parse_fields(request.args.get('fields')), encoding)
+    response = Response(body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
 
-@app.route('/download-pdf/<result_id>')
-def download_pdf_report(result_id):
-    # Find the result file with the given ID
-    result_data = None
-    for filename in os.listdir(RESULTS_FOLDER):
-        if result_id in filename and filename.endswith('_result.json'):
-            with open(os.path.join(RESULTS_FOLDER, filename), 'r') as f:
-                result_data = json.load(f)
-                break
-    
+@app.route('/results/<result_id>/rescore', methods=['POST'])
+def rescore_result(result_id):
+    """Score an analyzed resume against a new job description, reusing everything that does not depend on it"""
+    result_data = result_store.get(result_id)
     if not result_data:
         return jsonify({'error': 'Result not found'}), 404
     
-    # Generate PDF report
-    pdf_content = generate_pdf_report(result_data)
+    data = request.get_json(silent=True) or request.form
+    job_description = data.get('job_description', '')
+    file_hash = result_data.get('file_hash')
     
-    # Create response with PDF
-    response = make_response(pdf_content)
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = f'attachment; filename=resume_analysis_report.pdf'
+    cached_result = get_cached_result(file_hash, job_description) if file_hash else None
+    if cached_result:
+        return jsonify({'success': True, 'result_id': cached_result['result_id'], 'analysis': cached_result,
+                        'cached': True})
     
-    return response
+    # Only the text is needed again; sections come from the result, the job-independent scores from the cache
+    artifact_key = f"{file_hash}:{ANALYZER_VERSION}"
+    resume_text = content_cache.get('text', artifact_key) if file_hash else None
+    if resume_text is None:
+        return jsonify({'error': 'This analysis can no longer be re-scored. Please upload the resume again.'}), 409
+    
+    # Bullet quality does not depend on the job description either; reuse it once assessed
+    quality = result_data.get('quality')
+    analyzer = ResumeAnalyzer.from_text(resume_text, job_description, result_data['parsed_resume'],
+                                        profile=content_cache.get('profile', artifact_key),
+                                        quality=quality if quality and not quality.get('pending') else None)
+    cached_profile = analyzer.profile is not None
+    analysis_result = analyzer.analyze()
+    if not cached_profile:
+        content_cache.put('profile', artifact_key, analyzer.profile)
+    if result_data.get('extraction'):
+        analysis_result['extraction'] = result_data['extraction']
+    
+    new_result_id = str(uuid.uuid4())
+    analysis_result['result_id'] = new_result_id
+    analysis_result['file_hash'] = file_hash
+    result_store.put(new_result_id, analysis_result)
+    content_cache.put('result', result_cache_key(file_hash, job_description, RESULT_VERSION), analysis_result)
+    
+    return jsonify({'success': True, 'result_id': new_result_id, 'analysis': analysis_result})
 
-def generate_pdf_report(data):
-    # Create HTML content for the PDF
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Get scores
-    overall_score = data['ats_score']['overall']
-    category_scores = data['ats_score']['categories']
-    suggestions = data['suggestions']
-    
-    # Create HTML content
-    html = f'''
-    <html>
-    <head>
-        <title>Resume Analysis Report</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 20px; }}
-            h1, h2, h3 {{ color: #333; }}
-            .header {{ text-align: center; margin-bottom: 30px; }}
-            .score-overview {{ margin-bottom: 20px; }}
-            .score-box {{ 
-                display: inline-block; 
-                width: 100px; 
-                height: 100px; 
-                line-height: 100px; 
-                text-align: center; 
-                font-size: 36px; 
-                font-weight: bold; 
-                border-radius: 50%; 
-                margin: 0 auto; 
-                color: white;
-            }}
-            .good {{ background-color: #28a745; }}
-            .average {{ background-color: #ffc107; }}
-            .poor {{ background-color: #dc3545; }}
-            .category-scores {{ margin-bottom: 30px; }}
-            .category {{ margin-bottom: 10px; }}
-            .category-name {{ display: inline-block; width: 100px; }}
-            .category-score {{ 
-                display: inline-block; 
-                width: 40px; 
-                text-align: center; 
-                font-weight: bold; 
-                margin-right: 10px; 
-            }}
-            .progress {{ 
-                display: inline-block; 
-                width: 300px; 
-                height: 20px; 
-                background-color: #f0f0f0; 
-                border-radius: 10px; 
-                overflow: hidden; 
-            }}
-            .progress-bar {{ 
-                height: 100%; 
-                border-radius: 10px; 
-            }}
-            .suggestions {{ margin-bottom: 30px; }}
-            .suggestion-category {{ margin-bottom: 20px; }}
-            .timestamp {{ text-align: right; font-size: 12px; color: #666; }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Resume Analysis Report</h1>
-            <p>This report provides an analysis of your resume's ATS compatibility and suggestions for improvement.</p>
-        </div>
-        
-        <div class="score-overview">
-            <h2>Overall ATS Score</h2>
-            <div class="score-box {'good' if overall_score >= 80 else 'average' if overall_score >= 60 else 'poor'}">
-                {overall_score}
-            </div>
-            <p>{'Your resume is well-optimized for ATS systems.' if overall_score >= 80 else 
-               'Your resume needs some improvements for better ATS compatibility.' if overall_score >= 60 else 
-               'Your resume needs significant improvements for ATS compatibility.'}</p>
-        </div>
-        
-        <div class="category-scores">
-            <h2>Category Scores</h2>
-            
-            <div class="category">
-                <span class="category-name">Content:</span>
-                <span class="category-score">{category_scores['content']}</span>
-                <div class="progress">
-                    <div class="progress-bar" style="width: {category_scores['content']}%; 
-                         background-color: {'#28a745' if category_scores['content'] >= 80 else '#ffc107' if category_scores['content'] >= 60 else '#dc3545'}"></div>
-                </div>
-            </div>
-            
-            <div class="category">
-                <span class="category-name">Format:</span>
-                <span class="category-score">{category_scores['format']}</span>
-                <div class="progress">
-                    <div class="progress-bar" style="width: {category_scores['format']}%; 
-                         background-color: {'#28a745' if category_scores['format'] >= 80 else '#ffc107' if category_scores['format'] >= 60 else '#dc3545'}"></div>
-                </div>
-            </div>
-            
-            <div class="category">
-                <span class="category-name">Skills:</span>
-                <span class="category-score">{category_scores['skills']}</span>
-                <div class="progress">
-                    <div class="progress-bar" style="width: {category_scores['skills']}%; 
-                         background-color: {'#28a745' if category_scores['skills'] >= 80 else '#ffc107' if category_scores['skills'] >= 60 else '#dc3545'}"></div>
-                </div>
-            </div>
-            
-            <div class="category">
-                <span class="category-name">Sections:</span>
-                <span class="category-score">{category_scores['sections']}</span>
-                <div class="progress">
-                    <div class="progress-bar" style="width: {category_scores['sections']}%; 
-                         background-color: {'#28a745' if category_scores['sections'] >= 80 else '#ffc107' if category_scores['sections'] >= 60 else '#dc3545'}"></div>
-                </div>
-            </div>
-            
-            <div class="category">
-                <span class="category-name">Style:</span>
-                <span class="category-score">{category_scores['style']}</span>
-                <div class="progress">
-                    <div class="progress-bar" style="width: {category_scores['style']}%; 
-                         background-color: {'#28a745' if category_scores['style'] >= 80 else '#ffc107' if category_scores['style'] >= 60 else '#dc3545'}"></div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="suggestions">
-            <h2>Improvement Suggestions</h2>
-            
-            <div class="suggestion-category">
-                <h3>Content Suggestions</h3>
-                {'<ul>' + ''.join([f'<li>{suggestion}</li>' for suggestion in suggestions['content']]) + '</ul>' if suggestions['content'] else '<p>Great job! No content improvements needed.</p>'}
-            </div>
-            
-            <div class="suggestion-category">
-                <h3>Format Suggestions</h3>
-                {'<ul>' + ''.join([f'<li>{suggestion}</li>' for suggestion in suggestions['format']]) + '</ul>' if suggestions['format'] else '<p>Great job! No format improvements needed.</p>'}
-            </div>
-            
-            <div class="suggestion-category">
-                <h3>Skills Suggestions</h3>
-                {'<ul>' + ''.join([f'<li>{suggestion}</li>' for suggestion in suggestions['skills']]) + '</ul>' if suggestions['skills'] else '<p>Great job! No skills improvements needed.</p>'}
-            </div>
-            
-            <div class="suggestion-category">
-                <h3>Sections Suggestions</h3>
-                {'<ul>' + ''.join([f'<li>{suggestion}</li>' for suggestion in suggestions['sections']]) + '</ul>' if suggestions['sections'] else '<p>Great job! No section improvements needed.</p>'}
-            </div>
-            
-            <div class="suggestion-category">
-                <h3>Style Suggestions</h3>
-                {'<ul>' + ''.join([f'<li>{suggestion}</li>' for suggestion in suggestions['style']]) + '</ul>' if suggestions['style'] else '<p>Great job! No style improvements needed.</p>'}
-            </div>
-        </div>
-        
-        <div class="timestamp">
-            <p>Report generated on: {timestamp}</p>
-        </div>
-    </body>
-    </html>
-    '''
-    
-    # Convert HTML to PDF
-    result = BytesIO()
-    pdf = pisa.pisaDocument(BytesIO(html.encode('UTF-8')), result)
-    
-    if not pdf.err:
-        return result.getvalue()
-    else:
-        return None
+@app.route('/search', methods=['GET', 'POST'])
+def search_resumes():
+    # Rank previously analyzed resumes against a job description (BM25 over the search index)
+    data = request.get_json(silent=True) or request.form
+    job_description = data.get('job_description') or request.args.get('q', '')
+    if not job_description.strip():
+        return jsonify({'error': 'Provide a job description (job_description field or ?q=)'}), 400
+    try:
+        top = min(int(data.get('top') or request.args.get('top', 10)), 100)
+    except ValueError:
+        return jsonify({'error': 'top must be an integer'}), 400
+    
+    start = time.perf_counter()
+    # Fetch a few extra hits in case some results have expired from the store
+    hits = [hit for hit in search_index.search(job_description, top + 10) if hit['result_id'] in result_store][:top]
+    for hit in hits:
+        hit['url'] = f"/results/{hit['result_id']}"
+    return jsonify({
+        'results': hits,
+        'took_ms': round((time.perf_counter() - start) * 1000, 2)
+    })
+
+@app.route('/search/stats')
+def search_stats():
+    return jsonify(search_index.stats())
+
+@app.route('/cache/stats')
+def cache_stats():
+    # Hit/miss counters for the text, sections and result caches
+    return jsonify(content_cache.stats())
+
+@app.route('/models/stats')
+def model_stats():
+    # Load times and memory usage of the shared NLP models in this worker
+    return jsonify(model_registry.stats())
+
+@app.route('/ready')
+def ready():
+    # Readiness probe: 200 once this worker has warmed up (see analyzer/warmup.py), 503 until then
+    status = warmup.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/download-pdf/<result_id>')
+def download_pdf_report(result_id):
+    if result_id not in result_store:
+        return jsonify({'error': 'Result not found'}), 404
+    
+    # Usually rendered already by the analysis job; the result is only read to render it now if not
+    try:
+        report_path = report_cache.get(result_id) or report_cache.render(result_id, result_store.get(result_id))
+    except Exception:
+        return jsonify({'error': 'Could not generate the PDF report'}), 500
+    
+    # Conditional GET: clients holding the current ETag get a 304
+    return send_file(
+        report_path,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name='resume_analysis_report.pdf',
+        etag=report_cache.etag(result_id),
+        conditional=True,
+        max_age=3600
+    )
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,362 @@
+"""ASGI entry point: the same app, with the busiest routes served from an event loop.
+
+Run with: uvicorn asgi:app --workers 2
+
+/upload, /results/<result_id> and /download-pdf/<result_id> are handled here
+without holding a worker per request. Result and report reads and writes run
+on a small thread pool, and the analysis itself (and report rendering) runs in
+a process pool via run_in_executor, so the loop stays free for cheap requests
+while analyses are in flight. /upload answers with the finished analysis
+instead of a job id to poll. Every other route is passed to the Flask app in
+app.py, which also provides the configuration, stores and analysis functions.
+"""
+import io
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import asyncio
+import multiprocessing
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.wrappers import Request
+from werkzeug.utils import secure_filename
+
+import app as web
+from analyzer.cache import hash_bytes
+from analyzer.serialization import compress, negotiate, parse_fields, response_body
+from analyzer.sandbox import SANDBOX_MAX_JOBS, init_worker, limited_call
+from analyzer.metrics import registry as metrics, HTTP_REQUEST_SECONDS
+
+# Threads for blocking file and SQLite I/O (result store, content cache, reports)
+ASYNC_IO_THREADS = int(os.environ.get('ASYNC_IO_THREADS', '8'))
+
+_io_pool = ThreadPoolExecutor(ASYNC_IO_THREADS, thread_name_prefix='asgi-io')
+_process_pool = None
+# Analyses submitted to the process pool and not finished yet, across all requests of this worker
+_in_flight = 0
+# Post-processing futures, kept referenced until they finish
+_background = set()
+
+
+def _get_process_pool():
+    """The analysis process pool, created on first use in each server worker.
+
+    Its processes come from the same fork server as the job queue's, so
+    they start with app and the PRELOAD_MODELS already imported, and run
+    under the same memory and per-job CPU limits (see analyzer/sandbox.py).
+    """
+    global _process_pool
+    if _process_pool is None:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+        _process_pool = ProcessPoolExecutor(web.app.config['ANALYSIS_WORKERS'], mp_context=context,
+                                            initializer=init_worker, max_tasks_per_child=SANDBOX_MAX_JOBS)
+    return _process_pool
+
+
+def _discard_process_pool(pool):
+    """Drop a pool broken by a crashed worker; the next analysis starts a new one"""
+    global _process_pool
+    if _process_pool is pool:
+        _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_io(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_io_pool, func, *args)
+
+
+async def _read_body(receive, limit):
+    """The whole request body, or None once it grows past limit bytes"""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def _environ(scope, body):
+    """A WSGI environ for the request, for the Flask app and werkzeug's form parser"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client')
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0] if client else '',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope.get('headers', []):
+        name, value = name.decode('latin-1').upper().replace('-', '_'), value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def _header(scope, name):
+    name = name.lower().encode('latin-1')
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+async def _respond(send, status, body, content_type='application/json', headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type.encode('latin-1')),
+                    (b'content-length', str(len(body)).encode('latin-1'))]
+                   + [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+    return status
+
+
+async def _respond_json(send, status, data, headers=(), scope=None):
+    """Send `data` as JSON, compressed as the client accepts when given the request's `scope`"""
+    body = json.dumps(data).encode('utf-8')
+    if scope is not None:
+        body, encoding = compress(body, negotiate(_header(scope, 'accept-encoding')))
+        headers = list(headers) + [('Vary', 'Accept-Encoding')] + ([('Content-Encoding', encoding)] if encoding else [])
+    return await _respond(send, status, body, headers=headers)
+
+
+def _log_background_failure(future):
+    _background.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        web.app.logger.warning(f"Post-processing failed: {future.exception()}")
+
+
+async def upload(scope, receive, send):
+    global _in_flight
+    config = web.app.config
+    content_length = _header(scope, 'content-length')
+    if content_length and content_length.isdigit() and int(content_length) > config['UPLOAD_MAX_CONTENT_LENGTH']:
+        return await _respond_json(send, 413, {'error': 'File size exceeds 2MB. Please upload a smaller file.'})
+    body = await _read_body(receive, config['UPLOAD_MAX_CONTENT_LENGTH'])
+    if body is None:
+        return await _respond_json(send, 413, {'error': 'File size exceeds 2MB. Please upload a smaller file.'})
+
+    request = Request(_environ(scope, body))
+    if 'resume' not in request.files:
+        return await _respond_json(send, 400, {'error': 'No file part'})
+    file = request.files['resume']
+    if file.filename == '':
+        return await _respond_json(send, 400, {'error': 'No selected file'})
+    if not web.allowed_file(file.filename):
+        return await _respond_json(send, 400, {'error': 'File type not allowed. Please upload PDF or DOCX files only.'})
+
+    job_description = request.form.get('job_description', '')
+    file_data = file.read()
+    file_hash = hash_bytes(file_data)
+    extension = os.path.splitext(secure_filename(file.filename))[1].lower()
+
+    # A repeat upload with the same job description skips extraction and scoring entirely
+    cached_result = await _run_io(web.get_cached_result, file_hash, job_description)
+    if cached_result:
+        return await _respond_json(send, 200, {'success': True, 'result_id': cached_result['result_id'],
+                                               'analysis': cached_result, 'cached': True}, scope=scope)
+
+    # Same bound as the job queue: running analyses plus the ones allowed to wait
+    if _in_flight >= config['ANALYSIS_WORKERS'] + config['ANALYSIS_QUEUE_SIZE']:
+        return await _respond_json(send, 429, {'error': 'The server is busy analyzing other resumes. Please try again shortly.'},
+                                   headers=[('Retry-After', '10')])
+
+    payload = {
+        'extension': extension,
+        'file_hash': file_hash,
+        'job_description': job_description,
+        'result_id': str(uuid.uuid4()),
+        'data': file_data
+    }
+    loop = asyncio.get_running_loop()
+    pool = _get_process_pool()
+    _in_flight += 1
+    try:
+        # A timed-out analysis cannot be killed inside the pool; it finishes and its result is dropped
+        result = await asyncio.wait_for(
+            loop.run_in_executor(pool, limited_call, web.analyze_resume_job, payload),
+            config['ANALYSIS_TIMEOUT'])
+    except asyncio.TimeoutError:
+        return await _respond_json(send, 504, {'error': f"Analysis timed out after {config['ANALYSIS_TIMEOUT']} seconds",
+                                               'error_type': 'timeout'})
+    except BrokenProcessPool:
+        # A worker died mid-analysis (a resource limit, the OOM killer or a crash) and took the pool with it
+        _discard_process_pool(pool)
+        return await _respond_json(send, 500, {'error': 'Analysis process exited unexpectedly', 'error_type': 'crashed'})
+    except MemoryError:
+        return await _respond_json(send, 500, {'error': 'Analysis needed more memory than allowed',
+                                               'error_type': 'memory_limit'})
+    except Exception as e:
+        return await _respond_json(send, 500, {'error': str(e), 'error_type': 'error'})
+    finally:
+        _in_flight -= 1
+
+    # Background quality and the PDF report, as the job queue's `after` hook does
+    future = loop.run_in_executor(pool, web.post_process_job, payload, result)
+    _background.add(future)
+    future.add_done_callback(_log_background_failure)
+
+    return await _respond_json(send, 200, {'success': True, 'result_id': result['result_id'],
+                                           'analysis': result['analysis']}, scope=scope)
+
+
+async def get_result(scope, receive, send, result_id):
+    # Served from the stored encoding, as app.py does: no decoding for gzip clients, only the ?fields= asked for
+    encoded = await _run_io(web.result_store.get_encoded, result_id)
+    if encoded is None:
+        return await _respond_json(send, 404, {'error': 'Result not found'})
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    fields = parse_fields(query.get('fields', [''])[0])
+    body, encoding = response_body(encoded, fields, negotiate(_header(scope, 'accept-encoding')))
+    headers = [('Vary', 'Accept-Encoding')] + ([('Content-Encoding', encoding)] if encoding else [])
+    return await _respond(send, 200, body, headers=headers)
+
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+async def download_pdf(scope, receive, send, result_id):
+    if not await _run_io(web.result_store.__contains__, result_id):
+        return await _respond_json(send, 404, {'error': 'Result not found'})
+
+    report_cache = web.report_cache
+    etag = f'"{report_cache.etag(result_id)}"'
+    headers = [('ETag', etag), ('Cache-Control', 'public, max-age=3600')]
+    # Usually rendered already by the analysis; render now in the process pool if not
+    try:
+        report_path = await _run_io(report_cache.get, result_id)
+        if report_path is None:
+            result_data = await _run_io(web.result_store.get, result_id)
+            report_path = await asyncio.get_running_loop().run_in_executor(
+                _get_process_pool(), report_cache.render, result_id, result_data)
+        if _header(scope, 'if-none-match') == etag:
+            return await _respond(send, 304, b'', headers=headers)
+        pdf_content = await _run_io(_read_file, report_path)
+    except Exception:
+        return await _respond_json(send, 500, {'error': 'Could not generate the PDF report'})
+
+    headers.append(('Content-Disposition', 'attachment; filename=resume_analysis_report.pdf'))
+    return await _respond(send, 200, pdf_content, content_type='application/pdf', headers=headers)
+
+
+# (method, path pattern, handler, route template used for metrics)
+ROUTES = [
+    ('POST', re.compile(r'^/upload$'), upload, '/upload'),
+    ('GET', re.compile(r'^/results/(?P<result_id>[^/]+)$'), get_result, '/results/<result_id>'),
+    ('GET', re.compile(r'^/download-pdf/(?P<result_id>[^/]+)$'), download_pdf, '/download-pdf/<result_id>')
+]
+
+
+async def call_flask(scope, receive, send):
+    """Serve the request with the Flask app in a thread, streaming its response back"""
+    body = await _read_body(receive, web.app.config['MAX_CONTENT_LENGTH'])
+    if body is None:
+        return await _respond_json(send, 413, {'error': 'Request too large'})
+    loop = asyncio.get_running_loop()
+
+    def run():
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+        def emit(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        iterable = web.app(_environ(scope, body), start_response)
+        try:
+            started = False
+            for chunk in iterable:
+                if not started:
+                    emit({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+                    started = True
+                if chunk:
+                    emit({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                emit({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+            emit({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+    # Streaming responses (/batch) can run for minutes, so not on the I/O pool
+    await loop.run_in_executor(None, run)
+
+
+def shutdown():
+    """Wait for running analyses and post-processing, then flush this worker's metrics"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
+    try:
+        metrics.flush()
+    except Exception as e:
+        web.app.logger.warning(f"Could not flush metrics: {e}")
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            web.janitor.start()
+            # In a background thread, so the server accepts requests (and /ready answers 503) meanwhile
+            web.warmup.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    for method, pattern, handler, route in ROUTES:
+        match = pattern.match(scope['path'])
+        if match and scope['method'] == method:
+            break
+    else:
+        return await call_flask(scope, receive, send)
+
+    start = time.perf_counter()
+    status = await handler(scope, receive, send, **match.groupdict())
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method, route, str(status))
+    try:
+        await _run_io(metrics.maybe_flush)
+    except Exception as e:
+        web.app.logger.warning(f"Could not flush metrics: {e}")
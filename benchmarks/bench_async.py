@@ -0,0 +1,208 @@
+"""Concurrency of the sync (Flask, app.py) and async (asgi.py) serving modes under upload load.
+
+Both apps are driven in-process against scratch databases. Each mode gets
+--uploads concurrent clients that each upload a distinct DOCX resume and wait
+for its analysis, while one more client keeps fetching a stored result.
+
+- sync: requests are served by --server-workers threads, one request at a time
+  each, like gunicorn sync workers. Uploads return a job id and are polled
+  every --poll-interval seconds, which also occupies a worker.
+- async: a single event loop serves every request through asgi.app, and
+  /upload awaits the analysis from the process pool.
+
+Reported per mode: upload throughput and latency, and the latency of the
+result fetches made while the uploads were running.
+
+Usage: python -m benchmarks.bench_async [--uploads 16] [--server-workers 2] [--analysis-workers 2]
+"""
+import os
+import io
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.test import encode_multipart
+
+from benchmarks.corpus import synthetic_resume, write_docx
+from benchmarks.bench_pipeline import SCRATCH_PATHS, JOB_DESCRIPTION
+
+
+def make_uploads(count, seed):
+    uploads = []
+    for index in range(count):
+        buffer = io.BytesIO()
+        # Distinct content per upload, so the content cache never short-circuits the analysis
+        write_docx(buffer, synthetic_resume(random.Random(f'{seed}:{index}'), 1))
+        boundary, body = encode_multipart({'resume': FileStorage(io.BytesIO(buffer.getvalue()), 'resume.docx'),
+                                           'job_description': JOB_DESCRIPTION})
+        uploads.append((f'multipart/form-data; boundary={boundary}', body))
+    return uploads
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else None
+
+
+def summarize(outcomes, fetch_latencies, wall):
+    """outcomes: (succeeded, seconds) per upload"""
+    upload_latencies = [latency for succeeded, latency in outcomes if succeeded]
+    ms = lambda value: round(value * 1000, 1) if value is not None else None
+    return {
+        'uploads_done': len(upload_latencies),
+        'uploads_failed': len(outcomes) - len(upload_latencies),
+        'wall_s': round(wall, 3),
+        'throughput_rps': round(len(upload_latencies) / wall, 3),
+        'upload_p50_ms': ms(statistics.median(upload_latencies)) if upload_latencies else None,
+        'upload_p95_ms': ms(percentile(upload_latencies, 0.95)),
+        'fetches': len(fetch_latencies),
+        'fetch_p50_ms': ms(statistics.median(fetch_latencies)) if fetch_latencies else None,
+        'fetch_p95_ms': ms(percentile(fetch_latencies, 0.95)),
+        'fetch_max_ms': ms(max(fetch_latencies)) if fetch_latencies else None
+    }
+
+
+def run_sync(web, uploads, result_id, server_workers, poll_interval, timeout):
+    # Each slot serves one request at a time, like a gunicorn sync worker
+    slots = ThreadPoolExecutor(server_workers)
+
+    def serve(method, path, **kwargs):
+        return slots.submit(lambda: web.app.test_client().open(path, method=method, **kwargs)).result()
+
+    def upload(item):
+        content_type, body = item
+        start = time.perf_counter()
+        response = serve('POST', '/upload', data=body, content_type=content_type)
+        if response.status_code != 202:
+            return response.status_code == 200, time.perf_counter() - start
+        status_url = response.get_json()['status_url']
+        while time.perf_counter() - start < timeout:
+            status = serve('GET', status_url).get_json()['status']
+            if status in ('done', 'failed'):
+                return status == 'done', time.perf_counter() - start
+            time.sleep(poll_interval)
+        return False, time.perf_counter() - start
+
+    fetches, done = [], threading.Event()
+
+    def fetch():
+        while not done.is_set():
+            start = time.perf_counter()
+            serve('GET', f'/results/{result_id}')
+            fetches.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    fetcher = threading.Thread(target=fetch)
+    start = time.perf_counter()
+    fetcher.start()
+    with ThreadPoolExecutor(len(uploads)) as clients:
+        outcomes = list(clients.map(upload, uploads))
+    wall = time.perf_counter() - start
+    done.set()
+    fetcher.join()
+    slots.shutdown()
+    return summarize(outcomes, fetches, wall)
+
+
+async def asgi_request(application, method, path, body=b'', content_type=None):
+    """Call an ASGI app directly; returns (status, body)"""
+    headers = [(b'content-length', str(len(body)).encode())]
+    if content_type:
+        headers.append((b'content-type', content_type.encode()))
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method, 'scheme': 'http',
+             'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '', 'headers': headers,
+             'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 80)}
+    pending = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        # The client never disconnects
+        await asyncio.Future()
+
+    response = {'status': None, 'body': []}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        else:
+            response['body'].append(message.get('body', b''))
+
+    await application(scope, receive, send)
+    return response['status'], b''.join(response['body'])
+
+
+async def run_async(server, uploads, result_id):
+    async def upload(item):
+        content_type, body = item
+        start = time.perf_counter()
+        status, _ = await asgi_request(server.app, 'POST', '/upload', body, content_type)
+        return status == 200, time.perf_counter() - start
+
+    fetches, done = [], asyncio.Event()
+
+    async def fetch():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asgi_request(server.app, 'GET', f'/results/{result_id}')
+            fetches.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    fetcher = asyncio.create_task(fetch())
+    outcomes = await asyncio.gather(*(upload(item) for item in uploads))
+    wall = time.perf_counter() - start
+    done.set()
+    await fetcher
+    return summarize(outcomes, fetches, wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--uploads', type=int, default=16, help='concurrent upload clients per mode')
+    parser.add_argument('--server-workers', type=int, default=2, help='sync mode: requests served at a time')
+    parser.add_argument('--analysis-workers', type=int, default=2, help='analysis processes (ANALYSIS_WORKERS)')
+    parser.add_argument('--poll-interval', type=float, default=0.25, help='sync mode: seconds between job polls')
+    parser.add_argument('--timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, relative in {**SCRATCH_PATHS, 'METRICS_DATABASE': 'metrics.db'}.items():
+            os.environ[name] = os.path.join(workdir, relative)
+        os.environ['ANALYSIS_WORKERS'] = str(args.analysis_workers)
+        os.environ['ANALYSIS_QUEUE_SIZE'] = str(max(50, args.uploads))
+        import app as web
+        import asgi as server
+
+        # One stored result for the fetching client, analyzed through each mode to warm it up
+        warm_sync, warm_async = make_uploads(1, 'warm-sync')[0], make_uploads(1, 'warm-async')[0]
+        run_sync(web, [warm_sync], 'none', args.server_workers, args.poll_interval, args.timeout)
+        status, body = asyncio.run(asgi_request(server.app, 'POST', '/upload', warm_async[1], warm_async[0]))
+        result_id = json.loads(body)['result_id']
+
+        results = {
+            'sync': run_sync(web, make_uploads(args.uploads, 'sync'), result_id,
+                             args.server_workers, args.poll_interval, args.timeout),
+            'async': asyncio.run(run_async(server, make_uploads(args.uploads, 'async'), result_id))
+        }
+        server.shutdown()
+        web.job_queue.stop()
+
+    print(f"{args.uploads} concurrent uploads, {args.analysis_workers} analysis processes, "
+          f"{args.server_workers} sync server workers, {os.cpu_count()} CPUs")
+    print(f"{'mode':<6} {'done':>5} {'req/s':>7} {'upload p50':>11} {'upload p95':>11} {'fetches':>8} "
+          f"{'fetch p50':>10} {'fetch p95':>10} {'fetch max':>10}")
+    for mode, row in results.items():
+        print(f"{mode:<6} {row['uploads_done']:>5} {row['throughput_rps']:>7.2f} {row['upload_p50_ms']:>9}ms {row['upload_p95_ms']:>9}ms "
+              f"{row['fetches']:>8} {row['fetch_p50_ms']:>8}ms {row['fetch_p95_ms']:>8}ms {row['fetch_max_ms']:>8}ms")
+
+
+if __name__ == '__main__':
+    main()
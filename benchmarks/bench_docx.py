@@ -0,0 +1,81 @@
+"""Streaming DOCX extraction (analyzer/docx_extract.py) against python-docx's Document model.
+
+Resumes of each size are written twice: as plain paragraphs, and in the
+layout of many templates, with the contact line in the page header and the
+skills in a table. For each, the table shows the best time per document, the
+peak memory allocated during one extraction (tracemalloc) and how many
+characters each path recovers.
+
+Usage: python -m benchmarks.bench_docx [--sizes 1,4,16] [--repeat 20]
+"""
+import io
+import time
+import random
+import argparse
+import tracemalloc
+
+from docx import Document
+
+from analyzer.docx_extract import DocxExtractor
+from benchmarks.corpus import SIZES, synthetic_resume, write_docx
+
+
+def write_template_docx(path, text):
+    """Contact details in the header and the skills section as a table, as resume templates do"""
+    lines = text.split('\n')
+    document = Document()
+    document.sections[0].header.paragraphs[0].text = ' '.join(lines[:2])
+    skills = []
+    for line in lines[2:]:
+        if line == 'SKILLS' or (skills and len(skills) == 1):
+            skills.append(line)
+            continue
+        document.add_paragraph(line)
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text, table.cell(0, 1).text = skills
+    document.save(path)
+
+
+def python_docx_text(data):
+    return '\n'.join(paragraph.text for paragraph in Document(io.BytesIO(data)).paragraphs)
+
+
+def streaming_text(data):
+    return DocxExtractor(data).text()
+
+
+EXTRACTORS = [('python-docx', python_docx_text), ('streaming', streaming_text)]
+
+
+def measure(func, data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = func(data)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help='comma-separated resume size factors')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'document':<14} {'extractor':<12} {'time':>10} {'peak memory':>12} {'chars':>7}")
+    for size in [int(size) for size in args.sizes.split(',')]:
+        text = synthetic_resume(random.Random(f'docx:{size}'), size)
+        for layout, writer in (('plain', write_docx), ('template', write_template_docx)):
+            buffer = io.BytesIO()
+            writer(buffer, text)
+            for name, func in EXTRACTORS:
+                seconds, peak, chars = measure(func, buffer.getvalue(), args.repeat)
+                print(f"{f'{layout} x{size}':<14} {name:<12} {seconds * 1000:>8.2f}ms {peak / 1024:>9.0f} KB {chars:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Entity extraction throughput (analyzer/entities.py) in resumes per second on CPU.
+
+Compares the full spaCy pipeline run over each whole resume, one call per
+document, with what entities.py does: NER plus the tokenizer only, over the
+header and experience segments, through nlp.pipe in batches, and in bulk
+with several processes (--processes).
+
+Usage: python -m benchmarks.bench_entities [--resumes 200] [--batch-size 64] [--processes 2]
+"""
+import time
+import random
+import argparse
+
+from analyzer.models import SPACY_MODEL, registry
+from analyzer.sections import segment_resume
+from analyzer.entities import entity_segments, extract_entities_batch
+from benchmarks.corpus import synthetic_resume
+
+
+def whole_text(nlp, texts, segments, batch_size, n_process):
+    for text in texts:
+        nlp(text)
+
+
+def ner_segments(nlp, texts, segments, batch_size, n_process):
+    for resume in segments:
+        extract_entities_batch([resume], nlp, batch_size=batch_size)
+
+
+def ner_segments_batched(nlp, texts, segments, batch_size, n_process):
+    extract_entities_batch(segments, nlp, batch_size=batch_size, n_process=n_process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=200)
+    parser.add_argument('--size', type=int, default=1, help='resume size factor (see benchmarks/corpus.py)')
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--processes', type=int, default=2, help='n_process of the bulk run')
+    args = parser.parse_args()
+
+    import spacy
+    full = spacy.load(SPACY_MODEL)
+    ner = registry.get('spacy')
+    texts = [synthetic_resume(random.Random(f'entities:{index}'), args.size) for index in range(args.resumes)]
+    segments = [entity_segments(segment_resume(text)) for text in texts]
+
+    runs = [
+        ('full pipeline, whole text', full, whole_text, 1),
+        ('NER only, whole text', ner, whole_text, 1),
+        ('NER only, segments', ner, ner_segments, 1),
+        ('NER only, segments, nlp.pipe', ner, ner_segments_batched, 1),
+        (f'same, n_process={args.processes}', ner, ner_segments_batched, args.processes)
+    ]
+    print(f"{args.resumes} resumes, {SPACY_MODEL}, pipes: {', '.join(ner.pipe_names)}")
+    print(f"{'run':<34} {'seconds':>8} {'resumes/s':>10}")
+    for name, nlp, func, n_process in runs:
+        start = time.perf_counter()
+        func(nlp, texts, segments, args.batch_size, n_process)
+        seconds = time.perf_counter() - start
+        print(f"{name:<34} {seconds:>8.2f} {args.resumes / seconds:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Per-resume CPU time of the scoring pipeline, single-pass vs. multi-pass.
+
+The multi-pass variant rebuilds the features record for every evaluator call,
+which is what analyze() used to do before feature extraction was shared:
+five scorers from calculate_ats_score() plus five more from
+generate_suggestions().
+
+Usage: python -m benchmarks.bench_features [--resumes 200] [--size 1]
+"""
+import argparse
+import random
+import time
+
+from analyzer.resume_analyzer import ResumeAnalyzer
+from analyzer.features import extract_features
+from analyzer.scoring import score_all, overall_score, suggest_all, SCORERS
+from benchmarks.corpus import synthetic_resume
+
+
+def multi_pass(analyzer):
+    """Re-derive features for each evaluator call, as the old pipeline did"""
+    text, parsed, jd = analyzer.resume_text, analyzer.parsed_resume, analyzer.job_description
+    scores = {category: scorer(extract_features(text, parsed, jd)) for category, scorer in SCORERS.items()}
+    overall_score(scores)
+    rescored = {category: scorer(extract_features(text, parsed, jd)) for category, scorer in SCORERS.items()}
+    return suggest_all(extract_features(text, parsed, jd), rescored)
+
+
+def single_pass(analyzer):
+    features = extract_features(analyzer.resume_text, analyzer.parsed_resume, analyzer.job_description)
+    scores = score_all(features)
+    overall_score(scores)
+    return suggest_all(features, scores)
+
+
+def cpu_time_per_resume(func, analyzers):
+    start = time.process_time()
+    for analyzer in analyzers:
+        func(analyzer)
+    return (time.process_time() - start) / len(analyzers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=200)
+    parser.add_argument('--size', type=int, default=1, help='scale factor for resume length')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    job_description = 'Looking for a Python engineer with AWS, Docker, SQL and strong communication skills.'
+    analyzers = [ResumeAnalyzer.from_text(synthetic_resume(rng, args.size), job_description)
+                 for _ in range(args.resumes)]
+
+    before = cpu_time_per_resume(multi_pass, analyzers)
+    after = cpu_time_per_resume(single_pass, analyzers)
+
+    print(f"resumes: {args.resumes}, avg words: {sum(len(a.resume_text.split()) for a in analyzers) // len(analyzers)}")
+    print(f"multi-pass:  {before * 1000:.3f} ms CPU per resume")
+    print(f"single-pass: {after * 1000:.3f} ms CPU per resume")
+    print(f"speedup:     {before / after:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
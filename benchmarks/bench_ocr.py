@@ -0,0 +1,74 @@
+"""OCR of scanned resumes (analyzer/ocr.py) at several rendering DPIs, cold and cached.
+
+Each synthetic resume is written as a PDF, then "scanned": every page is
+rasterized at 300 DPI and saved as an image-only PDF with no text layer. For
+each DPI the table shows the time to OCR the whole document, the share of the
+original words recovered, and the time of a second read served from the OCR
+cache. Needs pytesseract and the tesseract binary.
+
+Usage: python -m benchmarks.bench_ocr [--sizes 1,4] [--dpis 150,200,300] [--workers 4]
+"""
+import io
+import os
+import time
+import random
+import argparse
+import tempfile
+from collections import Counter
+
+from analyzer.cache import ContentCache
+from analyzer.ocr import OcrReader, ocr_available, render_page
+from analyzer.pdf_extract import _open_pdfium, count_pages
+from benchmarks.corpus import synthetic_resume, write_pdf
+
+
+def scan(data, dpi=300):
+    """An image-only copy of a PDF, one raster image per page"""
+    document = _open_pdfium(data)
+    try:
+        images = [render_page(document, number, dpi).convert('RGB') for number in range(len(document))]
+    finally:
+        document.close()
+    buffer = io.BytesIO()
+    images[0].save(buffer, 'PDF', resolution=dpi, save_all=True, append_images=images[1:])
+    return buffer.getvalue()
+
+
+def word_recall(expected, actual):
+    """Share of the expected words (with multiplicity) found in the OCR output"""
+    expected, actual = Counter(expected.lower().split()), Counter(actual.lower().split())
+    return sum((expected & actual).values()) / max(sum(expected.values()), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1,4', help='comma-separated resume size factors')
+    parser.add_argument('--dpis', default='150,200,300', help='comma-separated rendering DPIs')
+    parser.add_argument('--workers', type=int, default=4, help='OCR worker processes')
+    args = parser.parse_args()
+    if not ocr_available():
+        raise SystemExit('pytesseract and the tesseract binary are required for this benchmark')
+
+    print(f"{'document':<10} {'pages':>5} {'dpi':>5} {'cold':>10} {'recall':>7} {'cached':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        cache = ContentCache(os.path.join(workdir, 'cache.db'))
+        for size in [int(size) for size in args.sizes.split(',')]:
+            text = synthetic_resume(random.Random(f'ocr:{size}'), size)
+            buffer = io.BytesIO()
+            write_pdf(buffer, text)
+            scanned = scan(buffer.getvalue())
+            numbers = list(range(count_pages(scanned)))
+            for dpi in [int(dpi) for dpi in args.dpis.split(',')]:
+                timings = []
+                for _ in range(2):
+                    reader = OcrReader(scanned, cache, dpi=dpi, max_seconds=0, workers=args.workers)
+                    start = time.perf_counter()
+                    pages = reader.read(numbers)
+                    timings.append(time.perf_counter() - start)
+                recall = word_recall(text.replace('•', '-'), '\n'.join(pages[number] for number in sorted(pages)))
+                print(f"{f'x{size}':<10} {len(pages):>5} {dpi:>5} {timings[0] * 1000:>8.0f}ms {recall:>7.1%} "
+                      f"{timings[1] * 1000:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Per-pattern cost of the compiled regex catalogue on large resumes.
+
+Each row is the average time of one pattern (or helper) over the corpus. For
+comparison, the "old" rows repeat the inline approach (a lower() call per
+buzzword, case-insensitive searches on the raw text) and the "merged" rows
+scan for all achievements or buzzwords with a single alternation.
+
+Usage: python -m benchmarks.bench_patterns [--resumes 50] [--size 8] [--repeat 5]
+"""
+import argparse
+import random
+import re
+import time
+
+from analyzer import patterns
+from analyzer.sections import HEADER_PATTERN, SKILL_PHRASE_PATTERNS
+from benchmarks.corpus import synthetic_resume
+
+
+def inline_buzzwords(text):
+    return tuple((word, text.lower().count(word)) for word in patterns.BUZZWORDS if word in text.lower())
+
+
+def inline_achievements(text):
+    return frozenset(pattern for pattern in patterns.ACHIEVEMENT_PATTERNS if re.search(pattern, text, re.IGNORECASE))
+
+
+MERGED_ACHIEVEMENTS = re.compile('|'.join(f'(?P<a{i}>{pattern})' for i, pattern in enumerate(patterns.ACHIEVEMENT_PATTERNS)))
+MERGED_BUZZWORDS = re.compile('|'.join(re.escape(word) for word in sorted(patterns.BUZZWORDS, key=len, reverse=True)))
+
+
+def merged_achievements(normalized):
+    return frozenset(patterns.ACHIEVEMENT_PATTERNS[int(match.lastgroup[1:])]
+                     for match in MERGED_ACHIEVEMENTS.finditer(normalized))
+
+
+def merged_buzzwords(normalized):
+    counts = dict.fromkeys(patterns.BUZZWORDS, 0)
+    for match in MERGED_BUZZWORDS.finditer(normalized):
+        counts[match.group()] += 1
+    return tuple((word, count) for word, count in counts.items() if count)
+
+
+def cases(texts, normalized):
+    """(name, function, corpus) for every row of the benchmark"""
+    raw = [
+        ('EMAIL_PATTERN', patterns.EMAIL_PATTERN.findall),
+        ('PHONE_PATTERN', patterns.PHONE_PATTERN.findall),
+        ('LINKEDIN_PATTERN', patterns.LINKEDIN_PATTERN.findall),
+        ('BULLET_PATTERN', patterns.BULLET_PATTERN.findall),
+        ('HEADER_PATTERN (per line)', lambda text: [HEADER_PATTERN.match(line) for line in text.split('\n')]),
+        ('SKILL_PHRASE_PATTERNS', lambda text: [regex.findall(text) for regex in SKILL_PHRASE_PATTERNS]),
+        ('normalize_text', patterns.normalize_text),
+        ('inline buzzwords (old)', inline_buzzwords),
+        ('inline achievements (old)', inline_achievements),
+    ]
+    normal = [
+        ('WORD_PATTERN', patterns.WORD_PATTERN.findall),
+        ('ACTIVE_VOICE_PATTERN', patterns.ACTIVE_VOICE_PATTERN.findall),
+        ('KEYWORD_PATTERN', patterns.KEYWORD_PATTERN.findall),
+        ('achievement_hits', patterns.achievement_hits),
+        ('buzzword_counts', patterns.buzzword_counts),
+        ('merged achievements', merged_achievements),
+        ('merged buzzwords', merged_buzzwords),
+    ]
+    return [(name, func, texts) for name, func in raw] + [(name, func, normalized) for name, func in normal]
+
+
+def time_per_resume(func, corpus, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=50)
+    parser.add_argument('--size', type=int, default=8, help='scale factor for resume length')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per pattern; the fastest is reported')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = [synthetic_resume(rng, args.size) for _ in range(args.resumes)]
+    normalized = [patterns.normalize_text(text) for text in texts]
+
+    print(f"resumes: {args.resumes}, avg chars: {sum(map(len, texts)) // len(texts)}")
+    print(f"{'pattern':<28} {'per resume':>12}")
+    for name, func, corpus in cases(texts, normalized):
+        print(f"{name:<28} {time_per_resume(func, corpus, args.repeat) * 1e6:>10.1f}us")
+
+
+if __name__ == '__main__':
+    main()
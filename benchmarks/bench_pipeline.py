@@ -0,0 +1,241 @@
+"""Stage timings of the analysis pipeline, /upload throughput and a regression check.
+
+Generates (or reuses) a seeded corpus of synthetic PDF and DOCX resumes and
+times every stage of ResumeAnalyzer on each one: text extraction, parse_resume,
+feature extraction, each evaluate_*, generate_suggestions, analyze and the PDF
+report. With --load N it also pushes N distinct uploads through the Flask
+/upload route from --concurrency threads and polls them to completion, using
+scratch databases so the real ones are untouched.
+
+Results can be written as JSON with --output. Given --baseline (an earlier
+--output file), the run fails when a stage median, the upload throughput or
+the peak RSS is worse than the baseline by more than --threshold.
+
+Usage: python -m benchmarks.bench_pipeline [--corpus DIR] [--sizes 1,4,16] [--repeat 3]
+                                           [--load 40 --concurrency 8]
+                                           [--output results.json] [--baseline baseline.json --threshold 1.25]
+"""
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import statistics
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from analyzer.resume_analyzer import ResumeAnalyzer, ANALYZER_VERSION
+from analyzer.reports import get_renderer
+from analyzer.scoring import CATEGORY_WEIGHTS
+from benchmarks.corpus import SIZES, generate_corpus, synthetic_resume, write_docx
+
+JOB_DESCRIPTION = 'Looking for a Python engineer with AWS, Docker, SQL and strong communication skills.'
+
+# Databases and folders the app is pointed at during the load test
+SCRATCH_PATHS = {
+    'UPLOAD_FOLDER': 'uploads',
+    'CACHE_DATABASE': 'cache.db',
+    'JOBS_DATABASE': 'jobs.db',
+    'RESULT_STORE_PATH': 'results.db',
+    'REPORTS_FOLDER': 'reports',
+    'SEARCH_INDEX_PATH': 'search.db'
+}
+
+
+def time_stages(path, job_description, renderer):
+    """Milliseconds spent in each pipeline stage for one resume"""
+    timings = {}
+
+    def timed(stage, func):
+        start = time.perf_counter()
+        value = func()
+        timings[stage] = (time.perf_counter() - start) * 1000
+        return value
+
+    extension = os.path.splitext(path)[1].lower()
+    analyzer = ResumeAnalyzer.from_text('', job_description)
+    analyzer.resume_source, analyzer.resume_path, analyzer.file_extension = path, path, extension
+    timed(f'extract_{extension[1:]}', analyzer.extract_text)
+
+    analyzer._segmentation = None
+    analyzer.parsed_resume = timed('parse_resume', analyzer.parse_resume)
+    timed('features', lambda: analyzer.features)
+    scores = {category: timed(f'evaluate_{category}', getattr(analyzer, f'evaluate_{category}'))
+              for category in CATEGORY_WEIGHTS}
+    timed('generate_suggestions', lambda: analyzer.generate_suggestions(scores))
+    # Scoring and suggestions again, plus jd_match, over the features computed above
+    analysis = timed('analyze', analyzer.analyze)
+    timed('report', lambda: renderer.render(analysis))
+    return timings
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'median_ms': round(statistics.median(samples), 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'runs': len(samples)
+    }
+
+
+def run_stages(documents, job_description, repeat):
+    renderer = get_renderer()
+    # Warm-up: imports, the relevance model, report fonts
+    time_stages(documents[0][0], job_description, renderer)
+
+    samples, by_size = {}, {}
+    for path, size in documents:
+        for _ in range(repeat):
+            for stage, elapsed in time_stages(path, job_description, renderer).items():
+                samples.setdefault(stage, []).append(elapsed)
+                by_size.setdefault(str(size), {}).setdefault(stage, []).append(elapsed)
+    return {
+        'stages': {stage: summarize(values) for stage, values in samples.items()},
+        'by_size': {size: {stage: round(statistics.median(values), 4) for stage, values in stages.items()}
+                    for size, stages in by_size.items()}
+    }
+
+
+def load_test(requests, concurrency, job_description, workdir, timeout=120):
+    """Push distinct DOCX uploads through /upload concurrently and wait for every job"""
+    for name, relative in SCRATCH_PATHS.items():
+        os.environ[name] = os.path.join(workdir, relative)
+    import app as web
+
+    uploads = []
+    for index in range(requests):
+        buffer = io.BytesIO()
+        # Distinct content per request, so the content cache never short-circuits the analysis
+        write_docx(buffer, synthetic_resume(random.Random(f'load:{index}'), 1))
+        uploads.append(buffer.getvalue())
+
+    def upload(data):
+        client = web.app.test_client()
+        start = time.perf_counter()
+        response = client.post('/upload', data={'resume': (io.BytesIO(data), 'resume.docx'),
+                                                'job_description': job_description})
+        if response.status_code == 429:
+            return 'rejected', None
+        if response.status_code == 202:
+            status_url = response.get_json()['status_url']
+            deadline = start + timeout
+            while time.perf_counter() < deadline:
+                status = client.get(status_url).get_json()['status']
+                if status in ('done', 'failed'):
+                    return status, time.perf_counter() - start
+                time.sleep(0.02)
+            return 'timeout', None
+        return ('done' if response.status_code == 200 else 'failed'), time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        outcomes = list(pool.map(upload, uploads))
+    wall = time.perf_counter() - start
+    # The scratch databases are removed after this returns
+    web.job_queue.stop()
+
+    latencies = sorted(latency * 1000 for status, latency in outcomes if status == 'done')
+    counts = {status: sum(1 for outcome, _ in outcomes if outcome == status)
+              for status in ('done', 'failed', 'rejected', 'timeout')}
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'workers': web.app.config['ANALYSIS_WORKERS'],
+        **counts,
+        'wall_s': round(wall, 3),
+        'throughput_rps': round(counts['done'] / wall, 3),
+        'latency_p50_ms': round(statistics.median(latencies), 1) if latencies else None,
+        'latency_p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1) if latencies else None
+    }
+
+
+def peak_rss():
+    # ru_maxrss is in kilobytes on Linux. Job processes are forked by the queue's fork
+    # server rather than by this process, so their memory is not included.
+    return {'benchmark_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+def find_regressions(results, baseline, threshold, min_delta_ms):
+    """Human-readable descriptions of everything that got worse than baseline by more than threshold"""
+    regressions = []
+    for stage, row in results['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base:
+            continue
+        # Sub-millisecond stages are noisy; require an absolute slowdown as well as a relative one
+        if row['median_ms'] > base['median_ms'] * threshold and row['median_ms'] - base['median_ms'] > min_delta_ms:
+            regressions.append(f"{stage}: median {base['median_ms']:.3f} ms -> {row['median_ms']:.3f} ms")
+
+    load, base_load = results.get('load'), baseline.get('load')
+    if load and base_load and load['throughput_rps'] < base_load['throughput_rps'] / threshold:
+        regressions.append(f"/upload throughput: {base_load['throughput_rps']:.2f} -> {load['throughput_rps']:.2f} req/s")
+
+    base_rss = baseline.get('peak_rss', {}).get('benchmark_mb')
+    if base_rss and results['peak_rss']['benchmark_mb'] > base_rss * threshold:
+        regressions.append(f"peak RSS: {base_rss:.1f} MB -> {results['peak_rss']['benchmark_mb']:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', help='directory for the generated resumes (default: a temporary directory)')
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help='comma-separated resume size factors')
+    parser.add_argument('--per-size', type=int, default=3, help='resumes per size and format')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per resume')
+    parser.add_argument('--load', type=int, default=0, help='number of /upload requests for the load test (0 to skip)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='allowed slowdown factor before failing')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='ignore stage slowdowns smaller than this')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        sizes = [int(size) for size in args.sizes.split(',')]
+        documents = generate_corpus(args.corpus or os.path.join(workdir, 'corpus'), sizes, args.per_size)
+        results = {
+            'analyzer_version': ANALYZER_VERSION,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'documents': len(documents),
+            **run_stages(documents, JOB_DESCRIPTION, args.repeat)
+        }
+        if args.load:
+            results['load'] = load_test(args.load, args.concurrency, JOB_DESCRIPTION, workdir)
+    results['peak_rss'] = peak_rss()
+
+    print(f"{len(documents)} resumes x {args.repeat} runs")
+    print(f"{'stage':<22} {'median':>10} {'p95':>10}")
+    for stage, row in results['stages'].items():
+        print(f"{stage:<22} {row['median_ms']:>8.3f}ms {row['p95_ms']:>8.3f}ms")
+    if 'load' in results:
+        load = results['load']
+        print(f"/upload: {load['done']}/{load['requests']} done at concurrency {load['concurrency']}, "
+              f"{load['throughput_rps']:.2f} req/s, p50 {load['latency_p50_ms']} ms, p95 {load['latency_p95_ms']} ms "
+              f"({load['rejected']} rejected, {load['failed']} failed, {load['timeout']} timed out)")
+    print(f"peak RSS: {results['peak_rss']['benchmark_mb']} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"Regressions beyond {args.threshold}x baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold}x baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Render time and memory of the PDF report backends.
+
+Each backend renders the same analysis results in a fresh process, so its
+import cost and peak RSS are measured in isolation.
+
+Usage: python -m benchmarks.bench_reports [--reports 20] [--size 1]
+"""
+import argparse
+import random
+import resource
+import time
+import tracemalloc
+import multiprocessing
+
+from analyzer.resume_analyzer import ResumeAnalyzer
+from analyzer.reports import RENDERERS, get_renderer
+from benchmarks.corpus import synthetic_resume
+
+
+def measure(name, results, queue):
+    start = time.perf_counter()
+    renderer = get_renderer(name)
+    renderer.render(results[0])  # Warm-up: imports, fonts, template compilation
+    warmup = time.perf_counter() - start
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    sizes = [len(renderer.render(data)) for data in results]
+    elapsed = time.perf_counter() - start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue.put({
+        'renderer': name,
+        'first_render': warmup,
+        'per_report': elapsed / len(results),
+        'avg_bytes': sum(sizes) // len(sizes),
+        'peak_traced': peak_traced,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports', type=int, default=20)
+    parser.add_argument('--size', type=int, default=1, help='scale factor for resume length')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    job_description = 'Looking for a Python engineer with AWS, Docker, SQL and strong communication skills.'
+    results = [ResumeAnalyzer.from_text(synthetic_resume(rng, args.size), job_description).analyze()
+               for _ in range(args.reports)]
+
+    context = multiprocessing.get_context('spawn')
+    print(f"{'renderer':<10} {'first':>9} {'per report':>11} {'size':>8} {'py peak':>9} {'peak RSS':>9}")
+    for name in RENDERERS:
+        queue = context.Queue()
+        process = context.Process(target=measure, args=(name, results, queue))
+        process.start()
+        row = queue.get()
+        process.join()
+        print(f"{row['renderer']:<10} {row['first_render'] * 1000:>7.0f}ms {row['per_report'] * 1000:>9.1f}ms "
+              f"{row['avg_bytes'] / 1024:>6.1f}KB {row['peak_traced'] / 2**20:>7.1f}MB {row['peak_rss'] / 2**20:>7.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Storage size and serve latency of analysis results, plain JSON vs the compact encoding.
+
+Fills a scratch result store with --results results in each encoding (see
+analyzer/serialization.py), copies of --distinct real analyses of synthetic
+resumes under their own ids, then serves --requests random ids the way
+/results/<id> does:
+
+- full: the whole result, uncompressed
+- gzip: the whole result for a client accepting gzip (br too, when Brotli is installed)
+- fields: only --fields (?fields=...), uncompressed
+
+For plain JSON that is the store's get() followed by json.dumps and, for
+gzip, compression, as /results worked before the compact encoding.
+
+Usage: python -m benchmarks.bench_results [--results 100000] [--distinct 200] [--requests 2000]
+                                          [--backend sqlite] [--fields ats_score,suggestions]
+"""
+import os
+import json
+import time
+import random
+import argparse
+import sqlite3
+import statistics
+import tempfile
+
+from analyzer import serialization
+from analyzer.resume_analyzer import ResumeAnalyzer
+from analyzer.result_store import open_result_store
+from benchmarks.corpus import synthetic_resume
+
+JOB_DESCRIPTION = 'Looking for a Python engineer with AWS, Docker, SQL and strong communication skills.'
+
+
+def build_results(distinct):
+    rng = random.Random('results')
+    results = []
+    for index in range(distinct):
+        analysis = ResumeAnalyzer.from_text(synthetic_resume(rng, rng.choice([1, 1, 2, 4])), JOB_DESCRIPTION).analyze()
+        analysis['file_hash'] = f'{index:064x}'
+        analysis['quality'] = None
+        results.append(analysis)
+    return results
+
+
+def settle(path):
+    """Checkpoint a SQLite store's write-ahead log, so reads do not go through it"""
+    if os.path.isfile(path):
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        finally:
+            conn.close()
+
+
+def store_size(path):
+    if os.path.isfile(path):
+        return sum(os.path.getsize(name) for name in (path, f'{path}-wal') if os.path.exists(name))
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def servers(store, encoding, fields):
+    """name -> function serving one result id as response bytes"""
+    if encoding == 'json':
+        def gzip(result_id):
+            return serialization.compress(json.dumps(store.get(result_id)).encode(), 'gzip')[0]
+        scenarios = {
+            'full': lambda result_id: json.dumps(store.get(result_id)).encode(),
+            'gzip': gzip,
+            'fields': lambda result_id: json.dumps(store.get(result_id, fields)).encode()
+        }
+    else:
+        scenarios = {
+            'full': lambda result_id: serialization.response_body(store.get_encoded(result_id))[0],
+            'gzip': lambda result_id: serialization.response_body(store.get_encoded(result_id), encoding='gzip')[0],
+            'fields': lambda result_id: serialization.response_body(store.get_encoded(result_id), fields)[0]
+        }
+    if serialization.brotli is not None:
+        scenarios['br'] = lambda result_id: serialization.response_body(store.get_encoded(result_id), encoding='br')[0]
+    return scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--results', type=int, default=100000)
+    parser.add_argument('--distinct', type=int, default=200, help='distinct analyses the results are copies of')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--backend', default='sqlite', help='sqlite or sharded')
+    parser.add_argument('--fields', default='ats_score,suggestions')
+    args = parser.parse_args()
+
+    results = build_results(args.distinct)
+    fields = serialization.parse_fields(args.fields)
+    json_bytes = statistics.mean(len(json.dumps(result)) for result in results)
+    print(f"{args.results} results ({args.distinct} distinct, {json_bytes / 1024:.1f}KB of JSON on average), "
+          f"{args.backend} backend, JSON by {'orjson' if serialization.orjson else 'json'}")
+
+    rng = random.Random('requests')
+    request_ids = [f'result-{rng.randrange(args.results)}' for _ in range(args.requests)]
+    with tempfile.TemporaryDirectory() as workdir:
+        for encoding in ('json', 'compact'):
+            path = os.path.join(workdir, f'{encoding}.db' if args.backend == 'sqlite' else encoding)
+            store = open_result_store(args.backend, path, encoding=encoding)
+            start = time.perf_counter()
+            for index in range(args.results):
+                result_id = f'result-{index}'
+                store.put(result_id, dict(results[index % args.distinct], result_id=result_id))
+            put_seconds = time.perf_counter() - start
+            settle(path)
+            size = store_size(path)
+            print(f"\n{encoding}: {size / 2**20:.1f}MB stored, {size / args.results / 1024:.2f}KB per result, "
+                  f"{put_seconds / args.results * 1e6:.0f}us per put")
+
+            print(f"{'serve':<8} {'p50 ms':>8} {'p95 ms':>8} {'avg KB':>8}")
+            for name, serve in servers(store, encoding, fields).items():
+                latencies, sizes = [], []
+                for result_id in request_ids:
+                    start = time.perf_counter()
+                    sizes.append(len(serve(result_id)))
+                    latencies.append(time.perf_counter() - start)
+                latencies.sort()
+                print(f"{name:<8} {latencies[len(latencies) // 2] * 1000:>8.3f} "
+                      f"{latencies[int(len(latencies) * 0.95)] * 1000:>8.3f} {statistics.mean(sizes) / 1024:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Cold start of a web worker: import time, warm-up and the first requests.
+
+Each run is a fresh interpreter with its own scratch databases. Scenarios:
+
+- eager: pdfplumber and NumPy imported with the app, as before they were
+  imported lazily
+- lazy: the app as it is, serving its first requests without warm-up
+- warm: the app followed by warm-up (analyzer/warmup.py), as the gunicorn
+  master does before forking workers
+
+Reported per scenario (median of --repeat runs): the time to import the app,
+to warm up, and until the worker can serve (import plus warm-up), then the
+latency of the first request of each kind: GET /, GET /results/<id>, a PDF
+analysis (run in-process, as a job process would), its report and a /search.
+
+Usage: python -m benchmarks.bench_startup [--repeat 5]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+from benchmarks.corpus import synthetic_resume, write_pdf
+from benchmarks.bench_pipeline import SCRATCH_PATHS
+
+SCENARIOS = ['eager', 'lazy', 'warm']
+COLUMNS = ['import', 'warmup', 'ready', 'index', 'result', 'analysis', 'report', 'search']
+
+
+def child(scenario, pdf_path):
+    """Runs in the fresh interpreter; prints milliseconds per measurement as JSON"""
+    timings = {}
+
+    def measure(name, func, *args):
+        start = time.perf_counter()
+        value = func(*args)
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+        return value
+
+    def import_app():
+        if scenario == 'eager':
+            import numpy, pdfplumber  # noqa: F401
+        import app
+        return app
+
+    web = measure('import', import_app)
+    if scenario == 'warm':
+        measure('warmup', web.warmup.run)
+    else:
+        timings['warmup'] = 0.0
+    timings['ready'] = round(timings['import'] + timings['warmup'], 1)
+
+    client = web.app.test_client()
+    web.result_store.put('startup-sample', {'ats_score': {'overall': 0}})
+    measure('index', client.get, '/')
+    measure('result', client.get, '/results/startup-sample')
+    with open(pdf_path, 'rb') as f:
+        data = f.read()
+    payload = {'extension': '.pdf', 'file_hash': f'startup-{scenario}', 'job_description': '',
+               'result_id': 'startup-analysis', 'data': data}
+    analysis = measure('analysis', web.run_analysis, payload)['analysis']
+    measure('report', web.report_cache.render, 'startup-analysis', analysis)
+    measure('search', client.get, '/search?q=python')
+    print(json.dumps(timings))
+
+
+def run(scenario, pdf_path, workdir):
+    env = dict(os.environ, **{name: os.path.join(workdir, relative) for name, relative in SCRATCH_PATHS.items()},
+               METRICS_DATABASE=os.path.join(workdir, 'metrics.db'))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), env.get('PYTHONPATH')]))
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_startup', '--child', scenario, pdf_path],
+                            env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', nargs=2, metavar=('SCENARIO', 'PDF'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_path = os.path.join(workdir, 'resume.pdf')
+        write_pdf(pdf_path, synthetic_resume(random.Random('startup'), 1))
+        runs = {scenario: [] for scenario in SCENARIOS}
+        for index in range(args.repeat):
+            # Interleaved, so drift in the machine's load affects every scenario alike
+            for scenario in SCENARIOS:
+                scratch = os.path.join(workdir, f'{scenario}-{index}')
+                os.makedirs(scratch)
+                runs[scenario].append(run(scenario, pdf_path, scratch))
+
+    print(f"median of {args.repeat} fresh interpreters, milliseconds")
+    print(f"{'scenario':<9}" + ''.join(f'{column:>10}' for column in COLUMNS))
+    for scenario, samples in runs.items():
+        print(f'{scenario:<9}' + ''.join(f'{statistics.median(sample[column] for sample in samples):>10.1f}'
+                                          for column in COLUMNS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Synthetic resumes for the benchmarks, as text, PDF or DOCX.
+
+The text is seeded, so a given seed and size always produce the same
+documents and benchmark runs stay comparable.
+
+Usage: python -m benchmarks.corpus OUT_DIR [--sizes 1,4,16] [--per-size 3]
+"""
+import os
+import argparse
+import random
+
+WORDS = ('managed developed created implemented led achieved increased decreased improved reduced '
+         'python java sql docker aws react communication leadership teamwork analytics customer '
+         'platform pipeline service revenue team project delivery quality process design').split()
+
+SECTIONS = ['SUMMARY', 'EXPERIENCE', 'EDUCATION', 'SKILLS', 'PROJECTS', 'CERTIFICATIONS']
+
+# Default sizes: roughly one page, a long resume and a worst-case CV
+SIZES = (1, 4, 16)
+
+
+def synthetic_resume(rng, size=1):
+    """Build a plausible resume text; size scales the number of bullets"""
+    lines = ['Jane Doe', 'jane.doe@gmail.com | (555) 123-4567 | linkedin.com/in/janedoe']
+    for section in SECTIONS:
+        lines.append(section)
+        if section == 'SKILLS':
+            lines.append(', '.join(rng.sample(WORDS, 10)))
+            continue
+        for _ in range(6 * size):
+            bullet = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 25)))
+            lines.append(f"• {bullet.capitalize()} by {rng.randint(5, 60)}%")
+    return '\n'.join(lines)
+
+
+def write_pdf(path, text):
+    """Write text as a plain PDF, one line per text line, paginated like a real resume"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas
+
+    width, height = letter
+    margin, leading, font = 54, 14, 'Helvetica'
+    pdf = canvas.Canvas(path, pagesize=letter)
+    y = height - margin
+    for line in text.split('\n'):
+        # Greedy wrap to the page width
+        rows, row = [], ''
+        for word in line.split(' '):
+            candidate = f'{row} {word}' if row else word
+            if row and stringWidth(candidate, font, 10) > width - 2 * margin:
+                rows.append(row)
+                candidate = word
+            row = candidate
+        rows.append(row)
+        for row in rows:
+            if y < margin:
+                pdf.showPage()
+                y = height - margin
+            pdf.setFont(font, 10)
+            pdf.drawString(margin, y, row.replace('•', '-'))
+            y -= leading
+    pdf.save()
+
+
+def write_docx(path, text):
+    from docx import Document
+
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    document.save(path)
+
+
+WRITERS = {'.pdf': write_pdf, '.docx': write_docx}
+
+
+def generate_corpus(directory, sizes=SIZES, per_size=3, seed=42, extensions=('.pdf', '.docx')):
+    """Write per_size resumes of each size in each format; returns [(path, size)]"""
+    os.makedirs(directory, exist_ok=True)
+    documents = []
+    for size in sizes:
+        for index in range(per_size):
+            # Seeded per document, so a file name always holds the same resume and can be reused
+            text = synthetic_resume(random.Random(f'{seed}:{size}:{index}'), size)
+            for extension in extensions:
+                path = os.path.join(directory, f'resume_{seed}_s{size}_{index}{extension}')
+                if not os.path.exists(path):
+                    WRITERS[extension](path, text)
+                documents.append((path, size))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help='comma-separated size factors')
+    parser.add_argument('--per-size', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    documents = generate_corpus(args.directory, sizes, args.per_size, args.seed)
+    print(f"Wrote {len(documents)} resumes to {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+
+# Import the app in the master so workers inherit it on fork
+preload_app = True
+
+
+def on_starting(server):
+    # Warm up once in the master: import the lazily imported libraries, load
+    # the models named in PRELOAD_MODELS (a comma-separated list, or "all")
+    # and run a sample analysis. Forked workers share that memory
+    # copy-on-write instead of each loading their own copy, and their /ready
+    # answers 200 from the start.
+    from analyzer.warmup import warmup
+    from analyzer.metrics import registry as metrics
+    state = warmup.run()
+    status = warmup.status()
+    server.log.info("Warm-up %s in %.2fs (models: %s)", state, sum(status['steps'].values()),
+                    ', '.join(status['models']) or 'none')
+    # Workers fork with empty counters, so record the model loads from here
+    metrics.flush()
+
+
+def post_worker_init(worker):
+    # Start this worker's job dispatchers and analysis processes now, so its
+    # fork server loads the models (analyzer.preload) at boot rather than
+    # during the first job. Each worker has its own fork server.
+    from app import job_queue
+    job_queue.start()
@@ -12,6 +12,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     const uploadSection = document.querySelector('.upload-section');
     const loadingSection = document.querySelector('.loading-section');
+    const loadingStatus = document.getElementById('loading-status');
     const resultsSection = document.querySelector('.results-section');
     
     const scoreCircle = document.getElementById('score-circle');
@@ -37,6 +38,9 @@ document.addEventListener('DOMContentLoaded', function() {
     
     const resumeSectionsAccordion = document.getElementById('resume-sections-accordion');
     
+    const rescoreJobDescription = document.getElementById('rescore-job-description');
+    const rescoreBtn = document.getElementById('rescore-btn');
+    
     const downloadReportBtn = document.getElementById('download-report');
     const analyzeNewBtn = document.getElementById('analyze-new');
     
@@ -157,6 +161,10 @@ document.addEventListener('DOMContentLoaded', function() {
             }
             return response.json();
         })
+        .then(data => {
+            // The analysis runs in the background; poll the job until it finishes
+            return data.analysis ? data : pollJob(data.status_url);
+        })
         .then(data => {
             // Hide loading section
             loadingSection.style.display = 'none';
@@ -166,6 +174,7 @@ document.addEventListener('DOMContentLoaded', function() {
             
             // Display results
             displayResults(data.analysis);
+            rescoreJobDescription.value = jobDescription.value;
             
             // Show results section
             resultsSection.style.display = 'block';
@@ -175,9 +184,35 @@ document.addEventListener('DOMContentLoaded', function() {
             // Go back to upload section
             uploadSection.style.display = 'block';
             loadingSection.style.display = 'none';
+            loadingStatus.textContent = '';
         });
     });
     
+    // Poll a queued analysis job until it is done or has failed
+    function pollJob(statusUrl) {
+        return new Promise((resolve, reject) => {
+            function check() {
+                fetch(statusUrl)
+                    .then(response => response.json())
+                    .then(job => {
+                        if (job.status === 'done') {
+                            loadingStatus.textContent = '';
+                            resolve(job);
+                        } else if (job.status === 'failed' || job.error) {
+                            reject(new Error(job.error || 'Analysis failed'));
+                        } else {
+                            loadingStatus.textContent = job.status === 'queued'
+                                ? `Waiting in queue (position ${job.position})...`
+                                : 'Analysis in progress...';
+                            setTimeout(check, 1000);
+                        }
+                    })
+                    .catch(reject);
+            }
+            check();
+        });
+    }
+    
     // Display Results
     function displayResults(analysis) {
         // Display overall score
@@ -317,16 +352,31 @@ document.addEventListener('DOMContentLoaded', function() {
             'projects': { icon: 'fa-project-diagram', title: 'Projects' },
             'certifications': { icon: 'fa-certificate', title: 'Certifications' },
             'languages': { icon: 'fa-language', title: 'Languages' },
-            'interests': { icon: 'fa-heart', title: 'Interests' }
+            'interests': { icon: 'fa-heart', title: 'Interests' },
+            'entities': { icon: 'fa-id-badge', title: 'Extracted Details' }
+        };
+        
+        // Labels of the entity fields found by NER
+        const entityLabels = {
+            'name': 'Name',
+            'organizations': 'Employers',
+            'dates': 'Dates',
+            'locations': 'Locations'
         };
         
         // Add each section to the accordion
         for (const [section, content] of Object.entries(parsedResume)) {
-            // Skip empty sections
-            if (section === 'contact_info') {
+            // Skip unknown and empty sections
+            if (!sectionInfo[section]) {
+                continue;
+            } else if (section === 'contact_info') {
                 if (!content.email && !content.phone && !content.linkedin) {
                     continue;
                 }
+            } else if (section === 'entities') {
+                if (!Object.keys(entityLabels).some(field => content[field] && content[field].length > 0)) {
+                    continue;
+                }
             } else if (!content || content.trim() === '') {
                 continue;
             }
@@ -378,6 +428,23 @@ document.addEventListener('DOMContentLoaded', function() {
                 }
                 
                 accordionContent.appendChild(contactList);
+            } else if (section === 'entities') {
+                const entityList = document.createElement('ul');
+                
+                for (const [field, label] of Object.entries(entityLabels)) {
+                    const value = Array.isArray(content[field]) ? content[field].join(', ') : content[field];
+                    if (!value) {
+                        continue;
+                    }
+                    const li = document.createElement('li');
+                    const strong = document.createElement('strong');
+                    strong.textContent = `${label}:`;
+                    li.appendChild(strong);
+                    li.appendChild(document.createTextNode(` ${value}`));
+                    entityList.appendChild(li);
+                }
+                
+                accordionContent.appendChild(entityList);
             } else {
                 const p = document.createElement('p');
                 p.textContent = content;
@@ -410,6 +477,37 @@ document.addEventListener('DOMContentLoaded', function() {
         header.addEventListener('click', toggleAccordion);
     });
     
+    // Re-score the current resume against an edited job description; only the job-dependent scores are recomputed
+    rescoreBtn.addEventListener('click', function() {
+        if (!currentAnalysis || !currentAnalysis.result_id) {
+            alert('No analysis data available.');
+            return;
+        }
+        
+        rescoreBtn.disabled = true;
+        fetch(`/results/${currentAnalysis.result_id}/rescore`, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({job_description: rescoreJobDescription.value})
+        })
+        .then(response => response.json().then(data => {
+            if (!response.ok) {
+                throw new Error(data.error || 'Something went wrong');
+            }
+            return data;
+        }))
+        .then(data => {
+            currentAnalysis = data.analysis;
+            displayResults(data.analysis);
+        })
+        .catch(error => {
+            alert('Error: ' + error.message);
+        })
+        .finally(() => {
+            rescoreBtn.disabled = false;
+        });
+    });
+    
     // Download Report
     downloadReportBtn.addEventListener('click', function() {
         if (!currentAnalysis) {
@@ -0,0 +1,19 @@
+"""Points the app's databases and folders at a scratch directory before anything imports it."""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_scratch = tempfile.mkdtemp(prefix='resume-analyzer-tests-')
+for name, relative in {
+    'UPLOAD_FOLDER': 'uploads',
+    'CACHE_DATABASE': 'cache.db',
+    'JOBS_DATABASE': 'jobs.db',
+    'RESULT_STORE_PATH': 'results.db',
+    'REPORTS_FOLDER': 'reports',
+    'SEARCH_INDEX_PATH': 'search.db',
+    'METRICS_DATABASE': 'metrics.db'
+}.items():
+    os.environ.setdefault(name, os.path.join(_scratch, relative))
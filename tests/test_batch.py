@@ -0,0 +1,88 @@
+import random
+import zipfile
+import threading
+import multiprocessing
+from types import SimpleNamespace
+
+import pytest
+
+from analyzer import batch
+from analyzer.batch import run_batch, iter_sources
+from analyzer.features import prepare_job_description
+from benchmarks.corpus import synthetic_resume, write_docx
+
+
+def test_batch_pool_does_not_fork_the_calling_process(tmp_path, monkeypatch):
+    rng = random.Random(7)
+    for index in range(3):
+        write_docx(str(tmp_path / f'resume-{index}.docx'), synthetic_resume(rng))
+    (tmp_path / 'broken.pdf').write_bytes(b'not a pdf')
+
+    def fork_pool(*args, **kwargs):
+        raise AssertionError('batch workers must not be forked from the calling process')
+
+    monkeypatch.setattr(multiprocessing, 'Pool', fork_pool)
+    records = []
+    # Like the /batch route: run from a thread of a threaded process
+    worker = threading.Thread(target=lambda: records.extend(run_batch(iter_sources(str(tmp_path)), 'Python AWS SQL', 2)))
+    worker.start()
+    worker.join(120)
+
+    assert sorted(record['file'] for record in records) == ['broken.pdf'] + [f'resume-{index}.docx' for index in range(3)]
+    assert [record['file'] for record in records if 'error' in record] == ['broken.pdf']
+
+
+class FakeNer:
+    """Stands in for the spaCy pipeline: tags every header segment's first line as a PERSON"""
+
+    def __init__(self):
+        self.calls = []
+
+    def pipe(self, texts, as_tuples=False, batch_size=None, n_process=1):
+        texts = list(texts)
+        self.calls.append(texts)
+        for text, context in texts:
+            ents = []
+            if context[1] == 'header':
+                ents.append(SimpleNamespace(text=text.splitlines()[0], label_='PERSON'))
+            yield SimpleNamespace(ents=ents), context
+
+
+def test_batch_runs_ner_once_per_chunk(tmp_path, monkeypatch):
+    rng = random.Random(11)
+    for index in range(3):
+        write_docx(str(tmp_path / f'resume-{index}.docx'), synthetic_resume(rng))
+    (tmp_path / 'broken.pdf').write_bytes(b'not a pdf')
+    ner = FakeNer()
+    monkeypatch.setattr(batch, 'entity_model', lambda: ner)
+    # Analyses must not run NER one resume at a time
+    monkeypatch.setattr('analyzer.resume_analyzer.entity_model', lambda: pytest.fail('per-resume NER'))
+
+    batch._init_worker(prepare_job_description('Python AWS SQL'))
+    records = batch._analyze_chunk(sorted(iter_sources(str(tmp_path))))
+
+    assert [record['file'] for record in records] == ['broken.pdf'] + [f'resume-{index}.docx' for index in range(3)]
+    assert 'error' in records[0] and all('overall' in record for record in records[1:])
+    assert len(ner.calls) == 1
+    assert sorted({index for _, (index, _) in ner.calls[0]}) == [0, 1, 2]
+
+
+def test_read_text_extracts_without_analyzing(tmp_path, monkeypatch):
+    from analyzer.relevance import _read_texts
+
+    text = synthetic_resume(random.Random(3))
+    write_docx(str(tmp_path / 'resume.docx'), text)
+    with zipfile.ZipFile(tmp_path / 'resumes.zip', 'w') as archive:
+        archive.write(tmp_path / 'resume.docx', 'inside/resume.docx')
+        archive.writestr('huge.docx', b'0' * (batch.MAX_MEMBER_BYTES + 1))
+    monkeypatch.setattr('analyzer.resume_analyzer.segment_resume', lambda text: pytest.fail('parsed the resume'))
+
+    first_line = text.splitlines()[0]
+    assert first_line in batch.read_text(str(tmp_path / 'resume.docx'))
+    assert first_line in batch.read_text((str(tmp_path / 'resumes.zip'), 'inside/resume.docx'))
+    with pytest.raises(ValueError):
+        batch.read_text((str(tmp_path / 'resumes.zip'), 'huge.docx'))
+
+    # Oversized members are skipped; the rest are read
+    names = [name for name, _ in _read_texts(str(tmp_path / 'resumes.zip'))]
+    assert names == ['inside/resume.docx']
@@ -0,0 +1,83 @@
+import sqlite3
+import threading
+
+from analyzer.cache import ContentCache
+from analyzer.quality import assess_quality
+
+
+def test_reads_take_no_write_lock(tmp_path):
+    cache = ContentCache(str(tmp_path / 'cache.db'))
+    cache.put('text', 'a', 'hello')
+    other = sqlite3.connect(str(tmp_path / 'cache.db'), isolation_level=None)
+    other.execute('BEGIN IMMEDIATE')
+    try:
+        values = []
+        reader = threading.Thread(target=lambda: values.append((cache.get('text', 'a'), cache.get('text', 'b'))))
+        reader.start()
+        reader.join(5)
+        assert values == [('hello', None)]
+    finally:
+        other.execute('COMMIT')
+        other.close()
+        reader.join()
+    assert cache.stats()['kinds']['text'] == {'hits': 1, 'misses': 1, 'entries': 1}
+
+
+def test_batched_reads_keep_lru_order(tmp_path):
+    cache = ContentCache(str(tmp_path / 'cache.db'), max_bytes=30)
+    cache.put('text', 'a', 'a' * 10)
+    cache.put('text', 'b', 'b' * 10)
+    assert cache.get('text', 'a') == 'a' * 10
+    # The pending read of 'a' is written before the put evicts, so 'b' is the least recently used
+    cache.put('text', 'c', 'c' * 10)
+    assert cache.get_many('text', ['a', 'b', 'c']) == {'a': 'a' * 10, 'c': 'c' * 10}
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['kinds']['text']['hits'] == 3 and stats['kinds']['text']['misses'] == 1
+
+
+def test_flushes_after_enough_reads(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ContentCache(path, flush_seconds=3600, flush_reads=3)
+    cache.put_many('text', {'a': 1, 'b': 2, 'c': 3})
+
+    def hits():
+        conn = sqlite3.connect(path)
+        try:
+            row = conn.execute("SELECT value FROM counters WHERE name = 'text.hits'").fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else 0
+
+    cache.get_many('text', ['a', 'b'])
+    assert hits() == 0
+    cache.get('text', 'c')
+    assert hits() == 3
+
+
+class FakeClassifier:
+    name = 'fake'
+    backend = 'test'
+
+    def __init__(self):
+        self.predicted = []
+
+    def token_counts(self, bullets):
+        return [len(bullet.split()) for bullet in bullets]
+
+    def predict(self, bullets):
+        self.predicted.extend(bullets)
+        return [0.9 for _ in bullets]
+
+
+def test_quality_scores_are_cached_in_bulk(tmp_path):
+    cache = ContentCache(str(tmp_path / 'cache.db'))
+    bullets = ['Led a team of five engineers to ship the billing service',
+               'Cut report generation time from hours to minutes']
+    classifier = FakeClassifier()
+    first = assess_quality(bullets, classifier, cache)
+    assert first['bullets_cached'] == 0 and len(classifier.predicted) == 2
+
+    second = assess_quality(bullets, classifier, cache)
+    assert second['bullets_cached'] == 2 and len(classifier.predicted) == 2
+    assert second['score'] == first['score']
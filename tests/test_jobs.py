@@ -0,0 +1,155 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import textwrap
+import subprocess
+import multiprocessing
+
+import pytest
+
+from analyzer.jobs import JobQueue
+from analyzer.sandbox import Sandbox
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def echo(payload):
+    return {'echo': payload['value']}
+
+
+def wait_for(queue, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(handler):
+        queue = JobQueue(str(tmp_path / 'jobs.db'), handler, workers=1, timeout=20)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.stop(timeout=10)
+
+
+def test_failed_start_is_a_structured_error():
+    # A lambda cannot be pickled for the fork server, so the worker never starts
+    sandbox = Sandbox(multiprocessing.get_context('forkserver'), lambda payload: payload)
+    outcome = sandbox.run({'value': 1}, timeout=5)
+    assert outcome.status == 'error'
+    assert outcome.value['type'] == 'crashed'
+    assert sandbox.process is None and sandbox.conn is None
+    sandbox.close()
+    sandbox.kill()
+
+
+def test_dispatcher_survives_worker_start_failures(make_queue):
+    queue = make_queue(lambda payload: payload)
+    for _ in range(2):
+        job = wait_for(queue, queue.submit({'value': 1}))
+        assert job['status'] == 'failed'
+        assert job['error_type'] == 'crashed'
+    assert all(thread.is_alive() for thread in queue._threads)
+
+
+def test_unexpected_error_fails_only_that_job(make_queue, monkeypatch):
+    queue = make_queue(echo)
+    run = Sandbox.run
+    calls = []
+
+    def flaky_run(self, payload, timeout):
+        calls.append(payload)
+        if len(calls) == 1:
+            raise RuntimeError('dispatcher bug')
+        return run(self, payload, timeout)
+
+    monkeypatch.setattr(Sandbox, 'run', flaky_run)
+    job = wait_for(queue, queue.submit({'value': 1}))
+    assert job['status'] == 'failed' and job['error'] == 'dispatcher bug'
+
+    job = wait_for(queue, queue.submit({'value': 2}))
+    assert job['status'] == 'done' and job['result'] == {'echo': 2}
+
+
+def test_error_after_finishing_keeps_the_result(make_queue, monkeypatch):
+    queue = make_queue(echo)
+
+    def broken_settle(self, timeout):
+        raise RuntimeError('settle failed')
+
+    monkeypatch.setattr(Sandbox, 'settle', broken_settle)
+    job = wait_for(queue, queue.submit({'value': 3}))
+    assert job['status'] == 'done' and job['result'] == {'echo': 3}
+
+
+def test_each_worker_preloads_once_for_all_its_jobs(tmp_path):
+    # A preload module that records each import, and a handler reporting the process it was forked from
+    (tmp_path / 'probe_preload.py').write_text(textwrap.dedent(f'''
+        import os
+        with open({str(tmp_path / 'loads.log')!r}, 'a') as f:
+            f.write(f'{{os.getpid()}}\\n')
+    '''))
+    (tmp_path / 'probe_handler.py').write_text(textwrap.dedent('''
+        import os
+
+        def handler(payload):
+            return {'worker': payload['worker'], 'server': os.getppid()}
+    '''))
+    # Like gunicorn: workers forked from the master each run a few jobs
+    script = textwrap.dedent(f'''
+        import os, sys, time
+        from analyzer.jobs import JobQueue
+        from probe_handler import handler
+
+        workers = []
+        for worker in range(2):
+            # Its own database, so the other worker's dispatcher cannot claim its jobs
+            queue = JobQueue(os.path.join({str(tmp_path)!r}, f'jobs-{{worker}}.db'), handler, workers=1, timeout=20,
+                             preload=['probe_preload'])
+            pid = os.fork()
+            if pid == 0:
+                status = 1
+                try:
+                    for _ in range(2):
+                        job_id = queue.submit({{'worker': worker}})
+                        deadline = time.monotonic() + 30
+                        while queue.get(job_id)['status'] not in ('done', 'failed') and time.monotonic() < deadline:
+                            time.sleep(0.05)
+                    status = 0
+                finally:
+                    os._exit(status)
+            workers.append(pid)
+        sys.exit(max(os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) for pid in workers))
+    ''')
+    # The fork server finds its preload modules on PYTHONPATH, like the app in the gunicorn working directory
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([REPO, str(tmp_path)]))
+    run = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=120, env=env)
+    assert run.returncode == 0, run.stderr
+
+    jobs = []
+    for worker in range(2):
+        conn = sqlite3.connect(str(tmp_path / f'jobs-{worker}.db'))
+        try:
+            jobs += conn.execute('SELECT status, result FROM jobs').fetchall()
+        finally:
+            conn.close()
+    assert [status for status, _ in jobs] == ['done'] * 4
+    servers = {}
+    for _, result in jobs:
+        result = json.loads(result)
+        servers.setdefault(result['worker'], set()).add(result['server'])
+    # One fork server per worker, shared by all of that worker's jobs
+    assert all(len(pids) == 1 for pids in servers.values()) and len(servers) == 2
+    loads = (tmp_path / 'loads.log').read_text().split()
+    assert sorted(loads) == sorted(str(pid) for pids in servers.values() for pid in pids)
@@ -0,0 +1,25 @@
+import random
+import multiprocessing
+
+from analyzer.pdf_extract import PdfExtractor, PARALLEL_MIN_PAGES
+from benchmarks.corpus import synthetic_resume, write_pdf
+
+
+def test_parallel_pages_match_sequential_without_forking(tmp_path, monkeypatch):
+    path = str(tmp_path / 'long.pdf')
+    write_pdf(path, '\n'.join(synthetic_resume(random.Random(index), 4) for index in range(6)))
+    sequential = PdfExtractor(path, mode='text', workers=1, max_seconds=0)
+    expected = [page.text for page in sequential.pages()]
+    assert sequential.page_count >= PARALLEL_MIN_PAGES
+
+    get_context = multiprocessing.get_context
+    methods = []
+
+    def recording_get_context(method=None):
+        methods.append(method)
+        return get_context(method)
+
+    monkeypatch.setattr(multiprocessing, 'get_context', recording_get_context)
+    parallel = PdfExtractor(path, mode='text', workers=2, max_seconds=0)
+    assert [page.text for page in parallel.pages()] == expected
+    assert methods and 'fork' not in methods
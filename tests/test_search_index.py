@@ -0,0 +1,45 @@
+import sys
+import sqlite3
+
+from analyzer import search_index
+from analyzer.result_store import open_result_store
+from analyzer.search_index import SearchIndex
+
+
+def resume(summary, skills):
+    return {'summary': summary, 'skills': skills}
+
+
+def test_clear_in_another_process_drops_cached_lengths(tmp_path):
+    path = str(tmp_path / 'search.db')
+    # Two workers sharing one index file
+    writer, reader = SearchIndex(path), SearchIndex(path)
+    writer.add('old-1', resume('python developer', 'python'))
+    writer.add('old-2', resume('python ' * 50 + 'java developer with a very long summary of unrelated work', 'java'))
+    assert reader.search('python java')
+
+    # Clearing reuses document ids 1 and 2, with different lengths
+    writer.clear()
+    writer.add('new-1', resume('java ' * 40 + 'engineer with a long history of enterprise backends', 'java'))
+    writer.add('new-2', resume('python java', 'python, java'))
+
+    expected = SearchIndex(path).search('python java')
+    assert [hit['result_id'] for hit in expected] == ['new-2', 'new-1']
+    assert reader.search('python java') == expected
+
+
+def test_reindex_keys_documents_by_file_hash(tmp_path, monkeypatch):
+    store = open_result_store('sqlite', str(tmp_path / 'results.db'))
+    for result_id in ('first', 'second'):
+        store.put(result_id, {'file_hash': 'same-file', 'parsed_resume': resume('python developer', 'python'),
+                              'ats_score': {'overall': 70}})
+    monkeypatch.setattr('analyzer.result_store.open_result_store', lambda: store)
+    path = str(tmp_path / 'search.db')
+    monkeypatch.setattr(sys, 'argv', ['search_index', 'reindex', '--index', path])
+    search_index.main()
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('SELECT doc_key FROM docs').fetchall() == [('same-file',)]
+    finally:
+        conn.close()
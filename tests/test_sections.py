@@ -0,0 +1,142 @@
+import os
+import re
+import glob
+import random
+
+import pytest
+
+from analyzer.sections import SECTION_HEADERS, segment_resume
+from benchmarks.corpus import synthetic_resume
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESUME = '''Jane Doe
+jane@example.com | (555) 123-4567
+
+  Summary:
+Backend engineer who likes quiet on-call rotations.
+
+WORK EXPERIENCE
+Senior Engineer, Acme Corp, 2019 - 2023
+- Built the billing service in Python
+Skills: Python, Go, SQL
+Workshops taught on testing
+
+Education
+B.Sc. Computer Science, State University
+
+Technologies
+- Python, Docker, AWS
+- docker
+Languages - English, French
+Hobbies: chess
+
+Projects
+Open source maintainer
+History of contributions to pandas
+Contact me for references
+'''
+
+
+def baseline_section(text, section_pattern):
+    """Section parsing as it was before the single-pass segmenter, one section per pass"""
+    section_text = []
+    in_section = False
+    section_header_found = False
+    is_skills = 'skills' in section_pattern
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if re.search(rf"^\s*({section_pattern})\s*[:\-]?", line, re.IGNORECASE):
+            in_section = True
+            section_header_found = True
+            continue
+        next_section_pattern = r"^\s*(EDUCATION|EXPERIENCE|WORK|PROJECTS|CERTIFICATIONS|SUMMARY|OBJECTIVE|CONTACT)\s*[:\-]?"
+        if in_section and re.search(next_section_pattern, line, re.IGNORECASE):
+            in_section = False
+        if in_section:
+            if is_skills:
+                cleaned_line = re.sub(r'^[•\-\*\+]\s*', '', line)
+                if ',' in cleaned_line:
+                    section_text.extend(skill.strip() for skill in cleaned_line.split(','))
+                else:
+                    section_text.append(cleaned_line)
+            else:
+                section_text.append(line)
+
+    if is_skills and not section_header_found:
+        for pattern in [r'\b(?:proficient|experienced|skilled|expertise)\s+in\s+([^.]+)',
+                        r'\b(?:knowledge|understanding)\s+of\s+([^.]+)',
+                        r'\b(?:technologies|tools|frameworks|languages)\s*:\s*([^.]+)']:
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                skills_text = match.group(1)
+                if ',' in skills_text:
+                    section_text.extend(skill.strip() for skill in skills_text.split(','))
+                else:
+                    section_text.append(skills_text.strip())
+
+    if is_skills:
+        seen, unique_skills = set(), []
+        for skill in section_text:
+            skill = skill.strip()
+            if skill.lower() not in seen and len(skill) > 1:
+                seen.add(skill.lower())
+                unique_skills.append(skill)
+        return '\n'.join(unique_skills)
+    return '\n'.join(section_text)
+
+
+def assert_matches_baseline(text):
+    segmentation = segment_resume(text)
+    for section, pattern in SECTION_HEADERS.items():
+        assert segmentation.section_text(section) == baseline_section(text, pattern), section
+
+
+def test_headers_order_and_contents():
+    segmentation = segment_resume(RESUME)
+    assert segmentation.preamble_lines() == ['Jane Doe', 'jane@example.com | (555) 123-4567']
+    # Header lines, in order, including ones that start with a header word
+    headers = sorted((start, section) for section, spans in segmentation.headers.items() for start, _ in spans)
+    assert [(RESUME[start:].split('\n')[0], section) for start, section in headers] == [
+        ('Summary:', 'summary'),
+        ('WORK EXPERIENCE', 'experience'),
+        ('Skills: Python, Go, SQL', 'skills'),
+        ('Workshops taught on testing', 'experience'),
+        ('Education', 'education'),
+        ('Technologies', 'skills'),
+        ('Languages - English, French', 'languages'),
+        ('Hobbies: chess', 'interests'),
+        ('Projects', 'projects'),
+        ('History of contributions to pandas', 'experience'),
+    ]
+    assert segmentation.section_text('summary') == 'Backend engineer who likes quiet on-call rotations.'
+    # 'Skills' does not close experience; the terminator 'Work' in 'Workshops' does, then reopens it
+    assert segmentation.lines('experience') == [
+        'Senior Engineer, Acme Corp, 2019 - 2023', '- Built the billing service in Python', 'Skills: Python, Go, SQL'
+    ]
+    # Skills stays open across the languages and hobbies headers, as it did before
+    assert segmentation.section_text('skills') == 'Python\nDocker\nAWS\nLanguages - English\nFrench\nHobbies: chess'
+    assert segmentation.lines('interests') == []
+    assert segmentation.lines('projects') == ['Open source maintainer', 'History of contributions to pandas']
+    assert_matches_baseline(RESUME)
+
+
+def test_matches_baseline_on_synthetic_resumes():
+    for seed in range(20):
+        assert_matches_baseline(synthetic_resume(random.Random(seed), 1 + seed % 3))
+
+
+def test_matches_baseline_without_a_skills_header():
+    text = 'Profile\nExperienced in Python, Django and REST. Knowledge of AWS.\nTools: git, jira\nEducation\nBSc'
+    # The phrases run to the next full stop, across lines, as they did before
+    assert segment_resume(text).section_text('skills') == 'Python\nDjango and REST\nAWS\ngit\njira\nEducation\nBSc'
+    assert_matches_baseline(text)
+
+
+@pytest.mark.parametrize('path', sorted(glob.glob(os.path.join(REPO, 'uploads', '*.pdf'))
+                                    + glob.glob(os.path.join(REPO, 'uploads', '*.docx'))))
+def test_matches_baseline_on_sample_uploads(path):
+    from analyzer.resume_analyzer import extract_resume_text
+    text, _ = extract_resume_text(path, os.path.splitext(path)[1].lower())
+    assert_matches_baseline(text)
@@ -0,0 +1,54 @@
+import json
+import zlib
+
+from analyzer import serialization
+
+RESULT = {
+    'ats_score': {'overall': 71.5, 'categories': {'content': 80, 'format': 60}},
+    'parsed_resume': {'experience': 'Built Python services. ' * 200, 'skills': ['python', 'sql'] * 100},
+    'suggestions': {'content': ['Quantify achievements'] * 3},
+    'jd_match': {'matched_terms': ['python ' * 30] * 10},
+    'result_id': 'abc123'
+}
+
+
+def client_decompress(body):
+    """Decode as HTTP clients do (curl, browsers, urllib3): one gzip member, nothing after it"""
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    data = decompressor.decompress(body) + decompressor.flush()
+    assert decompressor.eof and not decompressor.unused_data
+    return data
+
+
+def test_gzip_body_is_a_single_member():
+    blob = serialization.encode(RESULT)
+    assert len(serialization.read_header(blob)[0]['segments']) > 1
+    assert json.loads(client_decompress(bytes(serialization.gzip_body(blob)))) == RESULT
+
+
+def test_response_body_gzip_decodes_in_full():
+    body, encoding = serialization.response_body(serialization.encode(RESULT), encoding='gzip')
+    assert encoding == 'gzip'
+    assert json.loads(client_decompress(body)) == RESULT
+
+
+def test_decode_fields():
+    blob = serialization.encode(RESULT)
+    assert serialization.decode(blob) == RESULT
+    assert serialization.decode(blob, ['ats_score', 'jd_match', 'missing']) == {
+        'ats_score': RESULT['ats_score'], 'jd_match': RESULT['jd_match']}
+    assert serialization.decode(blob, ['result_id']) == {'result_id': 'abc123'}
+    assert serialization.decode(serialization.encode({}), ['ats_score']) == {}
+
+
+def test_results_route_serves_one_gzip_member():
+    import app as web
+    web.result_store.put('serialization-test', RESULT)
+    client = web.app.test_client()
+
+    response = client.get('/results/serialization-test', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(client_decompress(response.data)) == RESULT
+
+    response = client.get('/results/serialization-test?fields=ats_score,suggestions')
+    assert response.get_json() == {'ats_score': RESULT['ats_score'], 'suggestions': RESULT['suggestions']}
@@ -0,0 +1,52 @@
+from analyzer.skills import DEFAULT_MATCHER, SkillMatcher
+
+
+def skills(text):
+    return DEFAULT_MATCHER.skills_in(text)
+
+
+def test_matches_sit_on_word_boundaries():
+    assert skills('Worked at Google on JavaScript and MySQL, wrote words in WordPress') == {'javascript', 'mysql'}
+    assert skills('Go, Java and SQL') == {'go', 'java', 'sql'}
+    # Skills ending in punctuation still match when followed by more punctuation
+    assert skills('Languages: C++, C#. Also node.js!') == {'c++', 'c#', 'node.js', 'node'}
+    assert skills('pythonic code, dockerized apps') == set()
+
+
+def test_hits_carry_offsets_into_the_original_text():
+    text = 'İstanbul team: Python and Big Data'
+    for hit in DEFAULT_MATCHER.find(text):
+        assert text[hit.start:hit.end].lower() == hit.skill
+    assert [(hit.skill, hit.group, hit.category) for hit in DEFAULT_MATCHER.find('Python')] == [
+        ('python', 'hard', 'Programming Languages')
+    ]
+
+
+def test_multi_word_and_overlapping_skills():
+    assert skills('Machine Learning and public speaking') == {'machine learning', 'public speaking'}
+    # Overlapping skills are all reported, but a shared word alone is not a skill
+    assert skills('big data science') == {'big data', 'data science'}
+    assert skills('a team player and team lead') == {'team player', 'team lead'}
+    assert skills('team sports') == set()
+    # A skill inside a longer one only counts where it is a word of its own
+    assert skills('PostgreSQL') == {'postgresql'}
+    hits = DEFAULT_MATCHER.find('attention to detail')
+    assert [hit.skill for hit in hits] == ['attention to detail']
+
+
+def test_aliases_in_the_taxonomy_share_a_category():
+    aliases = [('go', 'golang'), ('react', 'reactjs'), ('node', 'node.js', 'nodejs'), ('postgresql', 'postgres')]
+    for names in aliases:
+        categories = set()
+        for name in names:
+            hits = DEFAULT_MATCHER.find(f'Experienced with {name}.')
+            assert name in {hit.skill for hit in hits}
+            categories.update(hit.category for hit in hits if hit.skill == name)
+        assert len(categories) == 1, names
+
+
+def test_skill_listed_in_several_categories_hits_each():
+    matcher = SkillMatcher({'hard': {'Data': ['SQL ', 'excel'], 'Tools': ['excel']}, 'soft': {}})
+    hits = matcher.find('Excel and sql')
+    assert sorted((hit.skill, hit.category) for hit in hits) == [('excel', 'Data'), ('excel', 'Tools'), ('sql', 'Data')]
+    assert matcher.categories('hard') == ['Data', 'Tools']
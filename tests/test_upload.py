@@ -0,0 +1,33 @@
+import io
+
+
+def multipart(filename, data, boundary='limit-test'):
+    return (f'--{boundary}\r\nContent-Disposition: form-data; name="resume"; filename="{filename}"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n').encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+
+
+def test_chunked_upload_over_the_limit_is_rejected():
+    import app as web
+
+    limit = web.app.config['UPLOAD_MAX_CONTENT_LENGTH']
+    body = multipart('resume.pdf', b'x' * (limit + 1))
+    stream = io.BytesIO(body)
+    # Chunked, as a server like gunicorn passes it on: the size is only known from what is read
+    response = web.app.test_client().post(
+        '/upload', input_stream=stream, content_type='multipart/form-data; boundary=limit-test',
+        headers={'Transfer-Encoding': 'chunked'}, environ_overrides={'wsgi.input_terminated': True}
+    )
+    assert response.status_code == 413
+    assert response.get_json() == {'error': 'File size exceeds 2MB. Please upload a smaller file.'}
+    # Reading stopped at the limit rather than consuming the whole body
+    assert stream.tell() <= limit + 64 * 1024
+
+
+def test_request_limits_follow_the_route():
+    import app as web
+    from flask import request
+
+    with web.app.test_request_context('/upload', method='POST'):
+        assert request.max_content_length == web.app.config['UPLOAD_MAX_CONTENT_LENGTH']
+    with web.app.test_request_context('/batch', method='POST'):
+        assert request.max_content_length == web.app.config['MAX_CONTENT_LENGTH']